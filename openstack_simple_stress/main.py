@@ -1,43 +1,150 @@
 # SPDX-License-Identifier: AGPL-3.0-or-later
 
+# Annotations are not evaluated, so the SDK types used in them do not force
+# an import of openstacksdk
+from __future__ import annotations
+
+from array import array
 import base64
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from enum import Enum
+import hashlib
 from importlib import resources
 import ipaddress
+import json
+import operator
+import os
 from pathlib import Path
 
+import queue
+import re
 import signal
-import statistics
 import sys
 import threading
 import time
-from typing import List, cast
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Optional, Sequence, cast
+from urllib.parse import parse_qs
+import uuid
 
 import click
-from keystoneauth1.exceptions.catalog import EndpointNotFound
 from loguru import logger
-import openstack
-from rich.console import Console
-from rich.table import Table
 import typer
 from typing_extensions import Annotated
-import yaml
+
+# openstacksdk, keystoneauth, rich, yaml and cryptography are imported where
+# they are used, so --help, profile checks and the unit tests do not pay for
+# them
+if TYPE_CHECKING:
+    from cryptography.fernet import Fernet
+    import openstack
+    from rich.console import Console
+    import sqlite3
 
 log_fmt = (
     "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
     "<level>{message}</level>"
 )
 
+
+def _stderr(message) -> None:
+    # Looked up on every write, the sinks outlive redirections of stderr
+    sys.stderr.write(message)
+
+
 logger.remove()
-logger.add(sys.stderr, format=log_fmt, level="INFO", colorize=True)
+logger.add(_stderr, format=log_fmt, level="INFO", colorize=True)
+
+LOG_LEVELS = ("TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")
 
 shutdown_requested = False
 
+# Waits that block on a condition re-check the cancel token this often
+CANCEL_CHECK_INTERVAL = 1.0
+
+PHASE_POLL_INTERVAL = 1.0
+
+# Load of the driver host, sampled this often during a run
+SATURATION_SAMPLE_INTERVAL = 1.0
+# Share of one core, the GIL keeps the interpreter on about one core
+SATURATION_CPU = 0.9
+
+# Stacks of the driver threads are sampled this often with --profile-driver
+PROFILE_SAMPLE_INTERVAL = 0.01
+# Workers of a thread pool, merged into the pool in the profile
+POOL_WORKER_RE = re.compile(r"^(ThreadPoolExecutor-\d+)_\d+$")
+
+# Servers and volumes carry the ID of the run that created them
+RUN_METADATA_KEY = "simple-stress-run"
+
+# Exit code of a run that failed one of its --slo thresholds
+SLO_EXIT_CODE = 3
+
+# Statuses that mean the request was not processed and may be sent again
+THROTTLED_STATUS_CODES = (429, 503)
+# A POST answered with 503 may have been processed, e.g. a create accepted by
+# the backend, only 429 is rejected before processing
+POST_THROTTLED_STATUS_CODES = (429,)
+RETRY_BACKOFF = 1.0
+RETRY_BACKOFF_MAX = 60.0
+
+# Operations with a retry policy and the statuses after which they are retried
+RETRYABLE_OPERATIONS = (
+    "server_create",
+    "server_delete",
+    "volume_create",
+    "volume_attach",
+    "volume_delete",
+)
+TRANSIENT_STATUS_CODES = (409, 500, 502, 503, 504)
+# Creates are not idempotent, after a server error the resource may exist
+CREATE_OPERATIONS = ("server_create", "volume_create")
+CREATE_TRANSIENT_STATUS_CODES = (409, 503)
+
+# Services whose endpoints get their own HTTP pool in pooled connections
+# (--connections), mapped to the name of their SDK proxy
+POOLED_SERVICES = {
+    "compute": "compute",
+    "block-storage": "block_storage",
+    "network": "network",
+    "image": "image",
+}
+DEFAULT_HTTP_POOL_SIZE = 10
+
+# Cached tokens that expire within this many seconds are not reused
+TOKEN_CACHE_STALE_DURATION = 300
+# Passphrase of the token cache, otherwise a key in the system keyring
+TOKEN_CACHE_KEY_ENV = "SIMPLE_STRESS_TOKEN_CACHE_KEY"
+TOKEN_CACHE_KDF_ITERATIONS = 200_000
+# Auth settings that identify whose token is cached
+TOKEN_CACHE_IDENTITY = (
+    "auth_url",
+    "username",
+    "user_id",
+    "user_domain_name",
+    "user_domain_id",
+    "project_name",
+    "project_id",
+    "project_domain_name",
+    "project_domain_id",
+    "domain_name",
+    "domain_id",
+    "application_credential_id",
+)
+RESOURCE_CACHE_TTL = 3600
+
+# Number of previous runs shown by --history
+HISTORY_RUNS = 10
+
 VALID_PROFILE_KEYS = {
     "clean",
+    "history",
+    "save_history",
+    "save_records",
+    "history_db",
     "no_cleanup",
     "debug",
     "no_delete",
@@ -65,6 +172,29 @@ VALID_PROFILE_KEYS = {
     "no_network",
     "burnin",
     "burnin_duration",
+    "attach_concurrency",
+    "batch_create",
+    "phase_breakdown",
+    "instance_actions",
+    "instance_actions_rate",
+    "phone_home",
+    "phone_home_address",
+    "rate_limit",
+    "api_retries",
+    "retry",
+    "retry_backoff",
+    "connections",
+    "http_pool_size",
+    "token_cache",
+    "resource_cache",
+    "resource_cache_ttl",
+    "log_level",
+    "log_format",
+    "rate",
+    "trace",
+    "profile_driver",
+    "slo",
+    "slo_summary",
 }
 
 PROFILE_KEY_TO_PARAM = {
@@ -91,6 +221,24 @@ def _resolve_builtin_profile(name: str) -> Path | None:
     return None
 
 
+def profile_key(profile: str | None) -> str | None:
+    """Identify a profile independent of how it was given.
+
+    Profile files are identified by their absolute path, built-in profiles
+    by their name, so ``burnin``, ``burnin.yaml`` and ``./x.yaml`` vs.
+    ``x.yaml`` are the same profile.
+    """
+    if not profile:
+        return None
+    path = Path(profile)
+    if path.exists():
+        return str(path.resolve())
+    builtin = _resolve_builtin_profile(profile)
+    if builtin is not None:
+        return builtin.stem
+    return profile
+
+
 def load_profile(profile_path: str) -> dict:
     """Load a YAML profile and return the parameter dict."""
     path = Path(profile_path)
@@ -104,6 +252,8 @@ def load_profile(profile_path: str) -> dict:
         logger.error(f"Profile '{profile_path}' not found")
         sys.exit(1)
 
+    import yaml
+
     with open(path) as f:
         data = yaml.safe_load(f)
 
@@ -122,22 +272,126 @@ def load_profile(profile_path: str) -> dict:
     return data
 
 
-def signal_handler(signum, frame):
+def _json_format(record) -> str:
+    """Render a record as one JSON object per line.
+
+    The context bound with ``logger.contextualize`` (run ID, instance,
+    operation) becomes top-level fields.
+    """
+    entry = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+    }
+    entry.update((k, v) for k, v in record["extra"].items() if k != "_json")
+    if record["exception"]:
+        entry["exception"] = repr(record["exception"].value)
+    record["extra"]["_json"] = json.dumps(entry, default=str)
+    return "{extra[_json]}\n"
+
+
+def setup_logging(level: str, log_format: str, run_id: str) -> None:
+    """Replace the import-time sink with a queued one for the run.
+
+    Worker threads only format the message and put it on a queue, a
+    background thread writes it to stderr. Call ``logger.complete()`` before
+    output that must not interleave with pending messages.
+    """
+    logger.remove()
+    logger.configure(extra={"run_id": run_id})
+    if log_format == "json":
+        logger.add(_stderr, format=_json_format, level=level, enqueue=True)
+    else:
+        logger.add(_stderr, format=log_fmt, level=level, colorize=True, enqueue=True)
+
+
+class WaitCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """Shared by all waits of the run, set once an abort is confirmed.
+
+    ``check`` fits the ``callback`` of the SDK ``wait_for_*`` methods, which
+    call it after every poll.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def reset(self) -> None:
+        self._event.clear()
+
+    def check(self, *args) -> None:
+        if self._event.is_set():
+            raise WaitCancelled("Wait cancelled by shutdown request")
+
+    def sleep(self, seconds: float) -> None:
+        """Like ``time.sleep``, but raise as soon as the token is cancelled."""
+        if self._event.wait(seconds):
+            raise WaitCancelled("Wait cancelled by shutdown request")
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to ``seconds``, returns whether the token was cancelled."""
+        return self._event.wait(seconds)
+
+
+cancel_token = CancelToken()
+# Set while the abort confirmation is shown
+abort_prompt = threading.Event()
+
+
+def request_shutdown() -> None:
     global shutdown_requested
 
-    logger.warning("\nCTRL+C received - Do you want to abort the test?")
+    shutdown_requested = True
+    cancel_token.cancel()
+    logger.warning(
+        "Aborting the test and cleaning up, press CTRL+C again to exit without cleanup"
+    )
+
+
+def confirm_abort() -> None:
+    """Ask whether to abort, in a thread of its own.
+
+    Reading stdin in the signal handler would block the main thread, which
+    runs the handler, for as long as the prompt is shown.
+    """
+    logger.warning("CTRL+C received - Do you want to abort the test?")
+    # The prompt must not overtake the queued warning
+    logger.complete()
     try:
         response = input("Abort? (y/N): ").strip().lower()
-        if response in ["y", "yes"]:
-            shutdown_requested = True
-            logger.info(
-                "Graceful shutdown initiated - current iteration will be aborted and cleanup performed..."
-            )
-        else:
-            logger.info("Continuing with test...")
-    except (EOFError, KeyboardInterrupt):
-        shutdown_requested = True
-        logger.info("Graceful shutdown initiated...")
+    except (EOFError, OSError):
+        response = "y"
+    if shutdown_requested:
+        return
+    if response in ["y", "yes"]:
+        request_shutdown()
+    else:
+        logger.info("Continuing with test...")
+    abort_prompt.clear()
+
+
+def signal_handler(signum, frame):
+    if shutdown_requested:
+        # A CTRL+C during the abort does not wait for the cleanup
+        logger.warning("CTRL+C received again - exiting without cleanup")
+        raise KeyboardInterrupt
+
+    if abort_prompt.is_set() or not sys.stdin.isatty():
+        # A second CTRL+C confirms, without a terminal there is nobody to ask
+        request_shutdown()
+        return
+    abort_prompt.set()
+    threading.Thread(target=confirm_abort, name="abort_prompt", daemon=True).start()
 
 
 # source: https://stackoverflow.com/questions/18466079/can-i-change-the-connection-pool-size-for-pythons-requests-module  # noqa
@@ -182,11 +436,40 @@ def patch_https_connection_pool(**constructor_kwargs) -> None:
 
 class Meta:
 
-    def __init__(self, wait: bool, interval: int, timeout: int, delete: bool):
+    def __init__(
+        self,
+        wait: bool,
+        interval: int,
+        timeout: int,
+        delete: bool,
+        attach_concurrency: int = 1,
+        phase_breakdown: bool = False,
+        instance_actions: "InstanceActionCollector | None" = None,
+        phone_home: "PhoneHomeListener | None" = None,
+        retry: "RetryPolicy | None" = None,
+        run_id: str = "",
+    ):
         self.wait = wait
         self.interval = interval
         self.timeout = timeout
         self.delete = delete
+        self.attach_concurrency = attach_concurrency
+        self.phase_breakdown = phase_breakdown
+        self.instance_actions = instance_actions
+        self.phone_home = phone_home
+        self.retry = retry or RetryPolicy()
+        self.run_id = run_id
+
+    @property
+    def poll_interval(self) -> float:
+        """Interval of the shared status pollers.
+
+        Phases often last only a few seconds, so they are polled at a finer
+        interval when a phase breakdown is requested.
+        """
+        if self.phase_breakdown:
+            return min(self.interval, PHASE_POLL_INTERVAL)
+        return self.interval
 
 
 @dataclass
@@ -196,21 +479,448 @@ class OperationRecord:
     duration: float
     success: bool
     error: str | None = None
+    error_type: str | None = None
+    retries: int = 0
+    start: float = 0.0
 
 
 @contextmanager
 def _noop_track(operation: str, resource_name: str):
-    yield
+    yield OperationRecord(operation, resource_name, 0.0, True)
+
+
+def _http_status(e: Exception) -> int | None:
+    # openstacksdk and keystoneauth name the attribute differently
+    status = getattr(e, "status_code", None) or getattr(e, "http_status", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(e: Exception) -> str:
+    """Return the exception class and, if present, the HTTP status of an error."""
+    status = _http_status(e)
+    if status:
+        return f"{type(e).__name__} (HTTP {status})"
+    return type(e).__name__
+
+
+class RetryPolicy:
+    """Retry transient failures of selected operations with exponential back-off.
+
+    ``attempts`` maps an operation to its number of retries. Conflicts and
+    server errors are transient for all operations but the creates, which
+    only retry conflicts and 503 (the request was not processed);
+    ``volume_delete`` also retries 400, which cinder returns while the
+    volume is still detaching.
+    """
+
+    def __init__(
+        self, attempts: dict[str, int] | None = None, backoff: float = RETRY_BACKOFF
+    ):
+        self.attempts = attempts or {}
+        self.backoff = backoff
+
+    def is_transient(self, operation: str, e: Exception) -> bool:
+        status = _http_status(e)
+        if operation in CREATE_OPERATIONS:
+            return status in CREATE_TRANSIENT_STATUS_CODES
+        if status in TRANSIENT_STATUS_CODES:
+            return True
+        return operation == "volume_delete" and status == 400
+
+    def call(
+        self,
+        operation: str,
+        record: OperationRecord | None,
+        fn: Callable,
+        *args,
+        **kwargs,
+    ):
+        """Call ``fn``, retrying transient errors; retries are counted in ``record``."""
+        retries = 0
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if retries >= self.attempts.get(
+                    operation, 0
+                ) or not self.is_transient(operation, e):
+                    raise
+                delay = min(self.backoff * 2**retries, RETRY_BACKOFF_MAX)
+                retries += 1
+                if record is not None:
+                    record.retries = retries
+                logger.warning(
+                    f"{operation} failed with {classify_error(e)}, retry"
+                    f" {retries}/{self.attempts[operation]} in {delay:.1f}s"
+                )
+                if operation.endswith("_delete"):
+                    time.sleep(delay)
+                else:
+                    # Aborted runs do not create anything new
+                    cancel_token.sleep(delay)
+
+
+# Percentiles of the operation statistics
+PERCENTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+@dataclass
+class DurationStats:
+    count: int
+    mean: float
+    stdev: float
+    min: float
+    max: float
+    percentiles: dict[float, float]
+
+
+def duration_stats(
+    operations: list[str], durations: list[float]
+) -> dict[str, DurationStats]:
+    """Aggregate the durations per operation from two parallel columns.
+
+    Every group is sorted once and all statistics are taken from it. NumPy
+    is used if it is installed, the pure Python version gives the same
+    results. Percentiles interpolate linearly between the closest ranks,
+    the standard deviation is the sample one.
+    """
+    index: dict[str, int] = {}
+    codes = [index.setdefault(op, len(index)) for op in operations]
+    return _aggregate(list(index), codes, durations)
+
+
+def _aggregate(
+    names: list[str], codes: Sequence[int], durations: Sequence[float]
+) -> dict[str, DurationStats]:
+    """``duration_stats`` for operations already mapped to ``names`` indexes."""
+    if not codes:
+        return {}
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return _duration_stats_python(names, codes, durations)
+    return _duration_stats_numpy(names, codes, durations)
+
+
+def _duration_stats_python(
+    names: list[str], codes: Sequence[int], durations: Sequence[float]
+) -> dict[str, DurationStats]:
+    import math
+
+    groups: list[list[float]] = [[] for _ in names]
+    for code, duration in zip(codes, durations):
+        groups[code].append(duration)
+
+    result = {}
+    for name, values in zip(names, groups):
+        if not values:
+            continue
+        values.sort()
+        n = len(values)
+        mean = math.fsum(values) / n
+        stdev = 0.0
+        if n > 1:
+            stdev = math.sqrt(math.fsum((v - mean) ** 2 for v in values) / (n - 1))
+        percentiles = {}
+        for q in PERCENTILES:
+            pos = q * (n - 1)
+            lo = int(pos)
+            hi = min(lo + 1, n - 1)
+            percentiles[q] = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+        result[name] = DurationStats(n, mean, stdev, values[0], values[-1], percentiles)
+    return result
+
+
+def _duration_stats_numpy(
+    names: list[str], codes: Sequence[int], durations: Sequence[float]
+) -> dict[str, DurationStats]:
+    import numpy as np
+
+    code = np.asarray(codes, dtype=np.intp)
+    values = np.asarray(durations, dtype=np.float64)
+    counts = np.bincount(code, minlength=len(names))
+    starts = np.cumsum(counts) - counts
+    # Every operation becomes a contiguous slice, sorted on its own (much
+    # faster than a lexsort over both columns)
+    ordered = values[np.argsort(code, kind="stable")]
+    for start, count in zip(starts, counts):
+        ordered[start:start + count].sort()
+    means = np.bincount(code, weights=values, minlength=len(names)) / np.maximum(counts, 1)
+    squares = np.bincount(code, weights=(values - means[code]) ** 2, minlength=len(names))
+    stdevs = np.sqrt(squares / np.maximum(counts - 1, 1))
+    percentiles = {}
+    for q in PERCENTILES:
+        pos = starts + q * (counts - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, starts + counts - 1)
+        percentiles[q] = ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+    return {
+        name: DurationStats(
+            int(counts[i]),
+            float(means[i]),
+            float(stdevs[i]),
+            float(ordered[starts[i]]),
+            float(ordered[starts[i] + counts[i] - 1]),
+            {q: float(percentiles[q][i]) for q in PERCENTILES},
+        )
+        for i, name in enumerate(names)
+        if counts[i]
+    }
+
+
+SLO_COMPARISONS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+SLO_STATISTICS = (
+    "count",
+    "errors",
+    "error_rate",
+    "mean",
+    "stdev",
+    "min",
+    "max",
+    *(f"p{q * 100:g}" for q in PERCENTILES),
+)
+# The operations of the lifecycles, run-wide SLOs are computed over them.
+# Derived records (phases, schedule lag, API retries, ...) never fail and
+# would dilute the error rate.
+SLO_LIFECYCLE_OPERATIONS = (
+    "server_create",
+    "server_wait_active",
+    "server_wait_boot",
+    "server_delete",
+    "volume_create",
+    "volume_attach",
+    "volume_delete",
+)
+# The operations a lifecycle starts when it is due (--rate), the volumes are
+# created concurrently with the server
+SCHEDULED_OPERATIONS = ("server_create", "volume_create")
+# The first numeric segment of a resource name, the number of its lifecycle
+RESOURCE_NUMBER_RE = re.compile(r"(?<=-)(0|[1-9][0-9]{0,8})(?=-|$)")
+_SLO_PATTERN = re.compile(r"^\s*([\w.]+?)\s*(<=|>=|<|>)\s*([-+0-9.eE]+)\s*(%?)\s*$")
+
+
+@dataclass
+class Slo:
+    """A threshold of a statistic of one operation or, without an
+    operation, of all lifecycle operations (count, errors, error_rate)."""
+
+    operation: str | None
+    statistic: str
+    comparison: str
+    threshold: float
+
+    @property
+    def metric(self) -> str:
+        return f"{self.operation}.{self.statistic}" if self.operation else self.statistic
+
+    def __str__(self) -> str:
+        return f"{self.metric} {self.comparison} {self.threshold:g}"
+
+    def check(self, value: float) -> bool:
+        return SLO_COMPARISONS[self.comparison](value, self.threshold)
+
+
+@dataclass
+class SloResult:
+    slo: Slo
+    value: float | None
+    passed: bool
+
+
+def parse_slos(value: list[str] | dict | None) -> list[Slo]:
+    """Parse METRIC<VALUE thresholds (CLI) or a METRIC: "<VALUE" mapping (profile).
+
+    A metric is ``<operation>.<statistic>`` or one of count, errors and
+    error_rate of the lifecycle operations of the run, e.g. ``server_wait_active.p95<60`` or
+    ``error_rate<1%``.
+    """
+    if not value:
+        return []
+    if isinstance(value, dict):
+        value = [f"{metric} {threshold}" for metric, threshold in value.items()]
+
+    slos = []
+    for item in value:
+        match = _SLO_PATTERN.match(str(item))
+        if not match:
+            raise ValueError(f"Invalid value '{item}', expected METRIC<VALUE")
+        metric, comparison, threshold, percent = match.groups()
+        operation, _, statistic = metric.partition(".")
+        if not statistic:
+            operation, statistic = None, metric
+            if statistic not in ("count", "errors", "error_rate"):
+                raise ValueError(
+                    f"Unknown metric '{metric}', expected OPERATION.STATISTIC,"
+                    " count, errors or error_rate"
+                )
+        elif statistic not in SLO_STATISTICS:
+            raise ValueError(
+                f"Unknown statistic '{statistic}', expected one of"
+                f" {', '.join(SLO_STATISTICS)}"
+            )
+        try:
+            number = float(threshold)
+        except ValueError:
+            raise ValueError(f"Invalid threshold '{threshold}' of {metric}")
+        slos.append(Slo(operation, statistic, comparison, number / 100 if percent else number))
+    return slos
+
+
+class TraceWriter:
+    """Stream the report records to a Chrome trace event file.
+
+    Every record becomes a complete event on the track of the thread that
+    recorded it, written as soon as it is recorded. The file is a JSON array
+    that ``close`` terminates, Perfetto and chrome://tracing also open the
+    file of an interrupted run.
+    """
+
+    def __init__(self, path: str | Path, run_id: str = ""):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = self.path.open("w", encoding="utf-8")
+        self._threads: dict[int, int] = {}
+        self._pid = os.getpid()
+        self._separator = ""
+        self._file.write("[")
+        self._event(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self._pid,
+                "args": {"name": f"openstack-simple-stress {run_id}".rstrip()},
+            }
+        )
+
+    def _event(self, event: dict) -> None:
+        self._file.write(self._separator + json.dumps(event))
+        self._separator = ",\n"
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        tid = self._threads.get(ident)
+        if tid is None:
+            tid = self._threads[ident] = len(self._threads) + 1
+            self._event(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": threading.current_thread().name},
+                }
+            )
+        return tid
+
+    def span(
+        self,
+        operation: str,
+        resource_name: str,
+        start: float,
+        duration: float,
+        success: bool,
+        error_type: str | None = None,
+    ) -> None:
+        """Write one span on the track of the calling thread."""
+        args: dict = {"resource": resource_name, "success": success}
+        if error_type:
+            args["error_type"] = error_type
+        event = {
+            "name": operation,
+            "cat": "operation" if success else "operation,error",
+            "ph": "X",
+            "ts": round(start * 1e6),
+            "dur": round(duration * 1e6),
+            "pid": self._pid,
+            "args": args,
+        }
+        with self._lock:
+            if self._file.closed:
+                return
+            event["tid"] = self._tid()
+            self._event(event)
+
+    def counter(self, name: str, timestamp: float, values: dict) -> None:
+        """Write the values of a counter track."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._event(
+                {
+                    "name": name,
+                    "ph": "C",
+                    "ts": round(timestamp * 1e6),
+                    "pid": self._pid,
+                    "args": values,
+                }
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.write("]\n")
+                self._file.close()
+
+
+def _split_resource_name(name: str) -> tuple[tuple[str, str | None], int]:
+    """Split a resource name into its template and lifecycle number.
+
+    The number is the first numeric segment, e.g. ``simple-stress-17-volume-0``
+    becomes ``(("simple-stress-", "-volume-0"), 17)``. Names without one are
+    their own template.
+    """
+    match = RESOURCE_NUMBER_RE.search(name)
+    if match is None:
+        return (name, None), 0
+    return (name[:match.start()], name[match.end():]), int(match.group())
 
 
 class Report:
+    """Collects the operation records of a run.
+
+    Records are stored column-wise: operation names and resource name
+    templates (the name without the lifecycle number, shared by all
+    lifecycles) are interned and referenced by index, lifecycle numbers are
+    ``array('I')``, durations and start times ``array('d')``, failures a
+    bitset. Errors and retries are rare and kept in sparse tables keyed by
+    the record index. ``records()`` returns ``OperationRecord`` views. With
+    a ``trace`` every record is also streamed to a trace file.
+    """
 
     def __init__(self):
         self._lock = threading.Lock()
-        self._records: list[OperationRecord] = []
+        self._operation_index: dict[str, int] = {}
+        self._operation_names: list[str] = []
+        self._template_index: dict[tuple[str, str | None], int] = {}
+        self._templates: list[tuple[str, str | None]] = []
+        # A few dozen operation names and name templates, but any number of
+        # lifecycles
+        self._operations = array("H")
+        self._resources = array("I")
+        self._numbers = array("I")
+        self._durations = array("d")
+        self._starts = array("d")
+        self._failed = bytearray()
+        self._errors: dict[int, tuple[str | None, str | None]] = {}
+        self._retries: dict[int, int] = {}
+        # Operations cut short by an abort are counted, not recorded
+        self._cancelled: dict[str, int] = {}
         self.start_time: float = time.time()
         self.end_time: float | None = None
         self.params: dict = {}
+        self.trace: TraceWriter | None = None
+        # Current in-flight operations and lifecycle gauges, and count, sum
+        # and peak of every sampled gauge
+        self._in_flight: dict[str, int] = {}
+        self._gauges: dict[str, int] = {}
+        self._sample_count = 0
+        self._samples: dict[str, list[float]] = {}
 
     def record(
         self,
@@ -219,35 +929,319 @@ class Report:
         duration: float,
         success: bool,
         error: str | None = None,
+        error_type: str | None = None,
+        retries: int = 0,
+        start: float | None = None,
     ) -> None:
+        if start is None:
+            start = time.time() - duration
+        template, number = _split_resource_name(resource_name)
         with self._lock:
-            self._records.append(
-                OperationRecord(operation, resource_name, duration, success, error)
+            recorded = self._append(
+                operation,
+                template,
+                number,
+                duration,
+                success,
+                error,
+                error_type,
+                retries,
+                start,
             )
+        # Written outside of the lock, recording stays cheap for the workers
+        if recorded and self.trace is not None:
+            self.trace.span(operation, resource_name, start, duration, success, error_type)
+
+    def _append(
+        self,
+        operation: str,
+        template: tuple[str, str | None],
+        number: int,
+        duration: float,
+        success: bool,
+        error: str | None,
+        error_type: str | None,
+        retries: int,
+        start: float,
+    ) -> bool:
+        # Called with the lock held
+        if not success and error_type == WaitCancelled.__name__:
+            self._cancelled[operation] = self._cancelled.get(operation, 0) + 1
+            return False
+        index = len(self._durations)
+        operation_id = self._operation_index.get(operation)
+        if operation_id is None:
+            operation_id = self._operation_index[operation] = len(self._operation_names)
+            self._operation_names.append(operation)
+        template_id = self._template_index.get(template)
+        if template_id is None:
+            template_id = self._template_index[template] = len(self._templates)
+            self._templates.append(template)
+
+        self._operations.append(operation_id)
+        self._resources.append(template_id)
+        self._numbers.append(number)
+        self._durations.append(duration)
+        self._starts.append(start)
+        if index % 8 == 0:
+            self._failed.append(0)
+        if not success:
+            self._failed[index >> 3] |= 1 << (index & 7)
+        if error is not None or error_type is not None:
+            self._errors[index] = (error, error_type)
+        if retries:
+            self._retries[index] = retries
+        return True
+
+    def _resource_name(self, index: int) -> str:
+        head, tail = self._templates[self._resources[index]]
+        if tail is None:
+            return head
+        return f"{head}{self._numbers[index]}{tail}"
+
+    def _failed_indexes(self) -> list[int]:
+        return [
+            byte_index * 8 + bit
+            for byte_index, byte in enumerate(self._failed)
+            if byte
+            for bit in range(8)
+            if byte & (1 << bit)
+        ]
+
+    def _view(self, index: int) -> OperationRecord:
+        error, error_type = self._errors.get(index, (None, None))
+        return OperationRecord(
+            self._operation_names[self._operations[index]],
+            self._resource_name(index),
+            self._durations[index],
+            not self._failed[index >> 3] & (1 << (index & 7)),
+            error,
+            error_type,
+            self._retries.get(index, 0),
+            self._starts[index],
+        )
+
+    def records(self) -> list[OperationRecord]:
+        with self._lock:
+            return [self._view(index) for index in range(len(self._durations))]
+
+    def cancelled(self) -> dict[str, int]:
+        """Number of operations per type that were cancelled by an abort."""
+        with self._lock:
+            return dict(self._cancelled)
+
+    def iter_records(self) -> Iterable[OperationRecord]:
+        """Views of the records one by one, for a finished report."""
+        for index in range(len(self._durations)):
+            yield self._view(index)
+
+    def operation_stats(self) -> tuple[dict[str, DurationStats], dict[str, int]]:
+        """Duration statistics and number of errors per operation."""
+        with self._lock:
+            stats = _aggregate(self._operation_names, self._operations, self._durations)
+            errors: dict[str, int] = {}
+            for index in self._failed_indexes():
+                name = self._operation_names[self._operations[index]]
+                errors[name] = errors.get(name, 0) + 1
+        return stats, errors
+
+    def adjust(self, gauge: str, delta: int) -> None:
+        """Change a gauge, e.g. the number of queued lifecycles."""
+        with self._lock:
+            self._gauges[gauge] = self._gauges.get(gauge, 0) + delta
+
+    def gauges(self) -> tuple[dict[str, int], dict[str, int]]:
+        """The current gauges and the in-flight operations per type."""
+        with self._lock:
+            return dict(self._gauges), dict(self._in_flight)
+
+    def add_sample(self, timestamp: float, sample: dict[str, dict[str, float]]) -> None:
+        """Aggregate one sample of grouped gauges, e.g. ``{"driver": {"cpu": 0.5}}``.
+
+        Gauges missing from a sample count as zero, every group also becomes
+        a counter track of the trace.
+        """
+        with self._lock:
+            self._sample_count += 1
+            for group, values in sample.items():
+                for name, value in values.items():
+                    stats = self._samples.setdefault(f"{group}.{name}", [0.0, 0.0])
+                    stats[0] += value
+                    stats[1] = max(stats[1], value)
+        if self.trace is not None:
+            for group, values in sample.items():
+                self.trace.counter(group, timestamp, values)
+
+    def sample_stats(self) -> dict[str, tuple[float, float]]:
+        """Mean and peak of every sampled gauge."""
+        with self._lock:
+            return {
+                name: (total / self._sample_count, peak)
+                for name, (total, peak) in self._samples.items()
+            }
 
     @contextmanager
     def track(self, operation: str, resource_name: str):
+        """Measure the block, the yielded record collects the retries."""
         start = time.time()
+        record = OperationRecord(operation, resource_name, 0.0, True, start=start)
+        with self._lock:
+            self._in_flight[operation] = self._in_flight.get(operation, 0) + 1
         try:
-            yield
-            self.record(operation, resource_name, time.time() - start, True)
+            with logger.contextualize(operation=operation):
+                yield record
         except Exception as e:
-            self.record(operation, resource_name, time.time() - start, False, str(e))
+            record.success = False
+            record.error = str(e)
+            record.error_type = classify_error(e)
             raise
+        finally:
+            record.duration = time.time() - start
+            with self._lock:
+                self._in_flight[operation] -= 1
+            self.record(
+                record.operation,
+                record.resource_name,
+                record.duration,
+                record.success,
+                record.error,
+                record.error_type,
+                record.retries,
+                start,
+            )
+
+    def record_phases(
+        self,
+        prefix: str,
+        resource_name: str,
+        transitions: list[tuple[float, str | None]],
+        end: float,
+    ) -> None:
+        """Record how long a resource spent in each observed phase.
+
+        Every phase lasts from the poll that first saw it until the next
+        change, the last one until ``end``. Phases without a name (e.g. an
+        empty task_state) and phases first seen at ``end`` (the target status
+        itself) are not recorded.
+        """
+        transitions = [t for t in transitions if t[0] < end]
+        for (start, phase), (stop, _) in zip(transitions, transitions[1:] + [(end, None)]):
+            if phase:
+                self.record(f"{prefix}_{phase}", resource_name, stop - start, True)
 
     def finalize(self) -> None:
         self.end_time = time.time()
 
-    def print_report(self) -> None:
-        if not self._records:
-            return
+    def corrected_durations(self) -> dict[str, list[float]]:
+        """Durations per operation measured from the intended start (--rate).
+
+        The operations a lifecycle starts when it is due (the server and
+        volume creates, see ``SCHEDULED_OPERATIONS``) are delayed by the lag
+        of the lifecycle, adding it corrects for the operations that were
+        never started while the cloud stalled (coordinated omission). Later
+        operations of the lifecycle (waits, attachments, deletes, ...) did
+        not wait for the schedule and, like records outside of lifecycles
+        (network, cleanup), are not corrected.
+        """
+        lag_id = self._operation_index.get("schedule_lag")
+        lags = {
+            self._resource_name(index): self._durations[index]
+            for index, operation in enumerate(self._operations)
+            if operation == lag_id
+        }
+        scheduled = {
+            self._operation_index[name]
+            for name in SCHEDULED_OPERATIONS
+            if name in self._operation_index
+        }
+
+        corrected: dict[str, list[float]] = {}
+        for index, (operation, duration) in enumerate(
+            zip(self._operations, self._durations)
+        ):
+            if operation == lag_id:
+                continue
+            if operation in scheduled:
+                # Resources are named after their lifecycle, e.g.
+                # <lifecycle>-volume-0
+                name = self._resource_name(index)
+                while name and name not in lags:
+                    name = name.rpartition("-")[0]
+                if name:
+                    duration += lags[name]
+            corrected.setdefault(self._operation_names[operation], []).append(duration)
+        return corrected
+
+    def evaluate(self, slos: list[Slo]) -> list[SloResult]:
+        """Check the SLOs against the records, metrics without records fail."""
+        if not slos:
+            return []
+        stats, errors = self.operation_stats()
+
+        percentiles = {f"p{q * 100:g}": q for q in PERCENTILES}
+        results = []
+        for slo in slos:
+            value: float | None = None
+            if slo.operation is None:
+                count = sum(stats[op].count for op in SLO_LIFECYCLE_OPERATIONS if op in stats)
+                error_count = sum(errors.get(op, 0) for op in SLO_LIFECYCLE_OPERATIONS)
+                value = {
+                    "count": count,
+                    "errors": error_count,
+                    "error_rate": error_count / count if count else None,
+                }[slo.statistic]
+            elif slo.operation in stats:
+                op_stats = stats[slo.operation]
+                error_count = errors.get(slo.operation, 0)
+                if slo.statistic in percentiles:
+                    value = op_stats.percentiles[percentiles[slo.statistic]]
+                elif slo.statistic == "errors":
+                    value = error_count
+                elif slo.statistic == "error_rate":
+                    value = error_count / op_stats.count
+                else:
+                    value = getattr(op_stats, slo.statistic)
+            results.append(SloResult(slo, value, value is not None and slo.check(value)))
+        return results
+
+    def slo_summary(self, results: list[SloResult]) -> dict:
+        """Machine-readable outcome of a run with SLOs."""
+        return {
+            "run_id": self.params.get("run_id"),
+            "passed": all(r.passed for r in results),
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "slos": [
+                {
+                    "slo": str(r.slo),
+                    "metric": r.slo.metric,
+                    "comparison": r.slo.comparison,
+                    "threshold": r.slo.threshold,
+                    "value": r.value,
+                    "passed": r.passed,
+                }
+                for r in results
+            ],
+        }
+
+    def print_report(self, slo_results: list[SloResult] | None = None) -> None:
+        from rich.console import Console
+        from rich.table import Table
 
         console = Console()
+        if not self._durations:
+            # Nothing ran, the SLOs failing on that still decide the exit code
+            if slo_results:
+                self._print_slos(console, slo_results)
+            return
+
         total_runtime = (self.end_time or time.time()) - self.start_time
 
         # Determine status
-        errors = [r for r in self._records if not r.success]
-        if errors:
+        errors = [self._view(index) for index in self._failed_indexes()]
+        if slo_results and not all(r.passed for r in slo_results):
+            status = "FAILED SLOS"
+        elif errors:
             status = "COMPLETED WITH ERRORS"
         else:
             status = "COMPLETED"
@@ -266,7 +1260,9 @@ class Report:
             console.print(f"  Profile: {p.get('profile')}")
         console.print(
             f"  Instances: {p.get('number', '?')} (parallel: {p.get('parallel', '?')},"
-            f" mode: {p.get('mode', '?')})"
+            f" mode: {p.get('mode', '?')}, batch size: {p.get('batch_create', 1)}"
+            + (f", rate: {p['rate']}/s" if p.get("rate") else "")
+            + ")"
         )
         console.print(
             f"  Flavor: {p.get('flavor', '?')} | Image: {p.get('image', '?')}"
@@ -274,7 +1270,8 @@ class Report:
         console.print(
             f"  Volumes per instance: {p.get('volume_number', '?')}"
             f" (size: {p.get('volume_size', '?')} GB,"
-            f" type: {p.get('volume_type', '?')})"
+            f" type: {p.get('volume_type', '?')},"
+            f" attach concurrency: {p.get('attach_concurrency', 1)})"
         )
         console.print(
             f"  Boot from volume: {'yes' if p.get('boot_from_volume') else 'no'}"
@@ -287,6 +1284,9 @@ class Report:
             f" | Cleanup: {'yes' if p.get('cleanup') else 'no'}"
         )
         console.print(f"  Status: {status}")
+        if self._cancelled:
+            cancelled = ", ".join(f"{op} {n}" for op, n in sorted(self._cancelled.items()))
+            console.print(f"  Cancelled by the abort: {cancelled}")
         console.print()
         console.print(f"Total Runtime: {total_runtime:.2f}s")
         console.print("=" * 80)
@@ -296,11 +1296,29 @@ class Report:
             "network_create",
             "subnet_create",
             "server_group_create",
+            "schedule_lag",
             "server_create",
             "server_wait_active",
+            "server_phase_scheduling",
+            "server_phase_block_device_mapping",
+            "server_phase_networking",
+            "server_phase_spawning",
+            "server_action_create",
+            "server_action_conductor_schedule_and_build_instances",
+            "server_action_compute__do_build_and_run_instance",
             "server_wait_boot",
+            "guest_boot",
+            "guest_stage_init_local",
+            "guest_stage_init",
+            "guest_stage_modules_config",
+            "guest_stage_modules_final",
+            "boot_detection_delay",
             "volume_create",
             "volume_attach",
+            "volume_status_creating",
+            "volume_status_downloading",
+            "volume_status_reserved",
+            "volume_status_attaching",
             "server_delete",
             "volume_delete",
             "server_group_delete",
@@ -308,58 +1326,91 @@ class Report:
             "network_delete",
         ]
 
-        # Group records by operation
-        by_op: dict[str, list[OperationRecord]] = {}
-        for r in self._records:
-            by_op.setdefault(r.operation, []).append(r)
+        # The columns are aggregated as they are, errors and retries are
+        # counted from the sparse tables
+        stats = _aggregate(self._operation_names, self._operations, self._durations)
+        counts = {op: [0, 0] for op in stats}
+        for r in errors:
+            counts[r.operation][0] += 1
+        for index, retries in self._retries.items():
+            counts[self._operation_names[self._operations[index]]][1] += retries
+
+        # Only shown with --rate, relative to the intended start
+        corrected = {}
+        if "schedule_lag" in counts:
+            corrected_durations = self.corrected_durations()
+            corrected = duration_stats(
+                [op for op, values in corrected_durations.items() for _ in values],
+                [d for values in corrected_durations.values() for d in values],
+            )
 
-        # Build table
+        # Build tables, the percentiles get their own to fit the terminal
         table = Table(title="Operation Statistics")
         table.add_column("Operation", style="cyan")
         table.add_column("Count", justify="right")
         table.add_column("Errors", justify="right", style="red")
         table.add_column("Avg (s)", justify="right")
+        table.add_column("Std (s)", justify="right")
         table.add_column("Min (s)", justify="right")
         table.add_column("Max (s)", justify="right")
-        table.add_column("Med (s)", justify="right")
-        table.add_column("P95 (s)", justify="right")
+        # Only shown with a retry policy, the table is wide enough already
+        show_retries = any(retries for _, retries in counts.values())
+        if show_retries:
+            table.add_column("Retries", justify="right")
+
+        percentile_table = Table(title="Latency Percentiles")
+        percentile_table.add_column("Operation", style="cyan")
+        for q in PERCENTILES:
+            percentile_table.add_column(f"P{q * 100:g} (s)", justify="right")
+        if corrected:
+            percentile_table.add_column("P95 corr. (s)", justify="right")
+            percentile_table.add_column("P99 corr. (s)", justify="right")
 
         total_count = 0
         total_errors = 0
+        total_retries = 0
 
         # Add rows in logical order, then any extras
-        ordered_ops = [op for op in op_order if op in by_op]
-        extra_ops = [op for op in by_op if op not in op_order]
+        ordered_ops = [op for op in op_order if op in counts]
+        extra_ops = [op for op in counts if op not in op_order]
         for op in ordered_ops + extra_ops:
-            records = by_op[op]
-            durations = [r.duration for r in records]
-            err_count = sum(1 for r in records if not r.success)
-            total_count += len(records)
-            total_errors += err_count
-
-            avg = statistics.mean(durations)
-            med = statistics.median(durations)
-            mn = min(durations)
-            mx = max(durations)
-            if len(durations) >= 2:
-                p95 = statistics.quantiles(durations, n=20)[-1]
-            else:
-                p95 = durations[0]
+            op_stats = stats[op]
+            err_count, retries = counts[op]
+            # Derived records repeat the time of the lifecycle operations
+            if op in SLO_LIFECYCLE_OPERATIONS:
+                total_count += op_stats.count
+                total_errors += err_count
+                total_retries += retries
 
             err_style = "red" if err_count > 0 else ""
             table.add_row(
                 op,
-                str(len(records)),
+                str(op_stats.count),
                 (
                     f"[{err_style}]{err_count}[/{err_style}]"
                     if err_style
                     else str(err_count)
                 ),
-                f"{avg:.2f}",
-                f"{mn:.2f}",
-                f"{mx:.2f}",
-                f"{med:.2f}",
-                f"{p95:.2f}",
+                f"{op_stats.mean:.2f}",
+                f"{op_stats.stdev:.2f}",
+                f"{op_stats.min:.2f}",
+                f"{op_stats.max:.2f}",
+                *([str(retries)] if show_retries else []),
+            )
+
+            corrected_columns = []
+            if corrected:
+                if op in corrected:
+                    corrected_columns = [
+                        f"{corrected[op].percentiles[0.95]:.2f}",
+                        f"{corrected[op].percentiles[0.99]:.2f}",
+                    ]
+                else:
+                    corrected_columns = ["", ""]
+            percentile_table.add_row(
+                op,
+                *(f"{op_stats.percentiles[q]:.2f}" for q in PERCENTILES),
+                *corrected_columns,
             )
 
         table.add_section()
@@ -371,11 +1422,42 @@ class Report:
             "",
             "",
             "",
-            "",
+            *([str(total_retries)] if show_retries else []),
         )
 
         console.print()
         console.print(table)
+        console.print()
+        console.print(percentile_table)
+
+        samples = self.sample_stats()
+        if samples:
+            self._print_saturation(console, samples)
+
+        if slo_results:
+            self._print_slos(console, slo_results)
+
+        # Errors grouped by operation, exception class and HTTP status
+        if errors:
+            by_type: dict[tuple[str, str], list[OperationRecord]] = {}
+            for r in errors:
+                by_type.setdefault((r.operation, r.error_type or "-"), []).append(r)
+
+            type_table = Table(title="Errors by Type")
+            type_table.add_column("Operation", style="cyan")
+            type_table.add_column("Error", style="red")
+            type_table.add_column("Count", justify="right")
+            type_table.add_column("Retries", justify="right")
+            for (op, error_type), records in sorted(by_type.items()):
+                type_table.add_row(
+                    op,
+                    error_type,
+                    str(len(records)),
+                    str(sum(r.retries for r in records)),
+                )
+
+            console.print()
+            console.print(type_table)
 
         # Error details
         if errors:
@@ -387,6 +1469,68 @@ class Report:
         console.print("=" * 80)
         console.print()
 
+    def _print_slos(self, console: Console, slo_results: list[SloResult]) -> None:
+        """The evaluated SLOs, a value of ``-`` means nothing was measured."""
+        from rich.table import Table
+
+        slo_table = Table(title="SLOs")
+        slo_table.add_column("SLO", style="cyan")
+        slo_table.add_column("Value", justify="right")
+        slo_table.add_column("Result")
+        for r in slo_results:
+            slo_table.add_row(
+                str(r.slo),
+                "-" if r.value is None else f"{r.value:.4g}",
+                "[green]PASS[/green]" if r.passed else "[red]FAIL[/red]",
+            )
+        console.print()
+        console.print(slo_table)
+
+    def _print_saturation(
+        self, console: Console, samples: dict[str, tuple[float, float]]
+    ) -> None:
+        """The sampled load of the driver, warn if it limited the run."""
+        from rich.table import Table
+
+        parallel = self.params.get("parallel", "?")
+        table = Table(title="Client Saturation")
+        table.add_column("Gauge", style="cyan")
+        table.add_column("Mean", justify="right")
+        table.add_column("Max", justify="right")
+
+        rows = [
+            (f"Workers busy (of {parallel})", "workers.busy", 1),
+            ("Lifecycles queued", "workers.queued", 1),
+        ]
+        rows += [
+            (f"In flight: {name[len('in_flight.'):]}", name, 1)
+            for name in sorted(samples)
+            if name.startswith("in_flight.")
+        ]
+        rows += [
+            ("Driver CPU (% of a core)", "driver.cpu", 100),
+            ("Driver threads", "driver.threads", 1),
+        ]
+        for label, name, scale in rows:
+            mean, peak = samples.get(name, (0.0, 0.0))
+            table.add_row(label, f"{mean * scale:.1f}", f"{peak * scale:.1f}")
+
+        console.print()
+        console.print(table)
+
+        cpu_share = samples.get("saturated.cpu", (0.0, 0.0))[0]
+        if cpu_share >= 0.1:
+            console.print(
+                f"[yellow]Warning: the driver CPU was saturated in {cpu_share:.0%} of the"
+                " samples, the results may be limited by this host rather than the cloud[/yellow]"
+            )
+        workers_share = samples.get("saturated.workers", (0.0, 0.0))[0]
+        if workers_share >= 0.5:
+            console.print(
+                f"[yellow]Warning: all {parallel} workers were busy with lifecycles queued in"
+                f" {workers_share:.0%} of the samples, the load was limited by --parallel[/yellow]"
+            )
+
 
 def block_storage(
     os_cloud: openstack.connection.Connection,
@@ -396,102 +1540,1641 @@ def block_storage(
     The SDK types this attribute as a union of the v2 and v3 proxy, only the
     v3 API is used here.
     """
-    return cast(openstack.block_storage.v3._proxy.Proxy, os_cloud.block_storage)
-
-
-class Cloud:
+    return cast("openstack.block_storage.v3._proxy.Proxy", os_cloud.block_storage)
 
-    def __init__(self, cloud_name: str, flavor_name: str, image_name: str):
-        self.os_cloud = openstack.connect(cloud=cloud_name)
 
-        logger.info(f"Checking flavor {flavor_name}")
-        self.os_flavor = self.os_cloud.get_flavor(flavor_name)
-        if self.os_flavor is None:
-            logger.error(f"Flavor '{flavor_name}' not found")
-            sys.exit(1)
-        logger.info(f"flavor.id = {self.os_flavor.id}")
+class StatusPoller:
+    """Track the status of many resources with one list call per interval.
 
-        logger.info(f"Checking image {image_name}")
-        self.os_image = self.os_cloud.get_image(image_name)
-        if self.os_image is None:
-            logger.error(f"Image '{image_name}' not found")
-            sys.exit(1)
-        logger.info(f"image.id = {self.os_image.id}")
+    All waiters of a run share the poller, so waiting for N resources costs a
+    single API call per interval instead of N. The polling thread only runs
+    while somebody is waiting.
 
+    If ``phase_attribute`` is set, every change of that attribute of a
+    watched resource is remembered with the time of the poll that saw it.
 
-class Instance:
+    Resources whose ID is not known yet (e.g. the boot volume nova creates
+    for a server) can be tracked through their owner: ``owners_of`` returns
+    the owner IDs of a listed resource, see ``watch_owners()``.
+    """
 
     def __init__(
         self,
-        cloud: Cloud,
-        name: str,
-        user_data: str,
-        compute_zone: str,
-        server_group: openstack.compute.v2.server_group.ServerGroup,
-        network: openstack.network.v2.network.Network,
-        meta: Meta,
-        boot_volume_size: int = 20,
-        storage_zone: str = "nova",
-        volume_type: str = "__DEFAULT__",
-        boot_from_volume: bool = True,
-        report: Report | None = None,
+        list_resources: Callable[[], Iterable],
+        interval: float,
+        phase_attribute: str | None = None,
+        owners_of: Callable[[Any], Iterable[str]] | None = None,
     ):
-        self.cloud = cloud
-
-        self.server = create_server(
-            self.cloud,
-            name,
-            user_data,
-            compute_zone,
-            server_group,
-            network,
-            meta,
-            boot_volume_size,
-            storage_zone,
-            volume_type,
-            boot_from_volume,
-            report=report,
-        )
-        self.server_name = name
+        self._list_resources = list_resources
+        self.interval = interval
+        self._phase_attribute = phase_attribute
+        self._owners_of = owners_of
+        self._cond = threading.Condition()
+        self._watched: dict[str, int] = {}
+        self._watched_owners: dict[str, int] = {}
+        self._owned: dict[str, str] = {}
+        self._status: dict[str, str] = {}
+        self._transitions: dict[str, list[tuple[float, str | None]]] = {}
+        self._polled_at: float = 0.0
+        self._thread: threading.Thread | None = None
+
+    def _poll(self) -> None:
+        while True:
+            with self._cond:
+                if not self._watched and not self._watched_owners:
+                    self._thread = None
+                    return
+                watched = set(self._watched)
+                owners = set(self._watched_owners)
+
+            polled_at = time.time()
+            try:
+                resources = list(self._list_resources())
+            except Exception as e:
+                logger.warning(f"Error polling resource status: {e}")
+                resources = None
+
+            with self._cond:
+                if resources is not None:
+                    self._status = {}
+                    for r in resources:
+                        owned = False
+                        if owners:
+                            for owner_id in self._owners_of(r):
+                                if owner_id in owners:
+                                    self._owned[owner_id] = r.id
+                                    owned = True
+                        if r.id not in watched and not owned:
+                            continue
+                        self._status[r.id] = r.status
+                        if self._phase_attribute:
+                            phase = getattr(r, self._phase_attribute, None)
+                            history = self._transitions.setdefault(r.id, [])
+                            if not history or history[-1][1] != phase:
+                                history.append((polled_at, phase))
+                    self._polled_at = polled_at
+                    self._cond.notify_all()
+
+            time.sleep(self.interval)
+
+    def _start(self) -> None:
+        # Called with the condition held
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+
+    def watch_owners(self, owner_ids: list[str]) -> None:
+        """Track the phases of the resources owned by the given IDs."""
+        with self._cond:
+            for owner_id in owner_ids:
+                self._watched_owners[owner_id] = self._watched_owners.get(owner_id, 0) + 1
+            if owner_ids:
+                self._start()
+
+    def unwatch_owners(self, owner_ids: list[str]) -> None:
+        with self._cond:
+            for owner_id in owner_ids:
+                self._watched_owners[owner_id] -= 1
+                if not self._watched_owners[owner_id]:
+                    del self._watched_owners[owner_id]
+                    resource_id = self._owned.pop(owner_id, None)
+                    if resource_id is not None and resource_id not in self._watched:
+                        self._transitions.pop(resource_id, None)
+
+    def owned(
+        self, owner_id: str, since: float
+    ) -> tuple[str, list[tuple[float, str | None]]] | None:
+        """Return the resource ID and phase changes of a watched owner.
+
+        Returns None if no polled resource belonged to the owner yet.
+        """
+        with self._cond:
+            resource_id = self._owned.get(owner_id)
+            if resource_id is None:
+                return None
+            return resource_id, [
+                t for t in self._transitions.get(resource_id, []) if t[0] >= since
+            ]
+
+    def wait_for(
+        self,
+        resource_ids: list[str],
+        status: str,
+        timeout: float,
+        reached: dict[str, float] | None = None,
+        failures: tuple[str, ...] = ("error",),
+        transitions: dict[str, list[tuple[float, str | None]]] | None = None,
+    ) -> dict[str, float]:
+        """Block until all resources have the given status.
+
+        Returns the time at which each resource was first seen in the status.
+        The optional ``reached`` dict is filled in place, so callers can tell
+        which resources made it if the wait fails. The optional
+        ``transitions`` dict receives the ``(time, phase)`` changes seen
+        during the wait.
+        """
+        import openstack
+
+        if reached is None:
+            reached = {}
+        start = time.time()
+        deadline = start + timeout
 
-        self.volumes: List[openstack.block_storage.v3.volume.Volume] = []
+        with self._cond:
+            for resource_id in resource_ids:
+                self._watched[resource_id] = self._watched.get(resource_id, 0) + 1
+            self._start()
 
-    def add_volume(
-        self,
+            try:
+                while True:
+                    # Ignore statuses from polls started before this wait
+                    if self._polled_at >= start:
+                        for resource_id in resource_ids:
+                            current = self._status.get(resource_id)
+                            if resource_id in reached:
+                                continue
+                            if current == status:
+                                reached[resource_id] = self._polled_at
+                            elif current in failures:
+                                raise openstack.exceptions.ResourceFailure(
+                                    f"Resource {resource_id} transitioned to failure"
+                                    f" state {current}"
+                                )
+                    if len(reached) == len(resource_ids):
+                        return reached
+
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise openstack.exceptions.ResourceTimeout(
+                            f"Timeout waiting for {len(resource_ids) - len(reached)}"
+                            f" resource(s) to transition to {status}"
+                        )
+                    self._cond.wait(min(remaining, CANCEL_CHECK_INTERVAL))
+                    cancel_token.check()
+            finally:
+                for resource_id in resource_ids:
+                    if transitions is not None:
+                        transitions[resource_id] = [
+                            t
+                            for t in self._transitions.get(resource_id, [])
+                            if t[0] >= start
+                        ]
+                    self._watched[resource_id] -= 1
+                    if not self._watched[resource_id]:
+                        del self._watched[resource_id]
+                        self._transitions.pop(resource_id, None)
+
+
+class TokenBucket:
+    """Allow ``rate`` requests per second with bursts of up to ``rate``."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until it is available. Returns the wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Reserve the token now and sleep outside of the lock, so that
+            # waiters are served in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def _parse_pairs(value: list[str] | dict | None, syntax: str) -> list[tuple[str, str]]:
+    """Split KEY=VALUE options (CLI) or return the items of a mapping (profile)."""
+    if not value:
+        return []
+    if isinstance(value, dict):
+        return [(str(k).strip(), v) for k, v in value.items()]
+
+    pairs = []
+    for item in value:
+        key, sep, val = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid value '{item}', expected {syntax}")
+        pairs.append((key.strip(), val))
+    return pairs
+
+
+def parse_rate_limits(value: list[str] | dict[str, float] | None) -> dict[str, float]:
+    """Parse SERVICE=RATE pairs (CLI) or a SERVICE: RATE mapping (profile)."""
+    limits = {}
+    for service, rate in _parse_pairs(value, "SERVICE=RATE"):
+        rate = float(rate)
+        if rate <= 0:
+            raise ValueError(f"Rate limit of {service} must be greater than 0")
+        limits[service] = rate
+    return limits
+
+
+def parse_retries(value: list[str] | dict[str, int] | None) -> dict[str, int]:
+    """Parse OPERATION=RETRIES pairs (CLI) or a mapping (profile)."""
+    attempts = {}
+    for operation, retries in _parse_pairs(value, "OPERATION=RETRIES"):
+        if operation not in RETRYABLE_OPERATIONS:
+            raise ValueError(
+                f"Unknown operation '{operation}', expected one of"
+                f" {', '.join(RETRYABLE_OPERATIONS)}"
+            )
+        retries = int(retries)
+        if retries < 0:
+            raise ValueError(f"Retries of {operation} must not be negative")
+        attempts[operation] = retries
+    return attempts
+
+
+def parse_http_pool_sizes(value: list[str] | dict[str, int] | None) -> dict[str, int]:
+    """Parse SERVICE=SIZE pairs (CLI) or a SERVICE: SIZE mapping (profile)."""
+    sizes = {}
+    for service, size in _parse_pairs(value, "SERVICE=SIZE"):
+        if service not in POOLED_SERVICES:
+            raise ValueError(
+                f"Unknown service '{service}', expected one of"
+                f" {', '.join(POOLED_SERVICES)}"
+            )
+        size = int(size)
+        if size < 1:
+            raise ValueError(f"HTTP pool size of {service} must be at least 1")
+        sizes[service] = size
+    return sizes
+
+
+def _retry_after(response) -> float | None:
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestThrottle:
+    """Rate limit API requests per service and retry throttled requests.
+
+    The limits are shared by all workers. With ``retries``, requests
+    answered with 429 or 503 (POST only with 429) are retried after the
+    ``Retry-After`` time the cloud asks for, or with exponential back-off.
+    Time spent waiting for our own limits and for the cloud is recorded
+    separately as ``api_throttled_<service>`` and ``api_retry_<service>``.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, float],
+        retries: int,
+        report: Report | None = None,
+    ):
+        self._buckets = {service: TokenBucket(rate) for service, rate in limits.items()}
+        self.retries = retries
+        self.report = report
+
+    def install(self, os_cloud: openstack.connection.Connection) -> None:
+        """Send all requests of the connection through the throttle."""
+        session = os_cloud.session
+        send = session.request
+
+        def request(url, method, **kwargs):
+            endpoint_filter = kwargs.get("endpoint_filter") or {}
+            service = endpoint_filter.get("service_type") or "other"
+            return self.request(send, service, url, method, **kwargs)
+
+        session.request = request
+
+    def _record(self, operation: str, service: str, name: str, duration: float) -> None:
+        if self.report:
+            op_service = re.sub(r"[^a-z0-9]+", "_", service.lower())
+            self.report.record(f"{operation}_{op_service}", name, duration, True)
+
+    def request(self, send: Callable, service: str, url: str, method: str, **kwargs):
+        from keystoneauth1.exceptions.http import HttpError
+
+        bucket = self._buckets.get(service)
+        throttled = (
+            POST_THROTTLED_STATUS_CODES
+            if method.upper() == "POST"
+            else THROTTLED_STATUS_CODES
+        )
+        attempt = 0
+        while True:
+            if bucket:
+                waited = bucket.acquire()
+                if waited > 0:
+                    self._record("api_throttled", service, method, waited)
+
+            try:
+                response = send(url, method, **kwargs)
+                status = response.status_code
+            except HttpError as e:
+                if attempt >= self.retries or e.http_status not in throttled:
+                    raise
+                response = e.response
+                status = e.http_status
+            else:
+                if attempt >= self.retries or status not in throttled:
+                    return response
+
+            delay = _retry_after(response)
+            if delay is None:
+                delay = min(RETRY_BACKOFF * 2**attempt, RETRY_BACKOFF_MAX)
+            attempt += 1
+            logger.warning(
+                f"{method} {url} returned {status}, retry {attempt}/{self.retries} in {delay:.1f}s"
+            )
+            self._record("api_retry", service, f"{method} {status}", delay)
+            if method.upper() == "DELETE":
+                time.sleep(delay)
+            else:
+                # Aborted runs do not wait for the cloud
+                cancel_token.sleep(delay)
+
+
+def cache_directory() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "openstack-simple-stress"
+
+
+def data_directory() -> Path:
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(data_home) / "openstack-simple-stress"
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+class ResourceCache:
+    """Remember the IDs flavor and image names resolved to.
+
+    Resolving a name lists all flavors or images, which is slow on clouds
+    with many public images. Cached IDs are looked up directly until they
+    are older than ``ttl`` seconds; ``refresh`` ignores the cached IDs.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl: float = RESOURCE_CACHE_TTL,
+        refresh: bool = False,
+    ):
+        self.path = path or cache_directory() / "resources.json"
+        self.ttl = ttl
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        try:
+            self._entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, cloud_name: str, kind: str, name: str) -> str | None:
+        if self.refresh:
+            return None
+        with self._lock:
+            entry = self._entries.get(cloud_name, {}).get(kind, {}).get(name)
+        if not entry or time.time() - entry["time"] > self.ttl:
+            return None
+        return entry["id"]
+
+    def put(self, cloud_name: str, kind: str, name: str, resource_id: str) -> None:
+        with self._lock:
+            kinds = self._entries.setdefault(cloud_name, {})
+            kinds.setdefault(kind, {})[name] = {"id": resource_id, "time": time.time()}
+            try:
+                self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+                self.path.write_text(json.dumps(self._entries, indent=2))
+            except OSError as e:
+                logger.warning(f"Could not write resource cache: {e}")
+
+
+class RunHistory:
+    """Results of previous runs in a SQLite database.
+
+    Every saved run stores its parameters and the statistics of every
+    operation, optionally also the records. Runs are compared by cloud and
+    profile (see ``profile_key()``), nightly runs of the same setup show a
+    drift of the cloud.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        run_id TEXT NOT NULL,
+        cloud TEXT,
+        profile TEXT,
+        start_time REAL NOT NULL,
+        end_time REAL,
+        params TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS runs_setup ON runs (cloud, profile, start_time);
+    CREATE TABLE IF NOT EXISTS operation_stats (
+        run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+        operation TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        errors INTEGER NOT NULL,
+        mean REAL NOT NULL,
+        stdev REAL NOT NULL,
+        min REAL NOT NULL,
+        max REAL NOT NULL,
+        p50 REAL NOT NULL,
+        p95 REAL NOT NULL,
+        p99 REAL NOT NULL,
+        PRIMARY KEY (run, operation)
+    );
+    CREATE TABLE IF NOT EXISTS records (
+        run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+        operation TEXT NOT NULL,
+        resource TEXT NOT NULL,
+        start REAL NOT NULL,
+        duration REAL NOT NULL,
+        success INTEGER NOT NULL,
+        error_type TEXT,
+        error TEXT,
+        retries INTEGER NOT NULL
+    );
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or data_directory() / "history.sqlite"
+
+    def _connect(self) -> sqlite3.Connection:
+        import sqlite3
+
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(self.SCHEMA)
+        return connection
+
+    def save(self, report: Report, records: bool = False) -> int:
+        """Add a finished run, returns its row ID."""
+        stats, errors = report.operation_stats()
+        connection = self._connect()
+        try:
+            with connection:
+                cursor = connection.execute(
+                    "INSERT INTO runs (run_id, cloud, profile, start_time, end_time, params)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        report.params.get("run_id") or "",
+                        report.params.get("cloud"),
+                        profile_key(report.params.get("profile")),
+                        report.start_time,
+                        report.end_time,
+                        json.dumps(report.params, default=str),
+                    ),
+                )
+                run = cast(int, cursor.lastrowid)
+                connection.executemany(
+                    "INSERT INTO operation_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            run,
+                            operation,
+                            s.count,
+                            errors.get(operation, 0),
+                            s.mean,
+                            s.stdev,
+                            s.min,
+                            s.max,
+                            s.percentiles[0.5],
+                            s.percentiles[0.95],
+                            s.percentiles[0.99],
+                        )
+                        for operation, s in stats.items()
+                    ),
+                )
+                if records:
+                    connection.executemany(
+                        "INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            (
+                                run,
+                                r.operation,
+                                r.resource_name,
+                                r.start,
+                                r.duration,
+                                r.success,
+                                r.error_type,
+                                r.error,
+                                r.retries,
+                            )
+                            for r in report.iter_records()
+                        ),
+                    )
+        finally:
+            connection.close()
+        return run
+
+    def runs(
+        self, cloud: str, profile: str | None, limit: int = HISTORY_RUNS
+    ) -> list[dict]:
+        """The last runs of a cloud and profile, oldest first.
+
+        Every run is a dict with run_id, start_time and the count, errors,
+        error_rate and p95 per operation.
+        """
+        if not self.path.exists():
+            return []
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT id, run_id, start_time FROM runs"
+                " WHERE cloud IS ? AND profile IS ?"
+                " ORDER BY start_time DESC LIMIT ?",
+                (cloud, profile_key(profile), limit),
+            ).fetchall()
+            runs = []
+            for run, run_id, start_time in reversed(rows):
+                operations = {
+                    operation: {
+                        "count": count,
+                        "errors": errors,
+                        "error_rate": errors / count,
+                        "p95": p95,
+                    }
+                    for operation, count, errors, p95 in connection.execute(
+                        "SELECT operation, count, errors, p95 FROM operation_stats"
+                        " WHERE run = ? ORDER BY operation",
+                        (run,),
+                    )
+                }
+                runs.append(
+                    {"run_id": run_id, "start_time": start_time, "operations": operations}
+                )
+        finally:
+            connection.close()
+        return runs
+
+
+def print_history(cloud: str, profile: str | None, runs: list[dict]) -> None:
+    """Show the p95 and error rate of every operation across runs."""
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    setup = f"{cloud} ({profile or 'no profile'})"
+    if not runs:
+        console.print(f"No runs of {setup} in the history")
+        return
+
+    console.print()
+    console.print(f"[bold]History of {setup}[/bold]")
+    operations = sorted({op for run in runs for op in run["operations"]})
+    for op in operations:
+        table = Table(title=op)
+        table.add_column("Run")
+        table.add_column("Started")
+        table.add_column("Count", justify="right")
+        table.add_column("P95 (s)", justify="right")
+        table.add_column("P95 change", justify="right")
+        table.add_column("Error rate", justify="right")
+
+        previous = None
+        for run in runs:
+            op_stats = run["operations"].get(op)
+            if op_stats is None:
+                continue
+            change = ""
+            if previous:
+                change = f"{(op_stats['p95'] - previous) / previous:+.0%}"
+            previous = op_stats["p95"]
+            error_rate = f"{op_stats['error_rate']:.1%}"
+            table.add_row(
+                run["run_id"],
+                datetime.fromtimestamp(run["start_time"]).strftime("%Y-%m-%d %H:%M"),
+                str(op_stats["count"]),
+                f"{op_stats['p95']:.2f}",
+                change,
+                f"[red]{error_rate}[/red]" if op_stats["errors"] else error_rate,
+            )
+
+        console.print()
+        console.print(table)
+
+
+class TokenCache:
+    """Keep the keystone token and service catalog between invocations.
+
+    The auth state is stored encrypted, with a key derived from the
+    passphrase in ``SIMPLE_STRESS_TOKEN_CACHE_KEY`` or, without it, a key
+    kept in the system keyring (requires the keyring package). Without a
+    key nothing is cached. Entries belong to the cloud, auth URL, user and
+    project; entries that expire soon are ignored, keystoneauth then
+    authenticates as usual.
+    """
+
+    def __init__(self, directory: Path | None = None):
+        self.directory = directory or cache_directory()
+        self._saved: dict[str, str] = {}
+        self._fernet_instance: Fernet | None = None
+        self._no_key = False
+
+    def _key(self) -> bytes | None:
+        from cryptography.fernet import Fernet
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+        passphrase = os.environ.get(TOKEN_CACHE_KEY_ENV)
+        if passphrase:
+            # The salt is not secret, it only makes the key unique to the cache
+            salt_file = self.directory / "token-cache.salt"
+            if not salt_file.exists():
+                fd = os.open(salt_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(os.urandom(16))
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=salt_file.read_bytes(),
+                iterations=TOKEN_CACHE_KDF_ITERATIONS,
+            )
+            return base64.urlsafe_b64encode(kdf.derive(passphrase.encode("utf-8")))
+
+        try:
+            import keyring
+        except ImportError:
+            return None
+        try:
+            key = keyring.get_password("openstack-simple-stress", "token-cache")
+            if not key:
+                key = Fernet.generate_key().decode("ascii")
+                keyring.set_password("openstack-simple-stress", "token-cache", key)
+        except keyring.errors.KeyringError as e:
+            logger.warning(f"No token cache key in the keyring: {e}")
+            return None
+        return key.encode("ascii")
+
+    def _fernet(self) -> Fernet | None:
+        from cryptography.fernet import Fernet
+
+        if self._fernet_instance is None and not self._no_key:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            key = self._key()
+            if key is None:
+                self._no_key = True
+                logger.warning(
+                    f"Token cache disabled, set {TOKEN_CACHE_KEY_ENV} or install"
+                    " the keyring package to store the tokens encrypted"
+                )
+            else:
+                self._fernet_instance = Fernet(key)
+        return self._fernet_instance
+
+    def _path(self, os_cloud: openstack.connection.Connection, cloud_name: str) -> Path:
+        auth = os_cloud.config.config.get("auth") or {}
+        identity = [cloud_name] + [str(auth.get(k) or "") for k in TOKEN_CACHE_IDENTITY]
+        digest = hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.token"
+
+    def load(self, os_cloud: openstack.connection.Connection, cloud_name: str) -> bool:
+        """Reuse the cached auth state of the cloud, returns whether it was found."""
+        from cryptography.fernet import InvalidToken
+        from keystoneauth1 import access
+
+        path = self._path(os_cloud, cloud_name)
+        if not path.exists():
+            return False
+        try:
+            fernet = self._fernet()
+            if fernet is None:
+                return False
+            state = fernet.decrypt(path.read_bytes()).decode("utf-8")
+            data = json.loads(state)
+            auth_ref = access.create(body=data["body"], auth_token=data["auth_token"])
+        except (InvalidToken, OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable token cache of {cloud_name}: {e}")
+            return False
+
+        if auth_ref.will_expire_soon(TOKEN_CACHE_STALE_DURATION):
+            logger.info(f"Cached token of {cloud_name} expires soon, authenticating")
+            return False
+
+        os_cloud.session.auth.set_auth_state(state)
+        self._saved[cloud_name] = state
+        logger.info(f"Reusing cached token of {cloud_name} (expires {auth_ref.expires})")
+        return True
+
+    def save(self, os_cloud: openstack.connection.Connection, cloud_name: str) -> None:
+        """Store the current auth state of the cloud if it changed."""
+        state = os_cloud.session.auth.get_auth_state()
+        if not state or state == self._saved.get(cloud_name):
+            return
+        try:
+            fernet = self._fernet()
+            if fernet is None:
+                return
+            encrypted = fernet.encrypt(state.encode("utf-8"))
+            fd = os.open(
+                self._path(os_cloud, cloud_name),
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                0o600,
+            )
+            with os.fdopen(fd, "wb") as f:
+                f.write(encrypted)
+        except OSError as e:
+            logger.warning(f"Could not write token cache of {cloud_name}: {e}")
+            return
+        self._saved[cloud_name] = state
+
+
+class Cloud:
+
+    def __init__(
+        self,
+        cloud_name: str,
+        flavor_name: str,
+        image_name: str,
+        token_cache: TokenCache | None = None,
+        resource_cache: ResourceCache | None = None,
+    ):
+        import openstack
+
+        self._os_cloud = openstack.connect(cloud=cloud_name)
+        if token_cache:
+            token_cache.load(self._os_cloud, cloud_name)
+        self._pollers: dict[str, StatusPoller] = {}
+        self._poller_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: queue.Queue[openstack.connection.Connection] | None = None
+        self._connections_size = 0
+        self._connections_created = 0
+        self._connections_lock = threading.Lock()
+        self._http_pool_sizes: dict[str, int] = {}
+        self.throttle: RequestThrottle | None = None
+
+        self.cloud_name = cloud_name
+        self.resource_cache = resource_cache
+
+        logger.info(f"Checking flavor {flavor_name}")
+        self.os_flavor = self._resolve(
+            "flavor",
+            flavor_name,
+            self.os_cloud.get_flavor,
+            self.os_cloud.compute.get_flavor,
+        )
+        if self.os_flavor is None:
+            logger.error(f"Flavor '{flavor_name}' not found")
+            sys.exit(1)
+        logger.info(f"flavor.id = {self.os_flavor.id}")
+
+        # The first request authenticated, keep the token for the next run
+        if token_cache:
+            token_cache.save(self._os_cloud, cloud_name)
+
+        logger.info(f"Checking image {image_name}")
+        self.os_image = self._resolve(
+            "image",
+            image_name,
+            self.os_cloud.get_image,
+            self.os_cloud.image.get_image,
+        )
+        if self.os_image is None:
+            logger.error(f"Image '{image_name}' not found")
+            sys.exit(1)
+        logger.info(f"image.id = {self.os_image.id}")
+
+    def _resolve(
+        self,
+        kind: str,
+        name_or_id: str,
+        find: Callable,
+        get_by_id: Callable,
+    ):
+        """Look up a flavor or image, by ID where possible.
+
+        UUIDs and cached IDs are fetched directly, names are only resolved
+        with ``find`` (which lists all resources) otherwise.
+        """
+        import openstack
+
+        resource_id = name_or_id if _is_uuid(name_or_id) else None
+        if resource_id is None and self.resource_cache:
+            resource_id = self.resource_cache.get(self.cloud_name, kind, name_or_id)
+
+        if resource_id is not None:
+            try:
+                return get_by_id(resource_id)
+            except openstack.exceptions.NotFoundException:
+                logger.info(f"No {kind} with ID {resource_id}, looking up {name_or_id}")
+
+        resource = find(name_or_id)
+        if resource is not None and self.resource_cache:
+            self.resource_cache.put(self.cloud_name, kind, name_or_id, resource.id)
+        return resource
+
+    @property
+    def os_cloud(self) -> openstack.connection.Connection:
+        """The connection checked out by the current thread, or the shared one."""
+        return getattr(self._local, "connection", None) or self._os_cloud
+
+    def enable_connection_pool(self, size: int, http_pool_sizes: dict[str, int]) -> None:
+        """Hand out up to ``size`` connections with :meth:`connection`.
+
+        The connections share the authentication of the shared connection and
+        thereby its keystone token, but have their own HTTP pools, one per
+        service endpoint, sized by ``http_pool_sizes``.
+        """
+        self._connections = queue.Queue()
+        self._connections_size = size
+        self._http_pool_sizes = http_pool_sizes
+
+    def _new_connection(self) -> openstack.connection.Connection:
+        from keystoneauth1.exceptions.catalog import EndpointNotFound
+        from keystoneauth1.session import Session, TCPKeepAliveAdapter
+        import openstack
+
+        shared = self._os_cloud
+        session = Session(
+            auth=shared.session.auth,
+            verify=shared.session.verify,
+            cert=shared.session.cert,
+        )
+        for service, proxy in POOLED_SERVICES.items():
+            try:
+                endpoint = getattr(shared, proxy).get_endpoint()
+            except EndpointNotFound:
+                continue
+            session.mount(
+                endpoint,
+                TCPKeepAliveAdapter(
+                    pool_maxsize=self._http_pool_sizes.get(
+                        service, DEFAULT_HTTP_POOL_SIZE
+                    )
+                ),
+            )
+
+        config = openstack.config.cloud_region.from_session(
+            session, **shared.config.config
+        )
+        connection = openstack.connection.Connection(config=config)
+        if self.throttle:
+            self.throttle.install(connection)
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the current thread.
+
+        Without a connection pool, or if the thread already holds a
+        connection, the current connection is used.
+        """
+        if self._connections is None or getattr(self._local, "connection", None):
+            yield self.os_cloud
+            return
+
+        with self._connections_lock:
+            create = (
+                self._connections.empty()
+                and self._connections_created < self._connections_size
+            )
+            if create:
+                self._connections_created += 1
+        connection = self._new_connection() if create else self._connections.get()
+
+        self._local.connection = connection
+        try:
+            yield connection
+        finally:
+            self._local.connection = None
+            self._connections.put(connection)
+
+    def bind(self, fn: Callable) -> Callable:
+        """Wrap ``fn`` to run with the connection of the current thread.
+
+        For the inner thread pools of a lifecycle (volumes, attachments,
+        batches), whose workers would use the shared connection otherwise.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            return fn
+
+        def bound(*args, **kwargs):
+            self._local.connection = connection
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.connection = None
+
+        return bound
+
+    def _poller(
+        self,
+        kind: str,
+        list_resources: Callable[[], Iterable],
+        interval: float,
+        phase_attribute: str | None = None,
+        owners_of: Callable[[Any], Iterable[str]] | None = None,
+    ) -> StatusPoller:
+        with self._poller_lock:
+            if kind not in self._pollers:
+                self._pollers[kind] = StatusPoller(
+                    list_resources, interval, phase_attribute, owners_of
+                )
+            return self._pollers[kind]
+
+    def volume_poller(self, interval: float) -> StatusPoller:
+        """Return the volume status poller shared by all workers."""
+        return self._poller(
+            "volume",
+            lambda: block_storage(self.os_cloud).volumes(details=True),
+            interval,
+            phase_attribute="status",
+            # Volumes belong to the servers they are attached to
+            owners_of=lambda v: [a["server_id"] for a in v.attachments or []],
+        )
+
+    def server_poller(self, interval: float) -> StatusPoller:
+        """Return the server status poller shared by all workers."""
+        return self._poller(
+            "server",
+            lambda: self.os_cloud.compute.servers(details=True),
+            interval,
+            phase_attribute="task_state",
+        )
+
+
+def _parse_timestamp(value: str | None) -> float | None:
+    """Convert a nova timestamp (UTC, usually without offset) to epoch seconds."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class InstanceActionCollector:
+    """Record server-side timings from the nova instance action log.
+
+    Servers are queued once they are ACTIVE. A single background thread
+    fetches the ``create`` action and its events at no more than ``rate``
+    servers per second, so the extra API load stays predictable.
+    """
+
+    def __init__(self, cloud: Cloud, report: Report, rate: float):
+        self.cloud = cloud
+        self.report = report
+        self.rate = rate
+        self._queue: queue.Queue[tuple[str, str] | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, server_id: str, name: str) -> None:
+        self._queue.put((server_id, name))
+
+    def close(self) -> None:
+        """Process the servers that are still queued and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        last_fetch = 0.0
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            delay = last_fetch + 1.0 / self.rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            last_fetch = time.time()
+
+            server_id, name = item
+            try:
+                self._collect(server_id, name)
+            except Exception as e:
+                logger.warning(f"Error fetching instance actions of {server_id} ({name}): {e}")
+
+    def _collect(self, server_id: str, name: str) -> None:
+        compute = self.cloud.os_cloud.compute
+        create_action = next(
+            (a for a in compute.server_actions(server_id) if a.action == "create"),
+            None,
+        )
+        if create_action is None:
+            logger.warning(f"No create action found for {server_id} ({name})")
+            return
+
+        # The action list does not include the events
+        action = compute.get_server_action(create_action.request_id, server_id)
+
+        finish_times = []
+        for event in action.events or []:
+            start = _parse_timestamp(event.start_time)
+            finish = _parse_timestamp(event.finish_time)
+            if start is None or finish is None:
+                continue
+            finish_times.append(finish)
+            self.report.record(
+                f"server_action_{event.event}",
+                name,
+                finish - start,
+                event.result == "Success",
+                None if event.result == "Success" else event.result,
+            )
+
+        start = _parse_timestamp(action.start_time)
+        if start is not None and finish_times:
+            self.report.record("server_action_create", name, max(finish_times) - start, True)
+
+
+class SaturationSampler:
+    """Sample the load of the driver into the report.
+
+    A background thread records the in-flight operations per type, the busy
+    workers and queued lifecycles, the CPU time of this process and its
+    number of threads every ``interval`` seconds and once more on close.
+
+    Without a schedule (closed loop) all lifecycles are queued from the
+    start and --parallel limits the load by design, the workers are never
+    sampled as saturated. With --rate, ``not_due(now)`` returns the number
+    of lifecycles whose slot is still ahead; they do not count as queued.
+    """
+
+    def __init__(
+        self,
+        report: Report,
+        workers: int,
+        interval: float = SATURATION_SAMPLE_INTERVAL,
+        not_due: Callable[[float], int] | None = None,
+    ):
+        self.report = report
+        self.workers = workers
+        self.interval = interval
+        self.not_due = not_due
+        self._last = (time.time(), time.process_time())
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+            self.sample()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        now, cpu_time = time.time(), time.process_time()
+        last_time, last_cpu_time = self._last
+        self._last = (now, cpu_time)
+        cpu = (cpu_time - last_cpu_time) / max(now - last_time, 1e-6)
+
+        gauges, in_flight = self.report.gauges()
+        busy = gauges.get("workers_busy", 0)
+        queued = gauges.get("lifecycles_queued", 0)
+        saturated = {"cpu": int(cpu >= SATURATION_CPU)}
+        not_due = self.not_due
+        if not_due is not None:
+            queued = max(queued - not_due(now), 0)
+            saturated["workers"] = int(busy >= self.workers and queued > 0)
+        self.report.add_sample(
+            now,
+            {
+                "in_flight": in_flight,
+                "workers": {"busy": busy, "queued": queued},
+                "driver": {"cpu": cpu, "threads": threading.active_count()},
+                "saturated": saturated,
+            },
+        )
+
+
+class StackSampler:
+    """Sampling profiler of the driver, writes collapsed stacks on close.
+
+    A background thread takes the stacks of all other threads every
+    ``interval`` seconds, the profiled code runs unchanged. Every line of
+    the file is ``thread;frame;...;frame count`` as read by flamegraph.pl
+    and speedscope, the workers of a pool are merged into one thread. The
+    samples are wall-clock time, waiting threads show in their waits.
+    """
+
+    def __init__(self, path: str | Path, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.path = Path(path)
+        self.interval = interval
+        self.samples = 0
+        self._file = self.path.open("w", encoding="utf-8")
+        self._stacks: dict[tuple[str, ...], int] = {}
+        self._labels: dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop sampling and write the stacks."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        with self._file:
+            for stack, count in sorted(self._stacks.items()):
+                self._file.write(f"{';'.join(stack)} {count}\n")
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+            )
+        return label
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                # ThreadPoolExecutor-0_3 is a worker of ThreadPoolExecutor-0
+                name = names.get(ident, str(ident))
+                worker = POOL_WORKER_RE.match(name)
+                stack.append(worker.group(1) if worker else name)
+                key = tuple(reversed(stack))
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+            self.samples += 1
+
+
+class PhoneHomeListener:
+    """Receive the cloud-init ``phone_home`` calls of the booted servers.
+
+    cloud-init posts to ``url`` once the final stage is reached, so boot
+    completion is known without polling the console. The request may carry
+    an ``uptime`` field with the in-guest uptime in seconds.
+
+    The listener binds to ``address`` (all interfaces if empty) and has no
+    authentication. Only posts to the path of a server UUID whose
+    ``instance_id`` field names the same server count, anything else is
+    answered with 404.
+    """
+
+    def __init__(self, host: str, port: int, address: str = ""):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.host = host
+        self._cond = threading.Condition()
+        self._arrivals: dict[str, tuple[float, float | None]] = {}
+
+        listener = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                arrived = time.time()
+                length = int(self.headers.get("Content-Length") or 0)
+                fields = parse_qs(self.rfile.read(length).decode("utf-8"))
+                server_id = self.path.strip("/")
+                if not _is_uuid(server_id) or fields.get("instance_id") != [server_id]:
+                    logger.warning(
+                        f"Ignoring phone_home call to {self.path} from {self.address_string()}"
+                    )
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                uptime = None
+                try:
+                    if "uptime" in fields:
+                        uptime = float(fields["uptime"][0])
+                except ValueError:
+                    pass
+                listener._arrived(server_id, arrived, uptime)
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                logger.debug(f"phone_home {self.address_string()}: {format % args}")
+
+        self._httpd = ThreadingHTTPServer((address, port), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Listening for phone_home calls on port {self.port}")
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/$INSTANCE_ID"
+
+    def _arrived(self, server_id: str, arrived: float, uptime: float | None) -> None:
+        with self._cond:
+            # cloud-init retries, only the first call counts
+            self._arrivals.setdefault(server_id, (arrived, uptime))
+            self._cond.notify_all()
+
+    def wait_for(self, server_id: str, timeout: float) -> tuple[float, float | None]:
+        """Block until the server phoned home, return the time and its uptime."""
+        import openstack
+
+        deadline = time.time() + timeout
+        with self._cond:
+            while server_id not in self._arrivals:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise openstack.exceptions.ResourceTimeout(
+                        f"Timeout waiting for phone_home of server {server_id}"
+                    )
+                self._cond.wait(min(remaining, CANCEL_CHECK_INTERVAL))
+                cancel_token.check()
+            return self._arrivals.pop(server_id)
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def with_phone_home(user_data: str, url: str) -> str:
+    """Add a cloud-init ``phone_home`` directive for ``url`` to the user data.
+
+    Cloud configs are extended directly, anything else (e.g. the burnin
+    shell script) is combined with a cloud config in a multipart archive.
+    """
+    directive = (
+        "phone_home:\n"
+        f'  url: "{url}"\n'
+        "  post: [instance_id]\n"
+        "  tries: 10\n"
+    )
+    if user_data.startswith("#cloud-config"):
+        return user_data + directive
+
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    archive = MIMEMultipart()
+    archive.attach(MIMEText(user_data, "x-shellscript"))
+    archive.attach(MIMEText("#cloud-config\n" + directive, "cloud-config"))
+    return archive.as_string()
+
+
+class ResourceHandle:
+    """Compact stand-in for the SDK resource of a completed instance.
+
+    A full ``Server`` or ``Volume`` keeps the whole API response around
+    (several KiB each), cleanup and reporting only need the ID, the name and
+    the last known status.
+    """
+
+    __slots__ = ("id", "name", "status")
+
+    def __init__(self, id: str, name: str | None = None, status: str | None = None):
+        self.id = id
+        self.name = name
+        self.status = status
+
+    @classmethod
+    def of(cls, resource) -> ResourceHandle:
+        return cls(
+            resource.id,
+            getattr(resource, "name", None),
+            getattr(resource, "status", None),
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, name={self.name!r}, status={self.status!r})"
+
+
+class ServerHandle(ResourceHandle):
+    __slots__ = ()
+
+    def resource(self) -> openstack.compute.v2.server.Server:
+        from openstack.compute.v2.server import Server
+
+        return Server.existing(id=self.id, name=self.name)
+
+
+class VolumeHandle(ResourceHandle):
+    __slots__ = ()
+
+    def resource(self) -> openstack.block_storage.v3.volume.Volume:
+        from openstack.block_storage.v3.volume import Volume
+
+        return Volume.existing(id=self.id, name=self.name)
+
+
+def _sdk_resource(value):
+    """Return an SDK resource for ``value``, which may be a compact handle.
+
+    Proxy calls like ``wait_for_delete`` need a resource they can fetch, a
+    bare one is built from the handle only for the duration of the call.
+    """
+    if isinstance(value, ResourceHandle):
+        return value.resource()
+    return value
+
+
+class Instance:
+
+    __slots__ = ("cloud", "server", "server_name", "volumes")
+
+    def __init__(
+        self,
+        cloud: Cloud,
         name: str,
-        storage_zone: str,
-        volume_size: int,
-        volume_type: str,
+        user_data: str,
+        compute_zone: str,
+        server_group: openstack.compute.v2.server_group.ServerGroup,
+        network: openstack.network.v2.network.Network,
         meta: Meta,
+        boot_volume_size: int = 20,
+        storage_zone: str = "nova",
+        volume_type: str = "__DEFAULT__",
+        boot_from_volume: bool = True,
         report: Report | None = None,
+        server: openstack.compute.v2.server.Server | None = None,
+    ):
+        self.cloud = cloud
+
+        if server is None:
+            self.server = create_server(
+                self.cloud,
+                name,
+                user_data,
+                compute_zone,
+                server_group,
+                network,
+                meta,
+                boot_volume_size,
+                storage_zone,
+                volume_type,
+                boot_from_volume,
+                report=report,
+            )
+        else:
+            # Server of a batch request that is already ACTIVE
+            self.server = server
+            if meta.wait:
+                wait_for_boot(self.cloud, server, name, report=report, meta=meta)
+        self.server_name = name
+
+        self.volumes: List[openstack.block_storage.v3.volume.Volume] = []
+
+    def attach_volumes(
+        self, report: Report | None = None, meta: Meta | None = None
     ) -> None:
-        volume = create_volume(
-            self.cloud,
-            name,
-            storage_zone,
-            volume_size,
-            volume_type,
-            meta,
-            report=report,
-        )
-        self.volumes.append(volume)
+        if meta is not None and meta.attach_concurrency > 1 and self.volumes:
+            self._attach_volumes_concurrently(meta, report=report)
+            return
+
+        track = report.track if report else _noop_track
+        retry = meta.retry if meta is not None else RetryPolicy()
+        for volume in self.volumes:
+            logger.info(
+                f"Attaching volume {volume.id} to server {self.server.id} ({self.server_name})"
+            )
+            with track("volume_attach", f"{self.server_name}-vol-{volume.id}") as op:
+                if meta is not None and meta.phase_breakdown:
+                    retry.call(
+                        "volume_attach",
+                        op,
+                        self.cloud.os_cloud.attach_volume,
+                        self.server,
+                        volume,
+                        wait=False,
+                    )
+                    wait_for_volume(
+                        self.cloud,
+                        volume,
+                        f"{self.server_name}-vol-{volume.id}",
+                        "in-use",
+                        meta,
+                        report,
+                    )
+                else:
+                    retry.call(
+                        "volume_attach",
+                        op,
+                        self.cloud.os_cloud.attach_volume,
+                        self.server,
+                        volume,
+                    )
+
+            logger.debug(f"Refreshing details of {self.server.id} ({self.server_name})")
+            self.server = self.cloud.os_cloud.compute.get_server(self.server.id)
+
+    def _attach_volumes_concurrently(
+        self, meta: Meta, report: Report | None = None
+    ) -> None:
+        """Issue all attachments at once and wait for them in one batch.
+
+        The number of attachments in flight is bounded by
+        ``meta.attach_concurrency`` because nova serialises operations on the
+        same instance. The server is refreshed once at the end.
+        """
+        issued: dict[str, float] = {}
+        pending: list[openstack.block_storage.v3.volume.Volume] = []
+        errors: list[Exception] = []
+
+        def _attach(volume):
+            logger.info(
+                f"Attaching volume {volume.id} to server {self.server.id} ({self.server_name})"
+            )
+            issued[volume.id] = time.time()
+            meta.retry.call(
+                "volume_attach",
+                None,
+                self.cloud.os_cloud.compute.create_volume_attachment,
+                self.server,
+                volume=volume,
+            )
+
+        with ThreadPoolExecutor(max_workers=meta.attach_concurrency) as pool:
+            attach = self.cloud.bind(_attach)
+            futures = {pool.submit(attach, volume): volume for volume in self.volumes}
+            for future in as_completed(futures):
+                volume = futures[future]
+                try:
+                    future.result()
+                    pending.append(volume)
+                except Exception as e:
+                    if report:
+                        report.record(
+                            "volume_attach",
+                            f"{self.server_name}-vol-{volume.id}",
+                            time.time() - issued[volume.id],
+                            False,
+                            str(e),
+                            classify_error(e),
+                        )
+                    errors.append(e)
+
+        reached: dict[str, float] = {}
+        transitions: dict[str, list[tuple[float, str | None]]] = {}
+        if pending:
+            logger.debug(
+                f"Waiting for {len(pending)} volume(s) to attach to {self.server.id} ({self.server_name})"
+            )
+            try:
+                self.cloud.volume_poller(meta.poll_interval).wait_for(
+                    [v.id for v in pending],
+                    "in-use",
+                    meta.timeout,
+                    reached=reached,
+                    transitions=transitions,
+                )
+            except Exception as e:
+                errors.append(e)
+
+        if report:
+            for volume in pending:
+                if meta.phase_breakdown:
+                    report.record_phases(
+                        "volume_status",
+                        f"{self.server_name}-vol-{volume.id}",
+                        transitions[volume.id],
+                        reached.get(volume.id, time.time()),
+                    )
+                if volume.id in reached:
+                    report.record(
+                        "volume_attach",
+                        f"{self.server_name}-vol-{volume.id}",
+                        reached[volume.id] - issued[volume.id],
+                        True,
+                    )
+                else:
+                    report.record(
+                        "volume_attach",
+                        f"{self.server_name}-vol-{volume.id}",
+                        time.time() - issued[volume.id],
+                        False,
+                        str(errors[-1]),
+                        classify_error(errors[-1]),
+                    )
+
+        logger.debug(f"Refreshing details of {self.server.id} ({self.server_name})")
+        self.server = self.cloud.os_cloud.compute.get_server(self.server.id)
+
+        if errors:
+            raise errors[0]
+
+    def compact(self) -> None:
+        """Replace the SDK resources with compact handles.
+
+        Called once the lifecycle is done, instances are kept until the end
+        of the run (``--no-delete``, burnin) and only cleanup touches them.
+        """
+        self.server = ServerHandle.of(self.server)
+        self.volumes = [VolumeHandle.of(volume) for volume in self.volumes]
 
-    def attach_volumes(self, report: Report | None = None) -> None:
-        track = report.track if report else _noop_track
-        for volume in self.volumes:
+
+def create(
+    cloud: Cloud,
+    name: str,
+    user_data: str,
+    compute_zone: str,
+    volume: bool,
+    volume_number: int,
+    storage_zone: str,
+    volume_size: int,
+    server_group: openstack.compute.v2.server_group.ServerGroup,
+    volume_type: str,
+    network: openstack.network.v2.network.Network,
+    meta: Meta,
+    boot_volume_size: int = 20,
+    boot_from_volume: bool = True,
+    report: Report | None = None,
+    server: openstack.compute.v2.server.Server | None = None,
+) -> Instance:
+    # Log records of the whole lifecycle carry the instance name
+    with logger.contextualize(instance=name):
+        # Volumes do not depend on the server, so they are provisioned while the
+        # server builds and attached once both are ready.
+        with ThreadPoolExecutor(max_workers=max(volume_number, 1)) as volume_pool:
+            volume_futures = []
+            if volume:
+                for x in range(volume_number):
+                    volume_futures.append(
+                        volume_pool.submit(
+                            cloud.bind(create_volume),
+                            cloud,
+                            f"{name}-volume-{x}",
+                            storage_zone,
+                            volume_size,
+                            volume_type,
+                            meta,
+                            report=report,
+                        )
+                    )
+
+            try:
+                instance = Instance(
+                    cloud,
+                    name,
+                    user_data,
+                    compute_zone,
+                    server_group,
+                    network,
+                    meta,
+                    boot_volume_size,
+                    storage_zone,
+                    volume_type,
+                    boot_from_volume,
+                    report=report,
+                    server=server,
+                )
+            except Exception:
+                discard_volumes(cloud, name, volume_futures, meta, report=report)
+                raise
+
+            volume_error = None
+            for future in volume_futures:
+                try:
+                    instance.volumes.append(future.result())
+                except Exception as e:
+                    volume_error = volume_error or e
+            if volume_error:
+                # Nothing follows the server and the other volumes any more
+                try:
+                    delete_server(instance, meta, report=report)
+                except Exception as e:
+                    logger.error(f"Error deleting server {instance.server.id} ({name}): {e}")
+                raise volume_error
+
+        instance.attach_volumes(report=report, meta=meta)
+
+        if meta.delete:
+            delete_server(instance, meta, report=report)
+        else:
             logger.info(
-                f"Attaching volume {volume.id} to server {self.server.id} ({self.server_name})"
+                f"Skipping deletion of server {instance.server.id} ({instance.server_name})"
             )
-            with track("volume_attach", f"{self.server_name}-vol-{volume.id}"):
-                self.cloud.os_cloud.attach_volume(self.server, volume)
+            for v in instance.volumes:
+                logger.info(
+                    f"Skipping deletion of volume {v.id} from server {instance.server.id} ({instance.server_name})"
+                )
 
-            logger.info(f"Refreshing details of {self.server.id} ({self.server_name})")
-            self.server = self.cloud.os_cloud.compute.get_server(self.server.id)
+        instance.compact()
+        return instance
 
 
-def create(
+def create_batch(
     cloud: Cloud,
     name: str,
+    count: int,
     user_data: str,
     compute_zone: str,
     volume: bool,
@@ -505,48 +3188,61 @@ def create(
     boot_volume_size: int = 20,
     boot_from_volume: bool = True,
     report: Report | None = None,
-) -> Instance:
+) -> list[Instance]:
+    """Create a batch of servers with one request and follow each of them.
 
-    instance = Instance(
+    After the batch is ACTIVE every server runs through the rest of the
+    lifecycle (boot wait, volumes, deletion) on its own. Lifecycles that fail
+    are logged and left out of the returned list.
+    """
+    servers = create_servers(
         cloud,
         name,
+        count,
         user_data,
         compute_zone,
         server_group,
         network,
         meta,
         boot_volume_size,
-        storage_zone,
         volume_type,
         boot_from_volume,
         report=report,
     )
 
-    if volume:
-        for x in range(volume_number):
-            instance.add_volume(
-                f"{name}-volume-{x}",
+    instances = []
+    # The lifecycles of the batch share the connection of the batch
+    lifecycle = cloud.bind(create)
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        futures = {
+            pool.submit(
+                lifecycle,
+                cloud,
+                server.name,
+                user_data,
+                compute_zone,
+                volume,
+                volume_number,
                 storage_zone,
                 volume_size,
+                server_group,
                 volume_type,
+                network,
                 meta,
-                report=report,
-            )
-
-    instance.attach_volumes(report=report)
-
-    if meta.delete:
-        delete_server(instance, meta, report=report)
-    else:
-        logger.info(
-            f"Skipping deletion of server {instance.server.id} ({instance.server_name})"
-        )
-        for v in instance.volumes:
-            logger.info(
-                f"Skipping deletion of volume {v.id} from server {instance.server.id} ({instance.server_name})"
-            )
+                boot_volume_size,
+                boot_from_volume,
+                report,
+                server=server,
+            ): server
+            for server in servers
+        }
+        for future in as_completed(futures):
+            try:
+                instances.append(future.result())
+            except Exception as e:
+                logger.error(f"Error in lifecycle of server {futures[future].name}: {e}")
 
-    return instance
+    return instances
 
 
 def create_volume(
@@ -561,126 +3257,659 @@ def create_volume(
     logger.info(f"Creating volume {name}")
     track = report.track if report else _noop_track
 
-    with track("volume_create", name):
-        volume = block_storage(cloud.os_cloud).create_volume(
+    attrs = {}
+    if meta.run_id:
+        attrs["metadata"] = {RUN_METADATA_KEY: meta.run_id}
+    with track("volume_create", name) as op:
+        volume = meta.retry.call(
+            "volume_create",
+            op,
+            block_storage(cloud.os_cloud).create_volume,
             availability_zone=storage_zone,
             name=name,
             size=volume_size,
             volume_type=volume_type,
+            **attrs,
+        )
+
+        logger.debug(f"Waiting for volume {volume.id}")
+        if meta.phase_breakdown:
+            wait_for_volume(cloud, volume, name, "available", meta, report)
+            # The poller does not update the volume, attaching needs the status
+            volume = block_storage(cloud.os_cloud).get_volume(volume.id)
+        else:
+            volume = poll_status(
+                volume,
+                lambda: block_storage(cloud.os_cloud).get_volume(volume.id),
+                "available",
+                meta.interval,
+                meta.timeout,
+            )
+
+    return volume
+
+
+def poll_status(
+    resource: Any,
+    fetch: Callable[[], Any],
+    status: str,
+    interval: float,
+    timeout: float,
+    failures: tuple[str, ...] = ("error",),
+) -> Any:
+    """Fetch a resource every ``interval`` seconds until it has ``status``.
+
+    The SDK ``wait_for_*`` methods only call their callback after sleeping
+    ``interval``, this wait ends as soon as the run is aborted.
+    """
+    import openstack
+
+    deadline = time.time() + timeout
+    fetched = False
+    while True:
+        current = (resource.status or "").lower()
+        if current == status.lower():
+            return resource
+        if current in failures:
+            raise openstack.exceptions.ResourceFailure(
+                f"Resource {resource.id} transitioned to failure state {resource.status}"
+            )
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise openstack.exceptions.ResourceTimeout(
+                f"Timeout waiting for {resource.id} to transition to {status}"
+            )
+        # Like the SDK, the first fetch follows right away
+        if fetched:
+            cancel_token.sleep(min(interval, remaining))
+        else:
+            cancel_token.check()
+        resource = fetch()
+        fetched = True
+
+
+def wait_for_volume(
+    cloud: Cloud,
+    volume: openstack.block_storage.v3.volume.Volume,
+    name: str,
+    status: str,
+    meta: Meta,
+    report: Report | None = None,
+) -> None:
+    """Wait for a volume status with the shared poller and record its phases."""
+    transitions: dict[str, list[tuple[float, str | None]]] = {}
+    reached: dict[str, float] = {}
+    try:
+        cloud.volume_poller(meta.poll_interval).wait_for(
+            [volume.id],
+            status,
+            meta.timeout,
+            reached=reached,
+            transitions=transitions,
+        )
+    finally:
+        if report:
+            report.record_phases(
+                "volume_status",
+                name,
+                transitions[volume.id],
+                reached.get(volume.id, time.time()),
+            )
+
+
+@contextmanager
+def track_boot_volumes(
+    cloud: Cloud,
+    servers: list[tuple[str, str]],
+    meta: Meta,
+    report: Report | None = None,
+):
+    """Record the status phases of boot volumes while their servers build.
+
+    ``servers`` holds ``(server_id, name)`` pairs. Nova creates the boot
+    volumes, the shared volume poller finds them by their attachment to the
+    server. The phases are only recorded if the servers became ACTIVE.
+    """
+    server_ids = [server_id for server_id, _ in servers] if report else []
+    poller = cloud.volume_poller(meta.poll_interval)
+    start = time.time()
+    poller.watch_owners(server_ids)
+    try:
+        yield
+        end = time.time()
+        for server_id, name in servers if report else []:
+            owned = poller.owned(server_id, start)
+            if owned is None:
+                logger.warning(f"Boot volume of {server_id} ({name}) was not seen")
+                continue
+            _, transitions = owned
+            # The last phase ends with in-use, or the server if not polled yet
+            in_use = [t[0] for t in transitions if t[1] == "in-use"]
+            cast(Report, report).record_phases(
+                "volume_status",
+                f"{name}-boot-volume",
+                transitions,
+                in_use[0] if in_use else end,
+            )
+    finally:
+        poller.unwatch_owners(server_ids)
+
+
+def discard_volumes(
+    cloud: Cloud,
+    name: str,
+    volume_futures: list[Future],
+    meta: Meta,
+    report: Report | None = None,
+) -> None:
+    """Delete the volumes of a lifecycle whose server could not be created."""
+    track = report.track if report else _noop_track
+
+    for future in volume_futures:
+        try:
+            volume = future.result()
+        except Exception:
+            continue
+
+        logger.info(f"Deleting orphaned volume {volume.id}")
+        try:
+            with track("volume_delete", f"{name}-vol-{volume.id}") as op:
+                meta.retry.call(
+                    "volume_delete", op, block_storage(cloud.os_cloud).delete_volume, volume
+                )
+                block_storage(cloud.os_cloud).wait_for_delete(
+                    volume, interval=meta.interval, wait=meta.timeout
+                )
+        except Exception as e:
+            logger.error(f"Error deleting volume {volume.id}: {e}")
+
+
+def server_attributes(
+    cloud: Cloud,
+    name: str,
+    user_data: str,
+    compute_zone: str,
+    server_group: openstack.compute.v2.server_group.ServerGroup,
+    network: openstack.network.v2.network.Network,
+    boot_volume_size: int = 20,
+    volume_type: str = "__DEFAULT__",
+    boot_from_volume: bool = True,
+    run_id: str = "",
+) -> dict:
+    """Return the attributes of a server create request."""
+    attrs = {
+        "availability_zone": compute_zone,
+        "name": name,
+        "flavor_id": cloud.os_flavor.id,
+        "networks": [{"uuid": network.id}],
+        "user_data": user_data,
+        "scheduler_hints": {"group": server_group.id},
+    }
+    if run_id:
+        attrs["metadata"] = {RUN_METADATA_KEY: run_id}
+
+    if boot_from_volume:
+        # Create block device mapping for boot from volume
+        block_device_mapping = [
+            {
+                "uuid": cloud.os_image.id,
+                "source_type": "image",
+                "destination_type": "volume",
+                "boot_index": 0,
+                "volume_size": boot_volume_size,
+                "delete_on_termination": True,
+            }
+        ]
+
+        # Add volume_type if not default
+        if volume_type != "__DEFAULT__":
+            block_device_mapping[0]["volume_type"] = volume_type
+
+        attrs["block_device_mapping"] = block_device_mapping
+    else:
+        attrs["image_id"] = cloud.os_image.id
+
+    return attrs
+
+
+def create_server(
+    cloud: Cloud,
+    name: str,
+    user_data: str,
+    compute_zone: str,
+    server_group: openstack.compute.v2.server_group.ServerGroup,
+    network: openstack.network.v2.network.Network,
+    meta: Meta,
+    boot_volume_size: int = 20,
+    storage_zone: str = "nova",
+    volume_type: str = "__DEFAULT__",
+    boot_from_volume: bool = True,
+    report: Report | None = None,
+) -> openstack.compute.v2.server.Server:
+    track = report.track if report else _noop_track
+
+    if boot_from_volume:
+        logger.info(
+            f"Creating server {name} with boot from volume (size: {boot_volume_size}GB)"
+        )
+    else:
+        logger.info(f"Creating server {name} with boot from local storage")
+
+    attrs = server_attributes(
+        cloud,
+        name,
+        user_data,
+        compute_zone,
+        server_group,
+        network,
+        boot_volume_size,
+        volume_type,
+        boot_from_volume,
+        meta.run_id,
+    )
+    with track("server_create", name) as op:
+        server = meta.retry.call(
+            "server_create", op, cloud.os_cloud.compute.create_server, **attrs
+        )
+
+    logger.debug(f"Waiting for server {server.id} ({name})")
+    if meta.phase_breakdown:
+        transitions: dict[str, list[tuple[float, str | None]]] = {}
+        boot_volumes = [(server.id, name)] if boot_from_volume else []
+        try:
+            with track_boot_volumes(cloud, boot_volumes, meta, report), track(
+                "server_wait_active", name
+            ):
+                cloud.server_poller(meta.poll_interval).wait_for(
+                    [server.id],
+                    "ACTIVE",
+                    meta.timeout,
+                    failures=("ERROR",),
+                    transitions=transitions,
+                )
+        finally:
+            if report:
+                report.record_phases(
+                    "server_phase", name, transitions[server.id], time.time()
+                )
+    else:
+        with track("server_wait_active", name):
+            poll_status(
+                server,
+                lambda: cloud.os_cloud.compute.get_server(server.id),
+                "ACTIVE",
+                meta.interval,
+                meta.timeout,
+            )
+
+    if meta.instance_actions:
+        meta.instance_actions.add(server.id, name)
+
+    if meta.wait:
+        wait_for_boot(cloud, server, name, report=report, meta=meta)
+
+    return server
+
+
+def create_servers(
+    cloud: Cloud,
+    name: str,
+    count: int,
+    user_data: str,
+    compute_zone: str,
+    server_group: openstack.compute.v2.server_group.ServerGroup,
+    network: openstack.network.v2.network.Network,
+    meta: Meta,
+    boot_volume_size: int = 20,
+    volume_type: str = "__DEFAULT__",
+    boot_from_volume: bool = True,
+    report: Report | None = None,
+) -> list[openstack.compute.v2.server.Server]:
+    """Create ``count`` identical servers with a single multi-create request.
+
+    Nova names the servers ``<name>-1`` to ``<name>-<count>``, but only if a
+    request creates more than one server, so ``count`` must be at least 2.
+    The call returns once all of them are ACTIVE; the boot wait is left to
+    the caller so that each server can be followed individually. The
+    servers are found by their name and the run ID in their metadata
+    (``meta.run_id`` is required), servers of other runs with the same
+    prefix are left alone. If the batch fails after the request, the
+    servers found are deleted.
+    """
+    if count < 2:
+        raise ValueError(f"A batch needs at least 2 servers, got {count}")
+    if not meta.run_id:
+        raise ValueError("A batch needs a run ID to find its servers")
+    track = report.track if report else _noop_track
+
+    logger.info(f"Creating {count} servers {name}-1..{name}-{count} in one request")
+    attrs = server_attributes(
+        cloud,
+        name,
+        user_data,
+        compute_zone,
+        server_group,
+        network,
+        boot_volume_size,
+        volume_type,
+        boot_from_volume,
+        meta.run_id,
+    )
+    with track("server_create", name) as op:
+        meta.retry.call(
+            "server_create",
+            op,
+            cloud.os_cloud.compute.create_server,
+            min_count=count,
+            max_count=count,
+            **attrs,
         )
+    created = time.time()
+
+    # The create response only describes the first server, look up the others
+    servers = [
+        s
+        for s in cloud.os_cloud.compute.servers(name=f"^{re.escape(name)}-[0-9]+$")
+        if (s.metadata or {}).get(RUN_METADATA_KEY) == meta.run_id
+    ]
+    try:
+        if len(servers) != count:
+            raise RuntimeError(
+                f"Expected {count} servers for batch {name}, found {len(servers)}"
+            )
+        _wait_for_batch(cloud, name, servers, created, meta, boot_from_volume, report)
+    except BaseException:
+        # No lifecycle follows these servers, they would be leaked
+        for server in servers:
+            logger.info(f"Deleting server {server.id} ({server.name}) of failed batch {name}")
+            try:
+                cloud.os_cloud.compute.delete_server(server, ignore_missing=True)
+            except Exception as e:
+                logger.error(f"Error deleting server {server.id} of batch {name}: {e}")
+        raise
+
+    if meta.instance_actions:
+        for server in servers:
+            meta.instance_actions.add(server.id, server.name)
+
+    return sorted(servers, key=lambda s: int(s.name.rsplit("-", 1)[1]))
+
+
+def _wait_for_batch(
+    cloud: Cloud,
+    name: str,
+    servers: list[openstack.compute.v2.server.Server],
+    created: float,
+    meta: Meta,
+    boot_from_volume: bool,
+    report: Report | None,
+) -> None:
+    """Wait until all servers of a batch are ACTIVE and record the waits."""
+    logger.debug(f"Waiting for {len(servers)} servers of batch {name}")
+    reached: dict[str, float] = {}
+    transitions: dict[str, list[tuple[float, str | None]]] = {}
+    boot_volumes = []
+    if meta.phase_breakdown and boot_from_volume:
+        boot_volumes = [(s.id, s.name) for s in servers]
+    error_type = None
+    try:
+        with track_boot_volumes(cloud, boot_volumes, meta, report):
+            cloud.server_poller(meta.poll_interval).wait_for(
+                [s.id for s in servers],
+                "ACTIVE",
+                meta.timeout,
+                reached=reached,
+                failures=("ERROR",),
+                transitions=transitions,
+            )
+    except Exception as e:
+        error_type = classify_error(e)
+        raise
+    finally:
+        if report:
+            for server in servers:
+                if meta.phase_breakdown:
+                    report.record_phases(
+                        "server_phase",
+                        server.name,
+                        transitions[server.id],
+                        reached.get(server.id, time.time()),
+                    )
+                if server.id in reached:
+                    report.record(
+                        "server_wait_active",
+                        server.name,
+                        reached[server.id] - created,
+                        True,
+                    )
+                else:
+                    report.record(
+                        "server_wait_active",
+                        server.name,
+                        time.time() - created,
+                        False,
+                        f"Server {server.id} did not become ACTIVE",
+                        error_type,
+                    )
+
+
+def wait_for_boot(
+    cloud: Cloud,
+    server: openstack.compute.v2.server.Server,
+    name: str,
+    report: Report | None = None,
+    meta: Meta | None = None,
+) -> None:
+    track = report.track if report else _noop_track
+
+    logger.debug(f"Waiting for boot of {server.id} ({name})")
+    if meta is not None and meta.phone_home:
+        started = time.time()
+        try:
+            arrived, uptime = meta.phone_home.wait_for(server.id, meta.timeout)
+        except Exception as e:
+            if report:
+                report.record(
+                    "server_wait_boot",
+                    name,
+                    time.time() - started,
+                    False,
+                    str(e),
+                    classify_error(e),
+                )
+            raise
+        if uptime is not None:
+            logger.info(f"Server {server.id} ({name}) is up after {uptime}s")
+        # The guest may have phoned home before the wait started
+        if report:
+            report.record("server_wait_boot", name, max(arrived - started, 0.0), True)
+            if uptime is not None:
+                record_guest_boot(report, name, GuestBoot(uptime), arrived)
+        # The tests (scripts-user) run before phone_home, their result is
+        # only on the console
+        try:
+            check_tests(server, name, console_output(cloud, server))
+        except Exception as e:
+            logger.warning(f"Could not read the console of {server.id} ({name}): {e}")
+        return
+
+    with track("server_wait_boot", name):
+        while True:
+            console = console_output(cloud, server)
+            detected = time.time()
+            check_tests(server, name, console)
+            if "The system is finally up" in console:
+                break
+            cancel_token.sleep(1.0)
+
+    boot = parse_guest_boot(console)
+    if boot:
+        logger.info(f"Server {server.id} ({name}) is up after {boot.uptime}s")
+        if report:
+            record_guest_boot(report, name, boot, detected)
+
+
+def console_output(cloud: Cloud, server: openstack.compute.v2.server.Server) -> str:
+    console = cloud.os_cloud.compute.get_server_console_output(server)
+    if isinstance(console, dict):
+        console = console.get("output") or ""
+    return str(console)
+
+
+def check_tests(
+    server: openstack.compute.v2.server.Server, name: str, console: str
+) -> None:
+    if "Failed to run module scripts-user" in console:
+        logger.error(f"Failed tests for {server.id} ({name})")
+
+
+@dataclass
+class GuestBoot:
+    uptime: float
+    finished_at: float | None = None
+    stages: list[tuple[str, float]] | None = None
+
+
+FINAL_MESSAGE_RE = re.compile(
+    r"The system is finally up, after ([0-9.]+) seconds(?: at ([^\n]+?))?\s*$",
+    re.MULTILINE,
+)
+STAGE_RE = re.compile(r"Cloud-init v\. \S+ running '([^']+)' at .*?Up ([0-9.]+) seconds")
+
 
-        logger.info(f"Waiting for volume {volume.id}")
-        block_storage(cloud.os_cloud).wait_for_status(
-            volume, status="available", interval=meta.interval, wait=meta.timeout
-        )
+def parse_guest_boot(console: str) -> GuestBoot | None:
+    """Extract the boot timing cloud-init printed to the console.
 
-    return volume
+    Returns None until the final message is present. Stages are the
+    ``(stage, duration)`` pairs of the cloud-init stages that ran before it.
+    """
+    match = FINAL_MESSAGE_RE.search(console)
+    if not match:
+        return None
 
+    uptime = float(match.group(1))
+    finished_at = None
+    if match.group(2):
+        try:
+            finished_at = parsedate_to_datetime(match.group(2)).timestamp()
+        except (TypeError, ValueError):
+            pass
 
-def create_server(
-    cloud: Cloud,
-    name: str,
-    user_data: str,
-    compute_zone: str,
-    server_group: openstack.compute.v2.server_group.ServerGroup,
-    network: openstack.network.v2.network.Network,
-    meta: Meta,
-    boot_volume_size: int = 20,
-    storage_zone: str = "nova",
-    volume_type: str = "__DEFAULT__",
-    boot_from_volume: bool = True,
-    report: Report | None = None,
-) -> openstack.compute.v2.server.Server:
-    track = report.track if report else _noop_track
+    starts = [(stage, float(up)) for stage, up in STAGE_RE.findall(console)]
+    stages = [
+        (stage, end - start)
+        for (stage, start), (_, end) in zip(starts, starts[1:] + [("", uptime)])
+    ]
+    return GuestBoot(uptime, finished_at, stages)
 
-    if boot_from_volume:
-        logger.info(
-            f"Creating server {name} with boot from volume (size: {boot_volume_size}GB)"
-        )
 
-        # Create block device mapping for boot from volume
-        block_device_mapping = [
-            {
-                "uuid": cloud.os_image.id,
-                "source_type": "image",
-                "destination_type": "volume",
-                "boot_index": 0,
-                "volume_size": boot_volume_size,
-                "delete_on_termination": True,
-            }
-        ]
+def record_guest_boot(
+    report: Report, name: str, boot: GuestBoot, detected: float
+) -> None:
+    report.record("guest_boot", name, boot.uptime, True)
+    for stage, duration in boot.stages or []:
+        stage = re.sub(r"[^a-z0-9]+", "_", stage.lower())
+        report.record(f"guest_stage_{stage}", name, duration, True)
+    if boot.finished_at is not None:
+        # Relies on the guest clock, which may be off by a few seconds
+        report.record("boot_detection_delay", name, detected - boot.finished_at, True)
 
-        # Add volume_type if not default
-        if volume_type != "__DEFAULT__":
-            block_device_mapping[0]["volume_type"] = volume_type
 
-        with track("server_create", name):
-            server = cloud.os_cloud.compute.create_server(
-                availability_zone=compute_zone,
-                name=name,
-                flavor_id=cloud.os_flavor.id,
-                networks=[{"uuid": network.id}],
-                user_data=user_data,
-                scheduler_hints={"group": server_group.id},
-                block_device_mapping=block_device_mapping,
-            )
-    else:
-        logger.info(f"Creating server {name} with boot from local storage")
+def delete_server(instance: Instance, meta: Meta, report: Report | None = None) -> None:
+    with logger.contextualize(instance=instance.server_name):
+        logger.info(f"Deleting server {instance.server.id} ({instance.server_name})")
+        track = report.track if report else _noop_track
+        server = _sdk_resource(instance.server)
 
-        with track("server_create", name):
-            server = cloud.os_cloud.compute.create_server(
-                availability_zone=compute_zone,
-                name=name,
-                flavor_id=cloud.os_flavor.id,
-                image_id=cloud.os_image.id,
-                networks=[{"uuid": network.id}],
-                user_data=user_data,
-                scheduler_hints={"group": server_group.id},
+        with track("server_delete", instance.server_name) as op:
+            meta.retry.call(
+                "server_delete",
+                op,
+                instance.cloud.os_cloud.compute.delete_server,
+                server,
+            )
+            logger.debug(
+                f"Waiting for deletion of server {instance.server.id} ({instance.server_name})"
+            )
+            instance.cloud.os_cloud.compute.wait_for_delete(
+                server, interval=meta.interval, wait=meta.timeout
             )
 
-    logger.info(f"Waiting for server {server.id} ({name})")
-    with track("server_wait_active", name):
-        cloud.os_cloud.compute.wait_for_server(
-            server, interval=meta.interval, wait=meta.timeout
-        )
+        for volume in instance.volumes:
+            logger.info(
+                f"Deleting volume {volume.id} from server {instance.server.id} ({instance.server_name})"
+            )
+            volume = _sdk_resource(volume)
+            with track("volume_delete", f"{instance.server_name}-vol-{volume.id}") as op:
+                meta.retry.call(
+                    "volume_delete",
+                    op,
+                    block_storage(instance.cloud.os_cloud).delete_volume,
+                    volume,
+                )
+                logger.debug(f"Waiting for deletion of volume {volume.id}")
+                block_storage(instance.cloud.os_cloud).wait_for_delete(
+                    volume, interval=meta.interval, wait=meta.timeout
+                )
 
-    if meta.wait:
-        logger.info(f"Waiting for boot of {server.id} ({name})")
-        with track("server_wait_boot", name):
-            while True:
-                console = cloud.os_cloud.compute.get_server_console_output(server)
-                if "Failed to run module scripts-user" in str(console):
-                    logger.error(f"Failed tests for {server.id} ({name})")
-                if "The system is finally up" in str(console):
-                    break
-                time.sleep(1.0)
 
-    return server
+def delete_leftovers(
+    cloud: Cloud,
+    prefix: str,
+    run_id: str,
+    instances: list[Instance],
+    meta: Meta,
+    report: Report,
+    parallel: int = 1,
+) -> None:
+    """Delete the servers and volumes of lifecycles that were cancelled.
 
+    They never made it into ``instances`` and are found by the prefix and
+    the run ID in their metadata, resources of other runs with the same
+    prefix are kept. Servers go first, their volumes can only be deleted
+    once they are detached.
+    """
+    known = set()
+    for instance in instances:
+        known.add(instance.server.id)
+        known.update(volume.id for volume in instance.volumes)
 
-def delete_server(instance: Instance, meta: Meta, report: Report | None = None) -> None:
-    logger.info(f"Deleting server {instance.server.id} ({instance.server.name})")
-    track = report.track if report else _noop_track
+    def _delete(kind, proxy, resource):
+        logger.info(f"Deleting {kind} {resource.id} ({resource.name}) of a cancelled lifecycle")
+        try:
+            with report.track(f"{kind}_delete", f"cleanup-{resource.id}"):
+                getattr(proxy, f"delete_{kind}")(resource)
+                proxy.wait_for_delete(
+                    resource, interval=meta.interval, wait=meta.timeout
+                )
+        except Exception as e:
+            logger.error(f"Error deleting {kind} {resource.id}: {e}")
 
-    with track("server_delete", instance.server_name):
-        instance.cloud.os_cloud.compute.delete_server(instance.server)
-        logger.info(
-            f"Waiting for deletion of server {instance.server.id} ({instance.server_name})"
-        )
-        instance.cloud.os_cloud.compute.wait_for_delete(
-            instance.server, interval=meta.interval, wait=meta.timeout
+    def _of_run(resource) -> bool:
+        return (
+            resource.id not in known
+            and (resource.metadata or {}).get(RUN_METADATA_KEY) == run_id
         )
 
-    for volume in instance.volumes:
-        logger.info(
-            f"Deleting volume {volume.id} from server {instance.server.id} ({instance.server_name})"
-        )
-        with track("volume_delete", f"{instance.server_name}-vol-{volume.id}"):
-            block_storage(instance.cloud.os_cloud).delete_volume(volume)
-            logger.info(f"Waiting for deletion of volume {volume.id}")
-            block_storage(instance.cloud.os_cloud).wait_for_delete(
-                volume, interval=meta.interval, wait=meta.timeout
-            )
+    compute = cloud.os_cloud.compute
+    servers = [s for s in compute.servers(name=f"^{prefix}-") if _of_run(s)]
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        for server in servers:
+            pool.submit(_delete, "server", compute, server)
+
+    volumes = block_storage(cloud.os_cloud)
+    leftover_volumes = [
+        v
+        for v in volumes.volumes(details=True)
+        if v.name
+        and v.name.startswith(f"{prefix}-")
+        and _of_run(v)
+        # Boot volumes go away with their server
+        and v.status != "deleting"
+    ]
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        for volume in leftover_volumes:
+            pool.submit(_delete, "volume", volumes, volume)
 
 
 class AffinitySetting(str, Enum):
@@ -695,17 +3924,29 @@ class ExecutionMode(str, Enum):
     block = "block"
 
 
+class LogFormat(str, Enum):
+    text = "text"
+    json = "json"
+
+
 def clean_resources(
     cloud_name: str,
     prefix: str,
     debug: bool,
     parallel: int = 1,
     no_network: bool = False,
+    token_cache: TokenCache | None = None,
 ) -> None:
     """Find and delete all resources from a previous run with the given prefix."""
+    from keystoneauth1.exceptions.catalog import EndpointNotFound
+    import openstack
+    from rich.console import Console
+    from rich.table import Table
 
     openstack.enable_logging(debug=debug, http_debug=debug)
     os_cloud = openstack.connect(cloud=cloud_name)
+    if token_cache:
+        token_cache.load(os_cloud, cloud_name)
 
     console = Console()
 
@@ -714,6 +3955,8 @@ def clean_resources(
 
     logger.info(f"Searching for servers with prefix '{prefix}'...")
     servers = list(os_cloud.compute.servers(name=f"^{prefix}-"))
+    if token_cache:
+        token_cache.save(os_cloud, cloud_name)
     for s in servers:
         resources.append(("Server", s.name, s.id, s.status))
 
@@ -752,7 +3995,8 @@ def clean_resources(
         logger.info(f"No resources found with prefix '{prefix}'")
         return
 
-    # Display found resources
+    # Display found resources after the pending log messages
+    logger.complete()
     table = Table(title=f"Resources found with prefix '{prefix}'")
     table.add_column("Type", style="cyan")
     table.add_column("Name", style="green")
@@ -845,21 +4089,217 @@ def run(
         str, typer.Option("--profile", help="Path to a YAML profile file")
     ] = "",
     clean: Annotated[bool, typer.Option("--clean")] = False,
+    history: Annotated[
+        bool,
+        typer.Option(
+            "--history",
+            help="Show the p95 and error rate per operation of the previous runs with this cloud and profile and exit.",
+        ),
+    ] = False,
+    save_history: Annotated[
+        bool,
+        typer.Option(
+            "--save-history",
+            help="Add the parameters and the statistics per operation of this run to the history.",
+        ),
+    ] = False,
+    save_records: Annotated[
+        bool,
+        typer.Option(
+            "--save-records",
+            help="Also add every record of this run to the history (with --save-history).",
+        ),
+    ] = False,
+    history_db: Annotated[
+        str,
+        typer.Option(
+            "--history-db",
+            help="SQLite database of the history (default: ~/.local/share/openstack-simple-stress/history.sqlite).",
+        ),
+    ] = "",
     no_cleanup: Annotated[bool, typer.Option("--no-cleanup")] = False,
     debug: Annotated[bool, typer.Option("--debug")] = False,
+    log_level: Annotated[
+        str,
+        typer.Option(
+            "--log-level",
+            help="Minimum level of log messages; waits and refreshes are logged at DEBUG (default: INFO, DEBUG with --debug).",
+        ),
+    ] = "INFO",
+    log_format: Annotated[
+        LogFormat,
+        typer.Option(
+            "--log-format",
+            help="Log as colored text or as one JSON object per line with run ID, instance and operation.",
+        ),
+    ] = LogFormat.text,
+    trace: Annotated[
+        str,
+        typer.Option(
+            "--trace",
+            help="Write every tracked operation to this file in Chrome trace event format, e.g. to open the run in Perfetto.",
+        ),
+    ] = "",
+    profile_driver: Annotated[
+        str,
+        typer.Option(
+            "--profile-driver",
+            help="Sample the stacks of the driver threads and write them to this file as collapsed stacks, e.g. for flamegraph.pl or speedscope.",
+        ),
+    ] = "",
     no_delete: Annotated[bool, typer.Option("--no-delete")] = False,
     volume: Annotated[bool, typer.Option("--volume")] = True,
     no_volume: Annotated[bool, typer.Option("--no-volume")] = False,
     no_boot_volume: Annotated[bool, typer.Option("--no-boot-volume")] = False,
     no_network: Annotated[bool, typer.Option("--no-network")] = False,
     no_wait: Annotated[bool, typer.Option("--no-wait")] = False,
+    phase_breakdown: Annotated[
+        bool,
+        typer.Option(
+            "--phase-breakdown",
+            help="Report the time servers spend in each nova task_state and volumes in each cinder status (polls every second).",
+        ),
+    ] = False,
+    instance_actions: Annotated[
+        bool,
+        typer.Option(
+            "--instance-actions",
+            help="Fetch the nova instance actions of every ACTIVE server and report the server-side event timings.",
+        ),
+    ] = False,
+    instance_actions_rate: Annotated[
+        float,
+        typer.Option(
+            "--instance-actions-rate",
+            help="Maximum number of servers per second whose instance actions are fetched.",
+        ),
+    ] = 5.0,
+    phone_home: Annotated[
+        str,
+        typer.Option(
+            "--phone-home",
+            help="HOST:PORT reachable from the servers; detect boot completion with a cloud-init phone_home call to a listener on PORT instead of polling the console.",
+        ),
+    ] = "",
+    phone_home_address: Annotated[
+        str,
+        typer.Option(
+            "--phone-home-address",
+            help="Local address the phone_home listener binds to (default: all interfaces). Anyone who reaches it can report the boot of a server whose ID they know.",
+        ),
+    ] = "",
+    rate_limit: Annotated[
+        Optional[List[str]],
+        typer.Option(
+            "--rate-limit",
+            help="SERVICE=RATE request limit per second shared by all workers, e.g. compute=5 (repeatable).",
+        ),
+    ] = None,
+    api_retries: Annotated[
+        int,
+        typer.Option(
+            "--api-retries",
+            help="Number of retries of requests answered with 429 or 503 (POST only with 429).",
+        ),
+    ] = 0,
+    retry: Annotated[
+        Optional[List[str]],
+        typer.Option(
+            "--retry",
+            help="OPERATION=RETRIES, retry transient failures (409/5xx) of server_create, server_delete, volume_create, volume_attach or volume_delete (repeatable).",
+        ),
+    ] = None,
+    slo: Annotated[
+        Optional[List[str]],
+        typer.Option(
+            "--slo",
+            help=f"METRIC<VALUE threshold checked at the end, e.g. server_wait_active.p95<60 or error_rate<1% (repeatable). The run exits with {SLO_EXIT_CODE} if one fails.",
+        ),
+    ] = None,
+    slo_summary: Annotated[
+        str,
+        typer.Option(
+            "--slo-summary",
+            help="Write a JSON summary of the SLOs to this file.",
+        ),
+    ] = "",
+    retry_backoff: Annotated[
+        float,
+        typer.Option(
+            "--retry-backoff",
+            help="Delay in seconds before the first retry, doubled for every further retry.",
+        ),
+    ] = RETRY_BACKOFF,
+    connections: Annotated[
+        int,
+        typer.Option(
+            "--connections",
+            help="Number of connections checked out by the lifecycles, sharing one token (0: all workers share one connection).",
+        ),
+    ] = 0,
+    http_pool_size: Annotated[
+        Optional[List[str]],
+        typer.Option(
+            "--http-pool-size",
+            help=f"SERVICE=SIZE HTTP pool size per connection for compute, block-storage, network or image with --connections (default: {DEFAULT_HTTP_POOL_SIZE}, repeatable).",
+        ),
+    ] = None,
+    token_cache: Annotated[
+        bool,
+        typer.Option(
+            "--token-cache",
+            help="Reuse the keystone token and service catalog of previous runs (encrypted with a key from SIMPLE_STRESS_TOKEN_CACHE_KEY or the system keyring).",
+        ),
+    ] = False,
+    resource_cache: Annotated[
+        bool,
+        typer.Option(
+            "--resource-cache",
+            help="Remember the IDs of the flavor and image names and look them up directly next time.",
+        ),
+    ] = False,
+    resource_cache_ttl: Annotated[
+        int,
+        typer.Option(
+            "--resource-cache-ttl",
+            help="Seconds after which cached flavor and image IDs are resolved again.",
+        ),
+    ] = RESOURCE_CACHE_TTL,
+    refresh_cache: Annotated[
+        bool,
+        typer.Option(
+            "--refresh-cache",
+            help="Resolve the flavor and image names again and update the resource cache.",
+        ),
+    ] = False,
     interval: Annotated[int, typer.Option("--interval")] = 10,
     number: Annotated[int, typer.Option("--number")] = 1,
     parallel: Annotated[int, typer.Option("--parallel")] = 1,
+    batch_create: Annotated[
+        int,
+        typer.Option(
+            "--batch-create",
+            help="Number of identical servers requested per create call using nova multi-create (1: one server per call).",
+        ),
+    ] = 1,
     mode: Annotated[ExecutionMode, typer.Option("--mode")] = ExecutionMode.rolling,
+    rate: Annotated[
+        float,
+        typer.Option(
+            "--rate",
+            help="Start lifecycles at a fixed rate per second instead of whenever a worker is free, and report latencies corrected for coordinated omission (0: closed loop).",
+        ),
+    ] = 0.0,
     timeout: Annotated[int, typer.Option("--timeout")] = 600,
     volume_number: Annotated[int, typer.Option("--volume-number")] = 1,
     volume_size: Annotated[int, typer.Option("--volume-size")] = 1,
+    attach_concurrency: Annotated[
+        int,
+        typer.Option(
+            "--attach-concurrency",
+            help="Number of volume attachments issued concurrently per instance (1: attach one by one).",
+        ),
+    ] = 1,
     cloud_name: Annotated[str, typer.Option("--cloud")] = "simple-stress",
     flavor_name: Annotated[str, typer.Option("--flavor")] = "SCS-1V-2",
     image_name: Annotated[str, typer.Option("--image")] = "Ubuntu 24.04",
@@ -901,21 +4341,48 @@ def run(
             return current
 
         clean = _apply("clean", clean)
+        history = _apply("history", history)
+        save_history = _apply("save_history", save_history)
+        save_records = _apply("save_records", save_records)
+        history_db = _apply("history_db", history_db)
         no_cleanup = _apply("no_cleanup", no_cleanup)
         debug = _apply("debug", debug)
+        log_level = _apply("log_level", log_level)
+        log_format = _apply("log_format", log_format)
+        trace = _apply("trace", trace)
+        profile_driver = _apply("profile_driver", profile_driver)
+        slo = _apply("slo", slo)
+        slo_summary = _apply("slo_summary", slo_summary)
         no_delete = _apply("no_delete", no_delete)
         volume = _apply("volume", volume)
         no_volume = _apply("no_volume", no_volume)
         no_boot_volume = _apply("no_boot_volume", no_boot_volume)
         no_network = _apply("no_network", no_network)
         no_wait = _apply("no_wait", no_wait)
+        phase_breakdown = _apply("phase_breakdown", phase_breakdown)
+        instance_actions = _apply("instance_actions", instance_actions)
+        instance_actions_rate = _apply("instance_actions_rate", instance_actions_rate)
+        phone_home = _apply("phone_home", phone_home)
+        phone_home_address = _apply("phone_home_address", phone_home_address)
+        rate_limit = _apply("rate_limit", rate_limit)
+        api_retries = _apply("api_retries", api_retries)
+        retry = _apply("retry", retry)
+        retry_backoff = _apply("retry_backoff", retry_backoff)
+        connections = _apply("connections", connections)
+        http_pool_size = _apply("http_pool_size", http_pool_size)
+        token_cache = _apply("token_cache", token_cache)
+        resource_cache = _apply("resource_cache", resource_cache)
+        resource_cache_ttl = _apply("resource_cache_ttl", resource_cache_ttl)
         interval = _apply("interval", interval)
         number = _apply("number", number)
         parallel = _apply("parallel", parallel)
+        batch_create = _apply("batch_create", batch_create)
         mode = _apply("mode", mode)
+        rate = _apply("rate", rate)
         timeout = _apply("timeout", timeout)
         volume_number = _apply("volume_number", volume_number)
         volume_size = _apply("volume_size", volume_size)
+        attach_concurrency = _apply("attach_concurrency", attach_concurrency)
         cloud_name = _apply("cloud", cloud_name)
         flavor_name = _apply("flavor", flavor_name)
         image_name = _apply("image", image_name)
@@ -934,12 +4401,55 @@ def run(
             mode = ExecutionMode(mode)
         if isinstance(affinity, str):
             affinity = AffinitySetting(affinity)
+        if isinstance(log_format, str):
+            log_format = LogFormat(log_format)
+
+    log_level = log_level.upper()
+    if log_level not in LOG_LEVELS:
+        logger.error(
+            f"Invalid --log-level '{log_level}', expected one of {', '.join(LOG_LEVELS)}"
+        )
+        raise typer.Exit(code=1)
+    if (
+        debug
+        and ctx.get_parameter_source("log_level") == click.core.ParameterSource.DEFAULT
+    ):
+        log_level = "DEBUG"
+    run_id = uuid.uuid4().hex[:8]
+    setup_logging(log_level, log_format.value, run_id)
+    # Write pending messages on every exit, including errors and typer.Exit
+    ctx.call_on_close(logger.complete)
 
     # Clean mode: find and delete leftover resources from a previous run
     if clean:
-        clean_resources(cloud_name, prefix, debug, parallel, no_network)
+        clean_resources(
+            cloud_name,
+            prefix,
+            debug,
+            parallel,
+            no_network,
+            TokenCache() if token_cache else None,
+        )
+        return
+
+    run_history = RunHistory(Path(history_db) if history_db else None)
+
+    # History mode: show the previous runs of this cloud and profile
+    if history:
+        import sqlite3
+
+        try:
+            runs = run_history.runs(cloud_name, profile or None)
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Cannot read the history: {e}")
+            raise typer.Exit(code=1)
+        print_history(cloud_name, profile or None, runs)
         return
 
+    if save_records and not save_history:
+        logger.error("--save-records requires --save-history")
+        raise typer.Exit(code=1)
+
     # Validate burnin options
     if burnin and burnin_duration < 1:
         logger.error("--burnin-duration must be at least 1 hour")
@@ -952,20 +4462,94 @@ def run(
         logger.error("--burnin and --mode cannot be used together")
         raise typer.Exit(code=1)
 
+    if batch_create < 1:
+        logger.error("--batch-create must be at least 1")
+        raise typer.Exit(code=1)
+
+    if rate < 0:
+        logger.error("--rate must not be negative")
+        raise typer.Exit(code=1)
+
+    if rate and mode == ExecutionMode.block:
+        logger.error("--rate and --mode block cannot be used together")
+        raise typer.Exit(code=1)
+
+    if attach_concurrency < 1:
+        logger.error("--attach-concurrency must be at least 1")
+        raise typer.Exit(code=1)
+
+    if instance_actions_rate <= 0:
+        logger.error("--instance-actions-rate must be greater than 0")
+        raise typer.Exit(code=1)
+
+    try:
+        rate_limits = parse_rate_limits(rate_limit)
+    except ValueError as e:
+        logger.error(f"Invalid --rate-limit: {e}")
+        raise typer.Exit(code=1)
+
+    if api_retries < 0:
+        logger.error("--api-retries must not be negative")
+        raise typer.Exit(code=1)
+
+    if retry_backoff < 0:
+        logger.error("--retry-backoff must not be negative")
+        raise typer.Exit(code=1)
+
+    try:
+        retry_policy = RetryPolicy(parse_retries(retry), retry_backoff)
+    except ValueError as e:
+        logger.error(f"Invalid --retry: {e}")
+        raise typer.Exit(code=1)
+
+    try:
+        slos = parse_slos(slo)
+    except ValueError as e:
+        logger.error(f"Invalid --slo: {e}")
+        raise typer.Exit(code=1)
+
+    if connections < 0:
+        logger.error("--connections must not be negative")
+        raise typer.Exit(code=1)
+
+    try:
+        http_pool_sizes = parse_http_pool_sizes(http_pool_size)
+    except ValueError as e:
+        logger.error(f"Invalid --http-pool-size: {e}")
+        raise typer.Exit(code=1)
+
+    phone_home_host, _, phone_home_port = phone_home.rpartition(":")
+    if phone_home and (not phone_home_host or not phone_home_port.isdigit()):
+        logger.error(f"Invalid --phone-home '{phone_home}', expected HOST:PORT")
+        raise typer.Exit(code=1)
+
     # Register signal handler for CTRL+C
     signal.signal(signal.SIGINT, signal_handler)
     delete = not no_delete
     cleanup = not no_cleanup
-    meta = Meta(not no_wait, interval, timeout, delete)
+    meta = Meta(
+        not no_wait,
+        interval,
+        timeout,
+        delete,
+        attach_concurrency,
+        phase_breakdown,
+        retry=retry_policy,
+        run_id=run_id,
+    )
 
     # Handle volume parameters - --no-volume overrides --volume
     if no_volume:
         volume = False
 
+    import openstack
+
     openstack.enable_logging(debug=debug, http_debug=debug)
 
-    patch_http_connection_pool(maxsize=parallel)
-    patch_https_connection_pool(maxsize=parallel)
+    # Pooled connections size their HTTP pools per service instead
+    if not connections:
+        patch_http_connection_pool(maxsize=parallel)
+        patch_https_connection_pool(maxsize=parallel)
 
     if burnin:
         burnin_wait_seconds = burnin_duration * 3600
@@ -981,9 +4565,19 @@ def run(
     else:
         user_data = (
             "#cloud-config\n"
-            'final_message: "The system is finally up, after $UPTIME seconds"\n'
+            'final_message: "The system is finally up, after $UPTIME seconds at $TIMESTAMP"\n'
         )
 
+    if phone_home:
+        try:
+            meta.phone_home = PhoneHomeListener(
+                phone_home_host, int(phone_home_port), phone_home_address
+            )
+        except OSError as e:
+            logger.error(f"Cannot listen for --phone-home on port {phone_home_port}: {e}")
+            raise typer.Exit(code=1)
+        user_data = with_phone_home(user_data, meta.phone_home.url)
+
     b64_user_data = base64.b64encode(user_data.encode("utf-8")).decode("utf-8")
 
     report = Report()
@@ -991,23 +4585,75 @@ def run(
         "profile": profile or None,
         "number": number,
         "parallel": parallel,
+        "batch_create": batch_create,
         "mode": "burnin" if burnin else mode.value,
         "flavor": flavor_name,
         "image": image_name,
         "volume_number": volume_number,
         "volume_size": volume_size,
         "volume_type": volume_type,
+        "attach_concurrency": attach_concurrency,
         "boot_from_volume": not no_boot_volume,
         "boot_volume_size": boot_volume_size,
         "cloud": cloud_name,
         "affinity": affinity.value,
         "delete": delete,
         "cleanup": cleanup,
+        "phase_breakdown": phase_breakdown,
+        "instance_actions": instance_actions,
+        "phone_home": phone_home or None,
+        "phone_home_address": phone_home_address or None,
+        "rate_limit": rate_limits or None,
+        "api_retries": api_retries,
+        "retry": retry_policy.attempts or None,
+        "connections": connections or None,
+        "rate": rate or None,
+        "run_id": run_id,
+        "trace": trace or None,
+        "profile_driver": profile_driver or None,
+        "slo": [str(s) for s in slos] or None,
     }
     if burnin:
         report.params["burnin_duration"] = f"{burnin_duration}h"
-
-    cloud = Cloud(cloud_name, flavor_name, image_name)
+    if trace:
+        try:
+            report.trace = TraceWriter(trace, run_id)
+        except OSError as e:
+            logger.error(f"Cannot write --trace: {e}")
+            raise typer.Exit(code=1)
+        # Terminated on every exit, the spans are already on disk
+        ctx.call_on_close(report.trace.close)
+    sampler = SaturationSampler(report, parallel)
+    ctx.call_on_close(sampler.close)
+    profiler = None
+    if profile_driver:
+        try:
+            profiler = StackSampler(profile_driver)
+        except OSError as e:
+            logger.error(f"Cannot write --profile-driver: {e}")
+            raise typer.Exit(code=1)
+        ctx.call_on_close(profiler.close)
+
+    cloud = Cloud(
+        cloud_name,
+        flavor_name,
+        image_name,
+        token_cache=TokenCache() if token_cache else None,
+        resource_cache=(
+            ResourceCache(ttl=resource_cache_ttl, refresh=refresh_cache)
+            if resource_cache or refresh_cache
+            else None
+        ),
+    )
+    cloud.throttle = RequestThrottle(rate_limits, api_retries, report)
+    cloud.throttle.install(cloud.os_cloud)
+    if connections:
+        cloud.enable_connection_pool(connections, http_pool_sizes)
+
+    if instance_actions:
+        meta.instance_actions = InstanceActionCollector(
+            cloud, report, instance_actions_rate
+        )
 
     network = cloud.os_cloud.network.find_network(prefix)
     network_created = False
@@ -1062,27 +4708,112 @@ def run(
     completed_instances = []
 
     # In burnin mode, instances must not be deleted during creation
-    burnin_meta = Meta(not no_wait, interval, timeout, False) if burnin else None
+    burnin_meta = (
+        Meta(
+            not no_wait,
+            interval,
+            timeout,
+            False,
+            attach_concurrency,
+            phase_breakdown,
+            meta.instance_actions,
+            meta.phone_home,
+            meta.retry,
+            run_id,
+        )
+        if burnin
+        else None
+    )
 
-    def _submit_create(pool, server_index):
-        return pool.submit(
-            create,
-            cloud,
+    # With --batch-create every submission creates a batch of servers with
+    # one request, otherwise a single server.
+    submissions = -(-number // batch_create)
+
+    def _create_instances(server_index) -> list[Instance]:
+        report.adjust("lifecycles_queued", -1)
+        count = min(batch_create, number - server_index * batch_create)
+        # A batch of one server would not get the -N suffix of a batch
+        if count > 1:
+            return create_batch(
+                cloud,
+                f"{prefix}-{server_index}",
+                count,
+                b64_user_data,
+                compute_zone,
+                volume,
+                volume_number,
+                storage_zone,
+                volume_size,
+                server_group,
+                volume_type,
+                network,
+                burnin_meta if burnin else meta,
+                boot_volume_size,
+                not no_boot_volume,
+                report,
+            )
+        return [
+            create(
+                cloud,
+                f"{prefix}-{server_index}",
+                b64_user_data,
+                compute_zone,
+                volume,
+                volume_number,
+                storage_zone,
+                volume_size,
+                server_group,
+                volume_type,
+                network,
+                burnin_meta if burnin else meta,
+                boot_volume_size,
+                not no_boot_volume,
+                report,
+            )
+        ]
+
+    def _with_connection(fn, *args):
+        report.adjust("workers_busy", 1)
+        try:
+            # With --connections every lifecycle uses a connection of its own
+            with cloud.connection():
+                return fn(*args)
+        finally:
+            report.adjust("workers_busy", -1)
+
+    def _scheduled(intended, server_index):
+        delay = intended - time.time()
+        if delay > 0:
+            cancel_token.sleep(delay)
+        # Late if all workers were busy, i.e. the cloud was slow
+        report.record(
+            "schedule_lag",
             f"{prefix}-{server_index}",
-            b64_user_data,
-            compute_zone,
-            volume,
-            volume_number,
-            storage_zone,
-            volume_size,
-            server_group,
-            volume_type,
-            network,
-            burnin_meta if burnin else meta,
-            boot_volume_size,
-            not no_boot_volume,
-            report,
+            max(time.time() - intended, 0.0),
+            True,
+        )
+        return _with_connection(_create_instances, server_index)
+
+    schedule_start = time.time()
+    if rate:
+        # Slots are at schedule_start + index / rate
+        sampler.not_due = lambda now: max(
+            submissions - int((now - schedule_start) * rate) - 1, 0
+        )
+
+    def _submit_create(pool, server_index):
+        report.adjust("lifecycles_queued", 1)
+        if rate:
+            # Open loop, every lifecycle has its slot in the schedule
+            intended = schedule_start + server_index / rate
+            future = pool.submit(_scheduled, intended, server_index)
+        else:
+            future = pool.submit(_with_connection, _create_instances, server_index)
+        # Cancelled lifecycles never start
+        future.add_done_callback(
+            lambda f: f.cancelled() and report.adjust("lifecycles_queued", -1)
         )
+        return future
 
     if burnin:
         # Burnin mode: create all instances, wait for duration, then delete
@@ -1093,7 +4824,7 @@ def run(
 
         pool = ThreadPoolExecutor(max_workers=parallel)
         futures_create = []
-        for x in range(number):
+        for x in range(submissions):
             futures_create.append(_submit_create(pool, x))
 
         for future in as_completed(futures_create):
@@ -1105,11 +4836,11 @@ def run(
                 break
 
             try:
-                instance = future.result()
-                completed_instances.append(instance)
-                logger.info(
-                    f"Server {instance.server.id} ({instance.server_name}) created and running stress-ng"
-                )
+                for instance in future.result():
+                    completed_instances.append(instance)
+                    logger.info(
+                        f"Server {instance.server.id} ({instance.server_name}) created and running stress-ng"
+                    )
             except Exception as e:
                 logger.error(f"Error creating server: {e}")
 
@@ -1143,20 +4874,22 @@ def run(
                 else:
                     remaining_str = f"{seconds}s"
                 logger.info(f"Burnin in progress - {remaining_str} remaining...")
-                # Log status every minute
-                time.sleep(max(0, min(60, remaining)))
+                # Log status every minute, stop waiting on abort
+                cancel_token.wait(max(0, min(60, remaining)))
 
             logger.info("Burnin duration completed.")
 
         # Cleanup: delete instances unless --no-cleanup is set
         if cleanup and completed_instances:
             logger.info("Deleting burnin instances...")
-            delete_meta = Meta(not no_wait, interval, timeout, True)
+            delete_meta = Meta(not no_wait, interval, timeout, True, retry=retry_policy)
             cleanup_pool = ThreadPoolExecutor(max_workers=parallel)
             futures_delete = []
             for instance in completed_instances:
                 futures_delete.append(
-                    cleanup_pool.submit(delete_server, instance, delete_meta, report)
+                    cleanup_pool.submit(
+                        _with_connection, delete_server, instance, delete_meta, report
+                    )
                 )
 
             for f in as_completed(futures_delete):
@@ -1171,14 +4904,15 @@ def run(
             for instance in completed_instances:
                 for vol in instance.volumes:
                     try:
-                        logger.info(f"Checking and deleting volume {vol.id}")
+                        logger.debug(f"Checking and deleting volume {vol.id}")
                         existing_volume = block_storage(cloud.os_cloud).get_volume(
                             vol.id
                         )
                         if existing_volume:
+                            vol = _sdk_resource(vol)
                             with report.track("volume_delete", f"cleanup-{vol.id}"):
                                 block_storage(cloud.os_cloud).delete_volume(vol)
-                                logger.info(f"Waiting for deletion of volume {vol.id}")
+                                logger.debug(f"Waiting for deletion of volume {vol.id}")
                                 block_storage(cloud.os_cloud).wait_for_delete(
                                     vol,
                                     interval=meta.interval,
@@ -1193,7 +4927,7 @@ def run(
             )
 
     elif mode == ExecutionMode.block:
-        total_blocks = -(-number // parallel)
+        total_blocks = -(-submissions // parallel)
         pool = ThreadPoolExecutor(max_workers=parallel)
         for block_idx in range(total_blocks):
             if shutdown_requested:
@@ -1201,7 +4935,7 @@ def run(
                 break
 
             start = block_idx * parallel
-            end = min(start + parallel, number)
+            end = min(start + parallel, submissions)
             block_size = end - start
 
             logger.info(
@@ -1224,9 +4958,9 @@ def run(
                     break
 
                 try:
-                    instance = future.result()
-                    completed_instances.append(instance)
-                    logger.info(f"Server {instance.server.id} finished")
+                    for instance in future.result():
+                        completed_instances.append(instance)
+                        logger.info(f"Server {instance.server.id} finished")
                 except Exception as e:
                     logger.error(f"Error creating server: {e}")
 
@@ -1238,7 +4972,7 @@ def run(
     else:
         pool = ThreadPoolExecutor(max_workers=parallel)
         futures_create = []
-        for x in range(number):
+        for x in range(submissions):
             futures_create.append(_submit_create(pool, x))
 
         # Process completed futures, check for shutdown requests
@@ -1248,9 +4982,9 @@ def run(
                 break
 
             try:
-                instance = future.result()
-                completed_instances.append(instance)
-                logger.info(f"Server {instance.server.id} finished")
+                for instance in future.result():
+                    completed_instances.append(instance)
+                    logger.info(f"Server {instance.server.id} finished")
             except Exception as e:
                 logger.error(f"Error creating server: {e}")
 
@@ -1271,7 +5005,9 @@ def run(
         for instance in completed_instances:
             if cleanup and not delete:
                 futures_delete.append(
-                    cleanup_pool.submit(delete_server, instance, meta, report)
+                    cleanup_pool.submit(
+                        _with_connection, delete_server, instance, meta, report
+                    )
                 )
 
         # Wait for deletion to complete
@@ -1288,20 +5024,31 @@ def run(
             for instance in completed_instances:
                 for vol in instance.volumes:
                     try:
-                        logger.info(f"Checking and deleting volume {vol.id}")
+                        logger.debug(f"Checking and deleting volume {vol.id}")
                         existing_volume = block_storage(cloud.os_cloud).get_volume(
                             vol.id
                         )
                         if existing_volume:
+                            vol = _sdk_resource(vol)
                             with report.track("volume_delete", f"cleanup-{vol.id}"):
                                 block_storage(cloud.os_cloud).delete_volume(vol)
-                                logger.info(f"Waiting for deletion of volume {vol.id}")
+                                logger.debug(f"Waiting for deletion of volume {vol.id}")
                                 block_storage(cloud.os_cloud).wait_for_delete(
                                     vol, interval=meta.interval, wait=meta.timeout
                                 )
                     except Exception as e:
                         logger.error(f"Error deleting volume {vol.id}: {e}")
 
+    # Servers and volumes of lifecycles cancelled half-way
+    if shutdown_requested and cleanup:
+        logger.info("Deleting resources of cancelled lifecycles...")
+        try:
+            delete_leftovers(
+                cloud, prefix, run_id, completed_instances, meta, report, parallel
+            )
+        except Exception as e:
+            logger.error(f"Error deleting resources of cancelled lifecycles: {e}")
+
     # Clean up infrastructure resources
     # In burnin mode with --no-cleanup, keep infrastructure for the running instances
     skip_infra_cleanup = burnin and not cleanup
@@ -1332,16 +5079,61 @@ def run(
             except Exception as e:
                 logger.error(f"Error deleting network: {e}")
 
+    if meta.instance_actions:
+        logger.info("Waiting for pending instance action lookups")
+        meta.instance_actions.close()
+
+    if meta.phone_home:
+        meta.phone_home.close()
+
+    sampler.close()
+    if profiler:
+        profiler.close()
+        logger.info(
+            f"Driver profile with {profiler.samples} samples written to {profile_driver}"
+        )
     report.finalize()
-    report.print_report()
+    if report.trace is not None:
+        report.trace.close()
+        logger.info(f"Trace written to {trace}")
+    slo_results = report.evaluate(slos)
+    # The report goes to stdout, pending log messages first
+    logger.complete()
+    report.print_report(slo_results)
+
+    # Not on stdout, scripts could not separate it from the report
+    if slos and slo_summary:
+        summary = json.dumps(report.slo_summary(slo_results), indent=2)
+        try:
+            Path(slo_summary).write_text(summary + "\n", encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Cannot write --slo-summary: {e}")
+
+    if save_history:
+        import sqlite3
+
+        try:
+            run_history.save(report, records=save_records)
+            logger.info(f"Run {run_id} added to the history {run_history.path}")
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Cannot save the run to the history: {e}")
 
     runtime = (report.end_time or time.time()) - report.start_time
+    failed = [r for r in slo_results if not r.passed]
 
     if shutdown_requested:
         logger.info(f"Test was aborted - cleanup completed. Runtime: {runtime:.4f}s")
+    elif failed:
+        logger.error(
+            f"Test completed, {len(failed)} of {len(slos)} SLO(s) failed:"
+            f" {', '.join(str(r.slo) for r in failed)}. Runtime: {runtime:.4f}s"
+        )
     else:
         logger.info(f"Test completed successfully. Runtime: {runtime:.4f}s")
 
+    if failed:
+        raise typer.Exit(code=SLO_EXIT_CODE)
+
 
 def main() -> None:
     typer.run(run)
@@ -1,15 +1,75 @@
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
+import io
+import json
+import os
+from pathlib import Path
+import random
+import signal
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
 import unittest
 from unittest.mock import MagicMock, patch
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from loguru import logger
+from openstack.block_storage.v3.volume import Volume
+from openstack.compute.v2.server import Server
+from openstack.exceptions import (
+    BadRequestException,
+    ConflictException,
+    HttpException,
+    NotFoundException,
+    ResourceFailure,
+    ResourceTimeout,
+)
 
 from openstack_simple_stress.main import (
     Meta,
     Report,
     Cloud,
     Instance,
+    OperationRecord,
+    InstanceActionCollector,
+    PhoneHomeListener,
+    RequestThrottle,
+    ResourceCache,
+    RetryPolicy,
+    RunHistory,
+    SaturationSampler,
+    ServerHandle,
+    StackSampler,
+    StatusPoller,
+    TokenBucket,
+    TOKEN_CACHE_KEY_ENV,
+    TokenCache,
+    TraceWriter,
+    VolumeHandle,
+    WaitCancelled,
+    abort_prompt,
+    cancel_token,
     create,
+    create_batch,
     create_volume,
     create_server,
+    create_servers,
+    delete_leftovers,
     delete_server,
+    duration_stats,
+    parse_guest_boot,
+    parse_rate_limits,
+    parse_retries,
+    parse_slos,
+    setup_logging,
+    signal_handler,
+    wait_for_boot,
+    with_phone_home,
 )
 
 MOCK_META = Meta(wait=True, interval=10, timeout=20, delete=False)
@@ -18,13 +78,45 @@ MOCK_REPORT = Report()
 
 
 class MockVolume:
-    def __init__(self, id):
+    def __init__(self, id, status="available", attachments=None):
         self.id = id
+        self.status = status
+        self.attachments = attachments or []
 
 
 class MockServer:
-    def __init__(self, id):
+    def __init__(self, id, status="ACTIVE", task_state=None, metadata=None):
         self.id = id
+        self.status = status
+        self.task_state = task_state
+        self.metadata = metadata or {}
+
+
+def sdk_server(x):
+    return Server.existing(
+        id=f"server-{x}",
+        name=f"simple-stress-{x}",
+        status="ACTIVE",
+        addresses={"net": [{"addr": f"10.0.0.{x % 250}", "version": 4}]},
+        flavor={"original_name": "SCS-1V-2", "vcpus": 1, "ram": 2048, "disk": 0},
+        image={"id": "image"},
+        metadata={},
+        security_groups=[{"name": "default"}],
+        availability_zone="nova",
+    )
+
+
+def sdk_volume(x):
+    return Volume.existing(
+        id=f"volume-{x}",
+        name=f"simple-stress-volume-{x}",
+        status="in-use",
+        size=50,
+        availability_zone="nova",
+        volume_type="__DEFAULT__",
+        attachments=[{"server_id": "server", "device": "/dev/vdb"}],
+        metadata={},
+    )
 
 
 class TestBase(unittest.TestCase):
@@ -63,11 +155,10 @@ class TestInstance(TestBase):
         self.assertEqual(instance.server_name, "ServerName")
         self.assertIsInstance(instance.volumes, list)
 
-    @patch("openstack_simple_stress.main.create_volume")
     @patch("openstack_simple_stress.main.create_server")
-    def test_instance_add_volume_0(self, mock_create_server, mock_create_volume):
+    def test_instance_attach_volumes_0(self, mock_create_server):
         mock_create_server.return_value = MockServer(7)
-        mock_create_volume.return_value = MockVolume(17)
+        self.mock_cloud.os_cloud.compute.get_server.return_value = MockServer(8)
 
         instance = Instance(
             self.mock_cloud,
@@ -79,51 +170,57 @@ class TestInstance(TestBase):
             MOCK_META,
             report=MOCK_REPORT,
         )
+        volume = MockVolume(17)
+        instance.volumes = [MockVolume(16), volume]
 
-        self.assertEqual(len(instance.volumes), 0)
+        instance.attach_volumes(report=MOCK_REPORT)
 
-        instance.add_volume(
-            "VolumeName", "StorageZone", 42, "VolumeType", MOCK_META, report=MOCK_REPORT
-        )
+        self.assertEqual(self.mock_cloud.os_cloud.attach_volume.call_count, 2)
+        self.mock_cloud.os_cloud.attach_volume.assert_called_with(instance.server, volume)
+        self.assertEqual(instance.server.id, 8)
+
+    @patch("openstack_simple_stress.main.create_server")
+    def test_instance_attach_volumes_1(self, mock_create_server):
+        mock_create_server.return_value = MockServer(7)
+        self.mock_cloud.os_cloud.compute.get_server.return_value = MockServer(8)
+        self.mock_cloud.os_cloud.block_storage.volumes.return_value = [
+            MockVolume(x, status="in-use") for x in range(4)
+        ]
+        report = Report()
 
-        mock_create_volume.assert_called_with(
+        instance = Instance(
             self.mock_cloud,
-            "VolumeName",
-            "StorageZone",
-            42,
-            "VolumeType",
+            "ServerName",
+            "UserData",
+            "ComputeZone",
+            MagicMock(),
+            MagicMock(),
             MOCK_META,
-            report=MOCK_REPORT,
+            report=report,
         )
-        self.assertEqual(len(instance.volumes), 1)
-        self.assertEqual(instance.volumes[0].id, 17)
+        instance.volumes = [MockVolume(x) for x in range(4)]
 
-        instance.add_volume(
-            "VolumeName2",
-            "StorageZone2",
-            23,
-            "VolumeType2",
-            MOCK_META,
-            report=MOCK_REPORT,
-        )
+        meta = Meta(wait=True, interval=0.01, timeout=5, delete=False, attach_concurrency=2)
+        instance.attach_volumes(report=report, meta=meta)
 
-        mock_create_volume.assert_called_with(
-            self.mock_cloud,
-            "VolumeName2",
-            "StorageZone2",
-            23,
-            "VolumeType2",
-            MOCK_META,
-            report=MOCK_REPORT,
-        )
-        self.assertEqual(len(instance.volumes), 2)
+        compute = self.mock_cloud.os_cloud.compute
+        self.assertEqual(compute.create_volume_attachment.call_count, 4)
+        self.mock_cloud.os_cloud.attach_volume.assert_not_called()
+        # The server is refreshed once, not after every attachment
+        compute.get_server.assert_called_once_with(7)
+        self.assertEqual(instance.server.id, 8)
+        attach_records = [r for r in report.records() if r.operation == "volume_attach"]
+        self.assertEqual(len(attach_records), 4)
+        self.assertTrue(all(r.success for r in attach_records))
 
-    @patch("openstack_simple_stress.main.create_volume")
     @patch("openstack_simple_stress.main.create_server")
-    def test_instance_attach_volumes_0(self, mock_create_server, mock_create_volume):
+    def test_instance_attach_volumes_2(self, mock_create_server):
         mock_create_server.return_value = MockServer(7)
-        mock_create_volume.return_value = MockVolume(17)
-        self.mock_cloud.os_cloud.compute.get_server.return_value = MockServer(8)
+        self.mock_cloud.os_cloud.block_storage.volumes.return_value = [
+            MockVolume(0, status="in-use"),
+            MockVolume(1, status="error"),
+        ]
+        report = Report()
 
         instance = Instance(
             self.mock_cloud,
@@ -133,27 +230,159 @@ class TestInstance(TestBase):
             MagicMock(),
             MagicMock(),
             MOCK_META,
-            report=MOCK_REPORT,
+            report=report,
         )
-        instance.add_volume(
-            "VolumeName", "StorageZone", 42, "VolumeType", MOCK_META, report=MOCK_REPORT
+        instance.volumes = [MockVolume(0), MockVolume(1)]
+
+        meta = Meta(wait=True, interval=0.01, timeout=5, delete=False, attach_concurrency=2)
+        with self.assertRaises(ResourceFailure):
+            instance.attach_volumes(report=report, meta=meta)
+
+        self.assertEqual(len(report.records()), 2)
+
+    def test_instance_compact_0(self):
+        instance = Instance(
+            self.mock_cloud,
+            "ServerName",
+            "UserData",
+            "ComputeZone",
+            MagicMock(),
+            MagicMock(),
+            MOCK_META_2,
+            server=sdk_server(7),
         )
-        instance.add_volume(
-            "VolumeName2",
-            "StorageZone2",
-            23,
-            "VolumeType2",
-            MOCK_META,
-            report=MOCK_REPORT,
+        instance.volumes = [sdk_volume(17)]
+
+        instance.compact()
+
+        self.assertIsInstance(instance.server, ServerHandle)
+        self.assertEqual(
+            (instance.server.id, instance.server.name, instance.server.status),
+            ("server-7", "simple-stress-7", "ACTIVE"),
         )
+        self.assertIsInstance(instance.volumes[0], VolumeHandle)
+        self.assertEqual(instance.volumes[0].id, "volume-17")
+        self.assertEqual(instance.volumes[0].status, "in-use")
+        self.assertEqual(instance.server.resource().id, "server-7")
 
-        instance.attach_volumes(report=MOCK_REPORT)
 
-        self.assertEqual(self.mock_cloud.os_cloud.attach_volume.call_count, 2)
-        self.mock_cloud.os_cloud.attach_volume.assert_called_with(
-            instance.server, mock_create_volume.return_value
+class TestInstanceFootprint(unittest.TestCase):
+    """Memory retained per completed instance, full resources vs. handles."""
+
+    count = 20
+
+    def retained(self, compact):
+        cloud = MagicMock()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            instances = []
+            for x in range(self.count):
+                instance = Instance(
+                    cloud,
+                    f"simple-stress-{x}",
+                    "UserData",
+                    "ComputeZone",
+                    None,
+                    None,
+                    MOCK_META_2,
+                    server=sdk_server(x),
+                )
+                instance.volumes = [sdk_volume(x * 10 + v) for v in range(3)]
+                if compact:
+                    instance.compact()
+                instances.append(instance)
+            return (tracemalloc.get_traced_memory()[0] - before) / self.count
+        finally:
+            tracemalloc.stop()
+
+    def test_footprint_0(self):
+        full = self.retained(compact=False)
+        compact = self.retained(compact=True)
+
+        # About 20 KiB vs. 1.5 KiB for a server with three volumes
+        self.assertLess(compact, 4096)
+        self.assertLess(compact * 10, full)
+
+
+class TestStatusPoller(unittest.TestCase):
+
+    def test_wait_for_0(self):
+        listing = MagicMock(
+            side_effect=[
+                [MockVolume(1, status="creating"), MockVolume(2, status="creating")],
+                [MockVolume(1, status="available"), MockVolume(2, status="creating")],
+                [MockVolume(1, status="available"), MockVolume(2, status="available")],
+            ]
         )
-        self.assertEqual(instance.server.id, 8)
+        poller = StatusPoller(listing, 0.01)
+
+        reached = poller.wait_for([1, 2], "available", 5)
+
+        self.assertEqual(set(reached), {1, 2})
+        self.assertLess(reached[1], reached[2])
+        self.assertGreaterEqual(listing.call_count, 3)
+
+    def test_wait_for_transitions(self):
+        listing = MagicMock(
+            side_effect=[
+                [MockServer(1, status="BUILD", task_state="scheduling")],
+                [MockServer(1, status="BUILD", task_state="networking")],
+                [MockServer(1, status="BUILD", task_state="networking")],
+                [MockServer(1, status="BUILD", task_state="spawning")],
+                [MockServer(1, status="ACTIVE", task_state=None)],
+            ]
+        )
+        poller = StatusPoller(listing, 0.01, phase_attribute="task_state")
+        transitions = {}
+
+        reached = poller.wait_for([1], "ACTIVE", 5, transitions=transitions)
+
+        self.assertEqual(
+            [phase for _, phase in transitions[1]],
+            ["scheduling", "networking", "spawning", None],
+        )
+        self.assertEqual(transitions[1][-1][0], reached[1])
+
+    def test_wait_for_timeout(self):
+        poller = StatusPoller(lambda: [MockVolume(1, status="creating")], 0.01)
+        reached = {}
+
+        with self.assertRaises(ResourceTimeout):
+            poller.wait_for([1], "available", 0.05, reached=reached)
+        self.assertEqual(reached, {})
+
+    def test_watch_owners_0(self):
+        attachments = [{"server_id": "server-7"}]
+        listing = MagicMock(
+            side_effect=[
+                [MockVolume(1, status="downloading")],
+                [MockVolume(1, status="reserved", attachments=attachments)],
+                [MockVolume(1, status="attaching", attachments=attachments)],
+            ]
+            + [[MockVolume(1, status="in-use", attachments=attachments)]] * 100
+        )
+        poller = StatusPoller(
+            listing,
+            0.01,
+            phase_attribute="status",
+            owners_of=lambda v: [a["server_id"] for a in v.attachments],
+        )
+        start = time.time()
+
+        poller.watch_owners(["server-7"])
+        deadline = time.time() + 5
+        while listing.call_count < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        volume_id, transitions = poller.owned("server-7", start)
+        poller.unwatch_owners(["server-7"])
+
+        # Found by the attachment, without a lookup of the server
+        self.assertEqual(volume_id, 1)
+        self.assertEqual(
+            [phase for _, phase in transitions], ["reserved", "attaching", "in-use"]
+        )
+        self.assertIsNone(poller.owned("server-7", start))
 
 
 class TestCreate(TestBase):
@@ -214,10 +443,109 @@ class TestCreate(TestBase):
         self.assertEqual(len(instance.volumes), 5)
         self.assertEqual(mock_delete_server.call_count, 1)
 
+    @patch("openstack_simple_stress.main.create_volume")
+    @patch("openstack_simple_stress.main.create_server")
+    def test_create_2(self, mock_create_server, mock_create_volume):
+        # Volumes are created while the server is still building
+        volumes_started = threading.Barrier(3, timeout=5)
+
+        def _create_server(*args, **kwargs):
+            volumes_started.wait()
+            return MockServer(7)
+
+        def _create_volume(cloud, name, *args, **kwargs):
+            volumes_started.wait()
+            return MockVolume(name)
+
+        mock_create_server.side_effect = _create_server
+        mock_create_volume.side_effect = _create_volume
+
+        instance = create(
+            self.mock_cloud,
+            "ServerName",
+            "UserData",
+            "ComputeZone",
+            True,
+            2,
+            "StorageZone",
+            50,
+            MagicMock(),
+            "VolumeType",
+            MagicMock(),
+            MOCK_META,
+            report=MOCK_REPORT,
+        )
+
+        self.assertEqual(
+            [v.id for v in instance.volumes],
+            ["ServerName-volume-0", "ServerName-volume-1"],
+        )
+        self.assertEqual(self.mock_cloud.os_cloud.attach_volume.call_count, 2)
+
+    @patch("openstack_simple_stress.main.create_volume")
+    @patch("openstack_simple_stress.main.create_server")
+    def test_create_3(self, mock_create_server, mock_create_volume):
+        # Volumes of a lifecycle whose server failed are deleted again
+        mock_create_server.side_effect = RuntimeError("boom")
+        mock_create_volume.return_value = MockVolume(17)
+
+        with self.assertRaises(RuntimeError):
+            create(
+                self.mock_cloud,
+                "ServerName",
+                "UserData",
+                "ComputeZone",
+                True,
+                3,
+                "StorageZone",
+                50,
+                MagicMock(),
+                "VolumeType",
+                MagicMock(),
+                MOCK_META,
+                report=MOCK_REPORT,
+            )
+
+        self.assertEqual(
+            self.mock_cloud.os_cloud.block_storage.delete_volume.call_count, 3
+        )
+
+    @patch("openstack_simple_stress.main.delete_server")
+    @patch("openstack_simple_stress.main.create_volume")
+    @patch("openstack_simple_stress.main.create_server")
+    def test_create_4(self, mock_create_server, mock_create_volume, mock_delete_server):
+        # A volume failed after the server was built, nothing is left behind
+        mock_create_server.return_value = MockServer(7)
+        mock_create_volume.side_effect = [MockVolume(17), RuntimeError("boom"), MockVolume(18)]
+
+        with self.assertRaises(RuntimeError):
+            create(
+                self.mock_cloud,
+                "ServerName",
+                "UserData",
+                "ComputeZone",
+                True,
+                3,
+                "StorageZone",
+                50,
+                MagicMock(),
+                "VolumeType",
+                MagicMock(),
+                MOCK_META,
+                report=MOCK_REPORT,
+            )
+
+        mock_delete_server.assert_called_once()
+        instance = mock_delete_server.call_args[0][0]
+        self.assertEqual(instance.server.id, 7)
+        self.assertEqual(sorted(v.id for v in instance.volumes), [17, 18])
+        self.mock_cloud.os_cloud.attach_volume.assert_not_called()
+
     def test_create_volume_0(self):
         self.mock_cloud.os_cloud.block_storage.create_volume.return_value = MockVolume(
-            17
+            17, status="creating"
         )
+        self.mock_cloud.os_cloud.block_storage.get_volume.return_value = MockVolume(17)
 
         volume = create_volume(
             self.mock_cloud, "VolumeName", "StorageZone", 22, "VolumeType", MOCK_META
@@ -230,15 +558,45 @@ class TestCreate(TestBase):
             size=22,
             volume_type="VolumeType",
         )
-        self.mock_cloud.os_cloud.block_storage.wait_for_status.assert_called_with(
-            volume,
-            status="available",
-            interval=MOCK_META.interval,
-            wait=MOCK_META.timeout,
+        self.assertEqual(volume.status, "available")
+        self.mock_cloud.os_cloud.block_storage.get_volume.assert_called_once_with(17)
+
+    def test_create_volume_phases(self):
+        block_storage = self.mock_cloud.os_cloud.block_storage
+        block_storage.create_volume.return_value = MockVolume(17, status="creating")
+        block_storage.volumes.side_effect = [
+            [MockVolume(17, status="creating")],
+            [MockVolume(17, status="downloading")],
+            [MockVolume(17, status="downloading")],
+            [MockVolume(17, status="available")],
+        ]
+        block_storage.get_volume.return_value = MockVolume(17)
+        report = Report()
+        meta = Meta(
+            wait=False, interval=0.01, timeout=5, delete=False, phase_breakdown=True
+        )
+
+        volume = create_volume(
+            self.mock_cloud,
+            "VolumeName",
+            "StorageZone",
+            22,
+            "VolumeType",
+            meta,
+            report=report,
+        )
+
+        self.assertEqual(volume.status, "available")
+        operations = [r.operation for r in report.records()]
+        self.assertEqual(
+            operations,
+            ["volume_status_creating", "volume_status_downloading", "volume_create"],
         )
 
     def test_create_server_0(self):
-        self.mock_cloud.os_cloud.compute.create_server.return_value = MockServer(7)
+        # The create response has no status yet
+        self.mock_cloud.os_cloud.compute.create_server.return_value = MockServer(7, status=None)
+        self.mock_cloud.os_cloud.compute.get_server.return_value = MockServer(7)
         self.mock_cloud.os_cloud.compute.get_server_console_output.return_value = (
             "The system is finally up"
         )
@@ -269,14 +627,12 @@ class TestCreate(TestBase):
             user_data="UserData",
             scheduler_hints={"group": 1234},
         )
-        self.mock_cloud.os_cloud.compute.wait_for_server.assert_called_with(
-            server,
-            interval=MOCK_META.interval,
-            wait=MOCK_META.timeout,
-        )
+        self.mock_cloud.os_cloud.compute.get_server.assert_called_once_with(7)
 
     def test_create_server_1(self):
-        self.mock_cloud.os_cloud.compute.create_server.return_value = MockServer(7)
+        # The create response has no status yet
+        self.mock_cloud.os_cloud.compute.create_server.return_value = MockServer(7, status=None)
+        self.mock_cloud.os_cloud.compute.get_server.return_value = MockServer(7)
         mock_server_group = MagicMock()
         mock_server_group.id = 1234
         mock_network = MagicMock()
@@ -304,12 +660,763 @@ class TestCreate(TestBase):
             user_data="UserData",
             scheduler_hints={"group": 1234},
         )
-        self.mock_cloud.os_cloud.compute.wait_for_server.assert_called_with(
-            server,
-            interval=MOCK_META.interval,
-            wait=MOCK_META.timeout,
+        self.mock_cloud.os_cloud.compute.get_server.assert_called_once_with(7)
+
+    def test_create_servers_0(self):
+        servers = []
+        for x in (2, 1, 3):
+            server = MockServer(f"srv-{x}", metadata={"simple-stress-run": "run-1"})
+            server.name = f"Batch-{x}"
+            server.status = "ACTIVE"
+            servers.append(server)
+        self.mock_cloud.os_cloud.compute.servers.return_value = servers
+        mock_server_group = MagicMock()
+        mock_server_group.id = 1234
+        mock_network = MagicMock()
+        mock_network.id = 5678
+        report = Report()
+        meta = Meta(wait=False, interval=0.01, timeout=5, delete=False, run_id="run-1")
+
+        created = create_servers(
+            self.mock_cloud,
+            "Batch",
+            3,
+            "UserData",
+            "ComputeZone",
+            mock_server_group,
+            mock_network,
+            meta,
+            boot_from_volume=False,
+            report=report,
+        )
+
+        self.assertEqual([s.name for s in created], ["Batch-1", "Batch-2", "Batch-3"])
+        self.mock_cloud.os_cloud.compute.create_server.assert_called_once_with(
+            min_count=3,
+            max_count=3,
+            availability_zone="ComputeZone",
+            name="Batch",
+            image_id=self.mock_cloud.os_image.id,
+            flavor_id=self.mock_cloud.os_flavor.id,
+            networks=[{"uuid": 5678}],
+            user_data="UserData",
+            scheduler_hints={"group": 1234},
+            metadata={"simple-stress-run": "run-1"},
+        )
+        operations = [r.operation for r in report.records()]
+        self.assertEqual(operations.count("server_create"), 1)
+        self.assertEqual(operations.count("server_wait_active"), 3)
+
+    def test_create_servers_1(self):
+        server = MockServer("srv-1", metadata={"simple-stress-run": "run-1"})
+        server.name = "Batch-1"
+        # Left by an earlier run with the same prefix
+        stale = [MockServer("old-1", metadata={"simple-stress-run": "run-0"}), MockServer("old-2")]
+        stale[0].name, stale[1].name = "Batch-1", "Batch-2"
+        # Only one of the two servers of this run is found
+        self.mock_cloud.os_cloud.compute.servers.return_value = [server] + stale
+        meta = Meta(wait=False, interval=0.01, timeout=5, delete=False, run_id="run-1")
+
+        with self.assertRaises(RuntimeError):
+            create_servers(
+                self.mock_cloud, "Batch", 2, "UserData", "ComputeZone", MagicMock(), MagicMock(), meta, boot_from_volume=False
+            )
+
+        self.mock_cloud.os_cloud.compute.delete_server.assert_called_once_with(server, ignore_missing=True)
+        with self.assertRaises(ValueError):
+            create_servers(
+                self.mock_cloud, "Batch", 1, "UserData", "ComputeZone", MagicMock(), MagicMock(), meta, boot_from_volume=False
+            )
+
+    @patch("openstack_simple_stress.main.delete_server")
+    @patch("openstack_simple_stress.main.create_volume")
+    @patch("openstack_simple_stress.main.create_servers")
+    def test_create_batch_0(
+        self, mock_create_servers, mock_create_volume, mock_delete_server
+    ):
+        servers = []
+        for x in range(1, 4):
+            server = MockServer(f"srv-{x}")
+            server.name = f"Batch-{x}"
+            servers.append(server)
+        mock_create_servers.return_value = servers
+        mock_create_volume.return_value = MockVolume(17)
+
+        instances = create_batch(
+            self.mock_cloud,
+            "Batch",
+            3,
+            "UserData",
+            "ComputeZone",
+            True,
+            2,
+            "StorageZone",
+            50,
+            MagicMock(),
+            "VolumeType",
+            MagicMock(),
+            MOCK_META_2,
+            report=MOCK_REPORT,
+        )
+
+        self.assertEqual(
+            sorted(i.server_name for i in instances), ["Batch-1", "Batch-2", "Batch-3"]
+        )
+        self.assertEqual(mock_create_volume.call_count, 6)
+        self.assertEqual(mock_delete_server.call_count, 3)
+        self.mock_cloud.os_cloud.compute.create_server.assert_not_called()
+
+    def test_create_server_phases(self):
+        self.mock_cloud.os_cloud.compute.create_server.return_value = MockServer(7)
+        self.mock_cloud.os_cloud.compute.servers.side_effect = [
+            [MockServer(7, status="BUILD", task_state="scheduling")],
+            [MockServer(7, status="BUILD", task_state="spawning")],
+            [MockServer(7, status="ACTIVE", task_state=None)],
+        ]
+        report = Report()
+        meta = Meta(
+            wait=False, interval=0.01, timeout=5, delete=False, phase_breakdown=True
+        )
+
+        create_server(
+            self.mock_cloud,
+            "ServerName",
+            "UserData",
+            "ComputeZone",
+            MagicMock(),
+            MagicMock(),
+            meta,
+            boot_from_volume=False,
+            report=report,
+        )
+
+        self.mock_cloud.os_cloud.compute.get_server.assert_not_called()
+        operations = [r.operation for r in report.records()]
+        self.assertEqual(
+            operations,
+            [
+                "server_create",
+                "server_wait_active",
+                "server_phase_scheduling",
+                "server_phase_spawning",
+            ],
+        )
+
+
+class TestInstanceActionCollector(TestBase):
+
+    def test_collect_0(self):
+        compute = self.mock_cloud.os_cloud.compute
+        compute.server_actions.return_value = [
+            MagicMock(action="create", request_id="req-1")
+        ]
+        compute.get_server_action.return_value = MagicMock(
+            start_time="2024-01-01T10:00:00.000000",
+            events=[
+                MagicMock(
+                    event="conductor_schedule_and_build_instances",
+                    start_time="2024-01-01T10:00:01.000000",
+                    finish_time="2024-01-01T10:00:03.000000",
+                    result="Success",
+                ),
+                MagicMock(
+                    event="compute__do_build_and_run_instance",
+                    start_time="2024-01-01T10:00:04.000000",
+                    finish_time="2024-01-01T10:00:12.500000",
+                    result="Error",
+                ),
+            ],
+        )
+        report = Report()
+
+        collector = InstanceActionCollector(self.mock_cloud, report, 100.0)
+        collector.add(7, "ServerName")
+        collector.close()
+
+        compute.get_server_action.assert_called_once_with("req-1", 7)
+        records = {r.operation: r for r in report.records()}
+        self.assertEqual(
+            records["server_action_conductor_schedule_and_build_instances"].duration,
+            2.0,
+        )
+        self.assertEqual(
+            records["server_action_compute__do_build_and_run_instance"].duration, 8.5
+        )
+        self.assertFalse(
+            records["server_action_compute__do_build_and_run_instance"].success
+        )
+        self.assertEqual(records["server_action_create"].duration, 12.5)
+        self.assertEqual(records["server_action_create"].resource_name, "ServerName")
+
+
+CONSOLE_OUTPUT = """\
+[    5.120000] cloud-init[512]: Cloud-init v. 23.1.2 running 'init-local' at Mon, 01 Jan 2024 10:00:00 +0000. Up 5.12 seconds.
+[    7.000000] cloud-init[600]: Cloud-init v. 23.1.2 running 'init' at Mon, 01 Jan 2024 10:00:02 +0000. Up 7.00 seconds.
+[   12.500000] cloud-init[700]: Cloud-init v. 23.1.2 running 'modules:config' at Mon, 01 Jan 2024 10:00:07 +0000. Up 12.50 seconds.
+[   14.000000] cloud-init[800]: Cloud-init v. 23.1.2 running 'modules:final' at Mon, 01 Jan 2024 10:00:09 +0000. Up 14.00 seconds.
+[   15.250000] cloud-init[800]: The system is finally up, after 15.25 seconds at Mon, 01 Jan 2024 10:00:10 +0000
+"""
+
+
+class TestGuestBoot(TestBase):
+
+    def test_parse_guest_boot_0(self):
+        boot = parse_guest_boot(CONSOLE_OUTPUT)
+
+        self.assertEqual(boot.uptime, 15.25)
+        self.assertEqual(boot.finished_at, 1704103210.0)
+        self.assertEqual(
+            boot.stages,
+            [
+                ("init-local", 1.88),
+                ("init", 5.5),
+                ("modules:config", 1.5),
+                ("modules:final", 1.25),
+            ],
+        )
+
+    def test_parse_guest_boot_1(self):
+        self.assertIsNone(parse_guest_boot("Cloud-init v. 23.1.2 running 'init'"))
+
+        boot = parse_guest_boot("The system is finally up, after 9.5 seconds")
+        self.assertEqual(boot.uptime, 9.5)
+        self.assertIsNone(boot.finished_at)
+        self.assertEqual(boot.stages, [])
+
+    def test_wait_for_boot_0(self):
+        self.mock_cloud.os_cloud.compute.get_server_console_output.return_value = {
+            "output": CONSOLE_OUTPUT
+        }
+        report = Report()
+
+        wait_for_boot(self.mock_cloud, MockServer(7), "ServerName", report)
+
+        records = {r.operation: r for r in report.records()}
+        self.assertEqual(records["guest_boot"].duration, 15.25)
+        self.assertEqual(records["guest_stage_modules_config"].duration, 1.5)
+        self.assertIn("boot_detection_delay", records)
+        self.assertIn("server_wait_boot", records)
+
+
+class TestConnectionPool(TestBase):
+
+    def test_connection_0(self):
+        shared = self.mock_cloud.os_cloud
+        # Without a pool every thread uses the shared connection
+        with self.mock_cloud.connection() as connection:
+            self.assertIs(connection, shared)
+
+        self.mock_cloud.enable_connection_pool(2, {})
+        created = []
+
+        def new_connection():
+            created.append(MagicMock())
+            return created[-1]
+
+        self.mock_cloud._new_connection = new_connection
+        barrier = threading.Barrier(2)
+        seen = []
+
+        def lifecycle(concurrent=True):
+            with self.mock_cloud.connection() as connection:
+                # Nested checkouts keep the connection of the thread
+                with self.mock_cloud.connection() as nested:
+                    self.assertIs(nested, connection)
+                seen.append(self.mock_cloud.os_cloud)
+                if concurrent:
+                    barrier.wait(timeout=5)
+
+        threads = [threading.Thread(target=lifecycle) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # Returned connections are reused
+        lifecycle(concurrent=False)
+
+        self.assertEqual(len(created), 2)
+        self.assertEqual(set(map(id, seen[:2])), set(map(id, created)))
+        self.assertIn(seen[2], created)
+        self.assertIs(self.mock_cloud.os_cloud, shared)
+
+    @patch("openstack.connection.Connection")
+    @patch("openstack.config.cloud_region.from_session")
+    def test_new_connection_0(self, mock_from_session, mock_connection):
+        shared = self.mock_cloud.os_cloud
+        shared.config.config = {"region_name": "RegionOne"}
+        shared.compute.get_endpoint.return_value = "https://nova/v2.1"
+        shared.block_storage.get_endpoint.return_value = "https://cinder/v3/p"
+        shared.network.get_endpoint.return_value = "https://neutron"
+        shared.image.get_endpoint.return_value = "https://glance"
+        self.mock_cloud.throttle = MagicMock()
+        self.mock_cloud.enable_connection_pool(1, {"compute": 4})
+
+        connection = self.mock_cloud._new_connection()
+
+        session = mock_from_session.call_args.args[0]
+        self.assertIs(session.auth, shared.session.auth)
+        self.assertEqual(mock_from_session.call_args.kwargs, {"region_name": "RegionOne"})
+        self.assertEqual(
+            session.session.get_adapter("https://nova/v2.1/servers")._pool_maxsize, 4
+        )
+        self.assertEqual(
+            session.session.get_adapter("https://cinder/v3/p/volumes")._pool_maxsize,
+            10,
+        )
+        self.mock_cloud.throttle.install.assert_called_once_with(connection)
+
+    def test_bind_0(self):
+        self.mock_cloud.enable_connection_pool(1, {})
+        self.mock_cloud._new_connection = MagicMock
+        seen = []
+
+        def worker():
+            seen.append(self.mock_cloud.os_cloud)
+
+        with self.mock_cloud.connection() as connection:
+            # Workers of an inner pool use the connection of the lifecycle
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(self.mock_cloud.bind(worker)).result()
+                pool.submit(worker).result()
+
+        self.assertIs(seen[0], connection)
+        self.assertIs(seen[1], self.mock_cloud._os_cloud)
+        self.assertIs(self.mock_cloud.bind(worker), worker)
+
+
+def auth_state(expires_at):
+    return json.dumps(
+        {
+            "auth_token": "gAAAA-token",
+            "body": {"token": {"expires_at": expires_at, "catalog": []}},
+        }
+    )
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name) / "cache"
+        environ = patch.dict(os.environ, {TOKEN_CACHE_KEY_ENV: "secret"})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+    def os_cloud(self, state, **auth):
+        os_cloud = MagicMock()
+        os_cloud.config.config = {
+            "auth": {"auth_url": "https://keystone", "username": "admin", **auth}
+        }
+        os_cloud.session.auth.get_auth_state.return_value = state
+        return os_cloud
+
+    def test_save_load_0(self):
+        state = auth_state("2099-01-01T00:00:00.000000Z")
+        os_cloud = self.os_cloud(state, project_name="admin")
+
+        TokenCache(self.directory).save(os_cloud, "CloudName")
+
+        # The salt and the encrypted state, only readable by the user
+        paths = list(self.directory.iterdir())
+        self.assertEqual(len(paths), 2)
+        for path in paths:
+            self.assertEqual(path.stat().st_mode & 0o777, 0o600)
+        token_file = next(self.directory.glob("*.token"))
+        self.assertNotIn(b"expires_at", token_file.read_bytes())
+
+        other = self.os_cloud(None, project_name="admin")
+        self.assertTrue(TokenCache(self.directory).load(other, "CloudName"))
+        other.session.auth.set_auth_state.assert_called_once_with(state)
+        self.assertFalse(TokenCache(self.directory).load(other, "OtherCloud"))
+
+        # Another project or passphrase does not get the token
+        project = self.os_cloud(None, project_name="demo")
+        self.assertFalse(TokenCache(self.directory).load(project, "CloudName"))
+        with patch.dict(os.environ, {TOKEN_CACHE_KEY_ENV: "other"}):
+            self.assertFalse(TokenCache(self.directory).load(other, "CloudName"))
+
+    def test_save_load_1(self):
+        # Without a passphrase or keyring nothing is cached
+        os_cloud = self.os_cloud(auth_state("2099-01-01T00:00:00.000000Z"))
+        with patch.dict(os.environ, clear=True), patch.dict(
+            "sys.modules", {"keyring": None}
+        ):
+            TokenCache(self.directory).save(os_cloud, "CloudName")
+            self.assertFalse(TokenCache(self.directory).load(os_cloud, "CloudName"))
+        self.assertEqual(list(self.directory.glob("*.token")), [])
+
+    def test_load_expired(self):
+        os_cloud = self.os_cloud(auth_state("2001-01-01T00:00:00.000000Z"))
+        TokenCache(self.directory).save(os_cloud, "CloudName")
+
+        self.assertFalse(TokenCache(self.directory).load(os_cloud, "CloudName"))
+        os_cloud.session.auth.set_auth_state.assert_not_called()
+
+
+FLAVOR_ID = "3b1c2f6e-8d0a-4c55-9a57-6f1f3f0f9a10"
+
+
+class TestResourceCache(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "resources.json"
+
+    @patch("openstack.connect")
+    def test_cloud_uuid(self, mock_connect):
+        os_cloud = mock_connect.return_value
+
+        cloud = Cloud(FLAVOR_ID, FLAVOR_ID, "ImageName")
+
+        os_cloud.compute.get_flavor.assert_called_once_with(FLAVOR_ID)
+        os_cloud.get_flavor.assert_not_called()
+        os_cloud.get_image.assert_called_once_with("ImageName")
+        self.assertIs(cloud.os_flavor, os_cloud.compute.get_flavor.return_value)
+
+    def cloud(self, **kwargs):
+        return Cloud(
+            "CloudName",
+            "FlavorName",
+            "ImageName",
+            resource_cache=ResourceCache(self.path, **kwargs),
+        )
+
+    @patch("openstack.connect")
+    def test_cloud_cached(self, mock_connect):
+        os_cloud = mock_connect.return_value
+        os_cloud.get_flavor.return_value = MagicMock(id="flavor-1")
+        os_cloud.get_image.return_value = MagicMock(id="image-1")
+
+        self.cloud()
+        os_cloud.reset_mock()
+        self.cloud()
+
+        os_cloud.get_flavor.assert_not_called()
+        os_cloud.compute.get_flavor.assert_called_once_with("flavor-1")
+        os_cloud.image.get_image.assert_called_once_with("image-1")
+
+        # Expired, refreshed or vanished entries are resolved by name again
+        self.cloud(ttl=-1)
+        self.cloud(refresh=True)
+        os_cloud.compute.get_flavor.side_effect = NotFoundException("gone")
+        self.cloud()
+        self.assertEqual(os_cloud.get_flavor.call_count, 3)
+
+
+class TestRequestThrottle(unittest.TestCase):
+
+    def test_token_bucket_0(self):
+        bucket = TokenBucket(20.0)
+
+        waits = [bucket.acquire() for _ in range(25)]
+
+        # The burst is served immediately, the rest at the configured rate
+        self.assertEqual(waits[:20], [0.0] * 20)
+        self.assertGreater(sum(waits), 0.2)
+
+    def test_parse_rate_limits_0(self):
+        self.assertEqual(
+            parse_rate_limits(["compute=5", "block-storage=0.5"]),
+            {"compute": 5.0, "block-storage": 0.5},
+        )
+        self.assertEqual(parse_rate_limits({"network": 2}), {"network": 2.0})
+        self.assertEqual(parse_rate_limits(None), {})
+        with self.assertRaises(ValueError):
+            parse_rate_limits(["compute"])
+        with self.assertRaises(ValueError):
+            parse_rate_limits(["compute=0"])
+
+    def test_request_retry_0(self):
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0"})
+        ok = MagicMock(status_code=200, headers={})
+        session = MagicMock()
+        session.request.side_effect = [throttled, throttled, ok]
+        os_cloud = MagicMock(session=session)
+        send = session.request
+        report = Report()
+
+        RequestThrottle({"compute": 100.0}, 3, report).install(os_cloud)
+        response = os_cloud.session.request(
+            "/servers", "POST", endpoint_filter={"service_type": "compute"}
         )
 
+        self.assertIs(response, ok)
+        self.assertEqual(send.call_count, 3)
+        operations = [r.operation for r in report.records()]
+        self.assertEqual(operations, ["api_retry_compute", "api_retry_compute"])
+
+    def test_request_retry_1(self):
+        throttled = MagicMock(status_code=503, headers={"Retry-After": "0"})
+        session = MagicMock()
+        session.request.return_value = throttled
+        os_cloud = MagicMock(session=session)
+        send = session.request
+
+        RequestThrottle({}, 1, Report()).install(os_cloud)
+        response = os_cloud.session.request("/volumes", "GET")
+
+        self.assertIs(response, throttled)
+        self.assertEqual(send.call_count, 2)
+
+    def test_request_retry_2(self):
+        # A create answered with 503 may exist, it is not sent again
+        unavailable = MagicMock(status_code=503, headers={"Retry-After": "0"})
+        session = MagicMock()
+        session.request.return_value = unavailable
+        os_cloud = MagicMock(session=session)
+        send = session.request
+
+        RequestThrottle({}, 3, Report()).install(os_cloud)
+        response = os_cloud.session.request("/servers", "POST")
+
+        self.assertIs(response, unavailable)
+        self.assertEqual(send.call_count, 1)
+
+    def test_request_retry_cancel(self):
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "60"})
+        session = MagicMock()
+        session.request.return_value = throttled
+        os_cloud = MagicMock(session=session)
+
+        RequestThrottle({}, 3, Report()).install(os_cloud)
+        cancel_token.cancel()
+        self.addCleanup(cancel_token.reset)
+        with self.assertRaises(WaitCancelled):
+            os_cloud.session.request("/servers", "GET")
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_call_0(self):
+        fn = MagicMock(side_effect=[ConflictException("busy", http_status=409), "server"])
+        report = Report()
+        policy = RetryPolicy({"server_create": 2}, backoff=0)
+
+        with report.track("server_create", "ServerName") as op:
+            result = policy.call("server_create", op, fn, name="ServerName")
+
+        self.assertEqual(result, "server")
+        fn.assert_called_with(name="ServerName")
+        self.assertEqual(report.records()[0].retries, 1)
+        self.assertTrue(report.records()[0].success)
+
+    def test_call_1(self):
+        policy = RetryPolicy({"server_create": 2, "volume_delete": 2}, backoff=0)
+
+        # Not transient
+        fn = MagicMock(side_effect=NotFoundException("gone", http_status=404))
+        with self.assertRaises(NotFoundException):
+            policy.call("server_create", None, fn)
+        self.assertEqual(fn.call_count, 1)
+
+        # Only volume_delete retries 400 (volume still detaching)
+        fn = MagicMock(side_effect=BadRequestException("detaching", http_status=400))
+        with self.assertRaises(BadRequestException):
+            policy.call("server_create", None, fn)
+        self.assertEqual(fn.call_count, 1)
+        with self.assertRaises(BadRequestException):
+            policy.call("volume_delete", None, fn)
+        self.assertEqual(fn.call_count, 4)
+
+    def test_call_2(self):
+        policy = RetryPolicy({"server_create": 2, "server_delete": 2}, backoff=0)
+
+        # A create that failed with a server error may have created the server
+        fn = MagicMock(side_effect=HttpException("error", http_status=500))
+        with self.assertRaises(HttpException):
+            policy.call("server_create", None, fn)
+        self.assertEqual(fn.call_count, 1)
+        with self.assertRaises(HttpException):
+            policy.call("server_delete", None, fn)
+        self.assertEqual(fn.call_count, 4)
+
+        fn = MagicMock(side_effect=[HttpException("busy", http_status=503), "server"])
+        self.assertEqual(policy.call("server_create", None, fn), "server")
+
+    def test_track_error_type(self):
+        report = Report()
+
+        with self.assertRaises(ConflictException):
+            with report.track("server_delete", "ServerName"):
+                raise ConflictException("busy", http_status=409)
+
+        self.assertEqual(report.records()[0].error_type, "ConflictException (HTTP 409)")
+        self.assertFalse(report.records()[0].success)
+
+    def test_parse_retries_0(self):
+        self.assertEqual(
+            parse_retries(["server_create=3", "volume_delete=5"]),
+            {"server_create": 3, "volume_delete": 5},
+        )
+        with self.assertRaises(ValueError):
+            parse_retries(["network_create=1"])
+
+    def test_parse_slos_0(self):
+        slos = parse_slos(["server_wait_active.p95<60", "error_rate <= 1%", "server_create.p99.9 < 2.5"])
+
+        self.assertEqual([str(s) for s in slos], ["server_wait_active.p95 < 60", "error_rate <= 0.01", "server_create.p99.9 < 2.5"])
+        self.assertEqual(parse_slos({"server_create.max": "< 10"})[0].threshold, 10.0)
+        self.assertEqual(parse_slos(None), [])
+        for value in ["server_create.p42<1", "latency<1", "server_create.mean=1", "server_create.mean<fast"]:
+            with self.assertRaises(ValueError):
+                parse_slos([value])
+
+
+class TestRunHistory(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.history = RunHistory(Path(directory.name) / "history.sqlite")
+
+    def report(self, run_id, cloud, duration, start_time):
+        report = Report()
+        report.start_time = start_time
+        report.params = {"run_id": run_id, "cloud": cloud, "profile": None, "rate_limit": {"compute": 5.0}}
+        for x in range(4):
+            report.record("server_create", f"simple-stress-{x}", duration, x != 0, "boom" if x == 0 else None)
+        report.finalize()
+        return report
+
+    def test_history_0(self):
+        self.history.save(self.report("run-1", "test", 10.0, 100.0))
+        self.history.save(self.report("run-2", "test", 20.0, 200.0), records=True)
+        self.history.save(self.report("run-3", "other", 30.0, 300.0))
+
+        runs = self.history.runs("test", None)
+
+        self.assertEqual([r["run_id"] for r in runs], ["run-1", "run-2"])
+        self.assertEqual(runs[1]["operations"]["server_create"], {"count": 4, "errors": 1, "error_rate": 0.25, "p95": 20.0})
+        self.assertEqual(self.history.runs("test", "burnin"), [])
+        self.assertEqual([r["run_id"] for r in self.history.runs("test", None, limit=1)], ["run-2"])
+
+        connection = sqlite3.connect(self.history.path)
+        self.addCleanup(connection.close)
+        records = connection.execute("SELECT run, resource, success, error FROM records ORDER BY resource").fetchall()
+        self.assertEqual(records[0], (2, "simple-stress-0", 0, "boom"))
+        self.assertEqual(len(records), 4)
+        params = json.loads(connection.execute("SELECT params FROM runs WHERE id = 1").fetchone()[0])
+        self.assertEqual(params["rate_limit"], {"compute": 5.0})
+
+    def test_history_2(self):
+        # The same profile, however it is spelled
+        profile = Path(self.history.path.parent) / "nightly.yaml"
+        profile.write_text("number: 1\n")
+        report = self.report("run-1", "test", 10.0, 100.0)
+        report.params["profile"] = str(profile)
+        self.history.save(report)
+        report = self.report("run-2", "test", 10.0, 200.0)
+        report.params["profile"] = "burnin"
+        self.history.save(report)
+
+        runs = self.history.runs("test", os.path.relpath(profile))
+        self.assertEqual([r["run_id"] for r in runs], ["run-1"])
+        runs = self.history.runs("test", "burnin.yaml")
+        self.assertEqual([r["run_id"] for r in runs], ["run-2"])
+
+    def test_history_1(self):
+        # Nothing saved yet, nothing created
+        self.assertEqual(self.history.runs("test", None), [])
+        self.assertFalse(self.history.path.exists())
+
+
+class TestPhoneHome(TestBase):
+
+    SERVER_ID = "0b1f3c6e-5d2a-4f7b-9c8e-1a2b3c4d5e6f"
+
+    def setUp(self):
+        super().setUp()
+        self.listener = PhoneHomeListener("127.0.0.1", 0)
+        self.addCleanup(self.listener.close)
+
+    def phone_home(self, server_id=SERVER_ID, data=None):
+        if data is None:
+            data = f"instance_id={server_id}".encode()
+        url = f"http://127.0.0.1:{self.listener.port}/{server_id}"
+        with urlopen(url, data=data) as response:
+            self.assertEqual(response.status, 200)
+
+    def test_wait_for_0(self):
+        self.phone_home(data=f"instance_id={self.SERVER_ID}&uptime=12.5".encode())
+
+        arrived, uptime = self.listener.wait_for(self.SERVER_ID, 1)
+
+        self.assertEqual(uptime, 12.5)
+
+    @patch("openstack_simple_stress.main.logger")
+    def test_wait_for_1(self, mock_logger):
+        other = "9d8c7b6a-5f4e-4d3c-8b2a-1f0e9d8c7b6a"
+        for server_id, data in (
+            ("7", b"instance_id=7"),
+            (self.SERVER_ID, b"instance_id=x"),
+            (self.SERVER_ID, f"instance_id={other}".encode()),
+        ):
+            with self.assertRaises(HTTPError) as cm:
+                self.phone_home(server_id, data)
+            self.assertEqual(cm.exception.code, 404)
+
+        with self.assertRaises(ResourceTimeout):
+            self.listener.wait_for(self.SERVER_ID, 0.05)
+        self.assertEqual(mock_logger.warning.call_count, 3)
+
+    def test_wait_for_timeout(self):
+        with self.assertRaises(ResourceTimeout):
+            self.listener.wait_for(self.SERVER_ID, 0.05)
+
+    def test_wait_for_boot_0(self):
+        report = Report()
+        meta = Meta(
+            wait=True,
+            interval=10,
+            timeout=5,
+            delete=False,
+            phone_home=self.listener,
+        )
+        guest = threading.Timer(0.05, self.phone_home)
+        guest.start()
+
+        wait_for_boot(self.mock_cloud, MockServer(self.SERVER_ID), "ServerName", report, meta)
+
+        guest.join()
+        self.assertEqual(report.records()[0].operation, "server_wait_boot")
+        self.assertTrue(report.records()[0].success)
+
+    @patch("openstack_simple_stress.main.logger")
+    def test_wait_for_boot_1(self, mock_logger):
+        self.mock_cloud.os_cloud.compute.get_server_console_output.return_value = {
+            "output": "Failed to run module scripts-user\n"
+        }
+        meta = Meta(
+            wait=True,
+            interval=10,
+            timeout=5,
+            delete=False,
+            phone_home=self.listener,
+        )
+        self.phone_home()
+
+        wait_for_boot(self.mock_cloud, MockServer(self.SERVER_ID), "ServerName", Report(), meta)
+
+        # One look at the console after the guest phoned home
+        self.mock_cloud.os_cloud.compute.get_server_console_output.assert_called_once()
+        mock_logger.error.assert_called_once_with(
+            f"Failed tests for {self.SERVER_ID} (ServerName)"
+        )
+
+    def test_with_phone_home(self):
+        url = self.listener.url
+        self.assertTrue(url.endswith("/$INSTANCE_ID"))
+
+        user_data = with_phone_home("#cloud-config\nfinal_message: up\n", url)
+        self.assertIn(f'  url: "{url}"', user_data)
+
+        user_data = with_phone_home("#!/bin/bash\necho up\n", url)
+        self.assertIn("multipart/mixed", user_data)
+        self.assertIn("text/cloud-config", user_data)
+        self.assertIn("text/x-shellscript", user_data)
+
 
 class TestDelete(TestBase):
 
@@ -337,25 +1444,491 @@ class TestDelete(TestBase):
 
         delete_server(instance, MOCK_META, report=MOCK_REPORT)
 
-        self.mock_cloud.os_cloud.compute.delete_server.assert_called_with(
-            instance.server
+        # The instance is compact, the calls get resources built from the handles
+        compute = self.mock_cloud.os_cloud.compute
+        self.assertEqual(compute.delete_server.call_args.args[0].id, instance.server.id)
+        self.assertEqual(
+            compute.wait_for_delete.call_args.args[0].id, instance.server.id
         )
-        self.mock_cloud.os_cloud.compute.wait_for_delete.assert_called_with(
-            instance.server, interval=MOCK_META.interval, wait=MOCK_META.timeout
+        self.assertEqual(
+            compute.wait_for_delete.call_args.kwargs,
+            {"interval": MOCK_META.interval, "wait": MOCK_META.timeout},
         )
+        block_storage = self.mock_cloud.os_cloud.block_storage
+        self.assertEqual(block_storage.delete_volume.call_count, 5)
+        self.assertEqual(block_storage.wait_for_delete.call_count, 5)
         self.assertEqual(
-            self.mock_cloud.os_cloud.block_storage.delete_volume.call_count, 5
+            block_storage.delete_volume.call_args.args[0].id, instance.volumes[4].id
         )
         self.assertEqual(
-            self.mock_cloud.os_cloud.block_storage.wait_for_delete.call_count, 5
+            block_storage.wait_for_delete.call_args.kwargs,
+            {"interval": MOCK_META.interval, "wait": MOCK_META.timeout},
+        )
+
+    def test_delete_server_1(self):
+        server = MockServer(7)
+        instance = Instance(
+            self.mock_cloud,
+            "ServerName",
+            "UserData",
+            "ComputeZone",
+            MagicMock(),
+            MagicMock(),
+            MOCK_META_2,
+            server=server,
         )
+        instance.volumes = [MockVolume(17)]
+
+        delete_server(instance, MOCK_META, report=MOCK_REPORT)
+
+        # Full resources are passed through untouched
+        self.mock_cloud.os_cloud.compute.delete_server.assert_called_with(server)
         self.mock_cloud.os_cloud.block_storage.delete_volume.assert_called_with(
-            instance.volumes[3]
+            instance.volumes[0]
         )
-        self.mock_cloud.os_cloud.block_storage.wait_for_delete.assert_called_with(
-            instance.volumes[3], interval=MOCK_META.interval, wait=MOCK_META.timeout
+
+
+class TestCancel(TestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(cancel_token.reset)
+
+    def cancel_soon(self):
+        timer = threading.Timer(0.1, cancel_token.cancel)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+    def test_wait_for_boot_cancel(self):
+        self.mock_cloud.os_cloud.compute.get_server_console_output.return_value = (
+            "Booting"
+        )
+        self.cancel_soon()
+
+        started = time.time()
+        with self.assertRaises(WaitCancelled):
+            wait_for_boot(self.mock_cloud, MockServer(1), "ServerName", meta=MOCK_META)
+        self.assertLess(time.time() - started, 1.0)
+
+    def test_status_poller_cancel(self):
+        poller = StatusPoller(lambda: [MockVolume(1, status="creating")], 0.01)
+        self.cancel_soon()
+
+        started = time.time()
+        with self.assertRaises(WaitCancelled):
+            poller.wait_for([1], "available", 600)
+        # Condition waits re-check the token every second
+        self.assertLess(time.time() - started, 2.0)
+
+    def test_delete_leftovers(self):
+        compute = self.mock_cloud.os_cloud.compute
+        block_storage = self.mock_cloud.os_cloud.block_storage
+        run = {"simple-stress-run": "run-1"}
+        servers = [MagicMock(id=f"srv-{x}", metadata=run) for x in range(3)]
+        # Same prefix, created by another run
+        servers.append(MagicMock(id="srv-3", metadata={"simple-stress-run": "run-0"}))
+        volumes = [
+            MagicMock(id="vol-0", status="available", metadata=run),
+            MagicMock(id="vol-1", status="in-use", metadata=run),
+            MagicMock(id="vol-2", status="deleting", metadata=run),
+            MagicMock(id="vol-3", status="available", metadata=run),
+            MagicMock(id="vol-4", status="available", metadata={}),
+        ]
+        volumes[3].name = "other-volume"
+        volumes[4].name = "simple-stress-0-volume-vol-4"
+        for volume in volumes[:3]:
+            volume.name = f"simple-stress-0-volume-{volume.id}"
+        compute.servers.return_value = servers
+        block_storage.volumes.return_value = volumes
+        instance = MagicMock()
+        instance.server.id = "srv-0"
+        instance.volumes = [MockVolume("vol-0")]
+
+        delete_leftovers(
+            self.mock_cloud, "simple-stress", "run-1", [instance], MOCK_META, Report(), 2
         )
 
+        compute.servers.assert_called_with(name="^simple-stress-")
+        self.assertEqual(
+            {c.args[0].id for c in compute.delete_server.call_args_list},
+            {"srv-1", "srv-2"},
+        )
+        self.assertEqual(compute.wait_for_delete.call_count, 2)
+        block_storage.delete_volume.assert_called_once_with(volumes[1])
+
+    def test_cancelled_records(self):
+        report = Report()
+
+        with self.assertRaises(WaitCancelled):
+            with report.track("server_wait_boot", "simple-stress-0"):
+                raise WaitCancelled()
+        report.record("volume_attach", "simple-stress-0-vol-1", 1.0, False, "", "WaitCancelled")
+        report.record("server_create", "simple-stress-0", 1.0, False, "boom", "Timeout")
+
+        self.assertEqual(report.cancelled(), {"server_wait_boot": 1, "volume_attach": 1})
+        self.assertEqual([r.operation for r in report.records()], ["server_create"])
+
+    @patch("openstack_simple_stress.main.shutdown_requested", False)
+    @patch("sys.stdin")
+    def test_signal_handler_0(self, mock_stdin):
+        # Without a terminal there is nobody to ask
+        mock_stdin.isatty.return_value = False
+        signal_handler(signal.SIGINT, None)
+
+        self.assertTrue(cancel_token.cancelled)
+        # A second CTRL+C does not wait for the cleanup
+        with self.assertRaises(KeyboardInterrupt):
+            signal_handler(signal.SIGINT, None)
+
+    @patch("openstack_simple_stress.main.shutdown_requested", False)
+    @patch("builtins.input")
+    @patch("sys.stdin")
+    def test_signal_handler_1(self, mock_stdin, mock_input):
+        mock_stdin.isatty.return_value = True
+        answered = threading.Event()
+        answers = iter(["n", "y"])
+
+        def _input(prompt):
+            answered.set()
+            return next(answers)
+
+        mock_input.side_effect = _input
+
+        # The handler returns at once, the prompt runs in a thread of its own
+        for cancelled in (False, True):
+            answered.clear()
+            signal_handler(signal.SIGINT, None)
+            self.assertTrue(answered.wait(5))
+            deadline = time.time() + 5
+            while abort_prompt.is_set() and not cancel_token.cancelled and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(cancel_token.cancelled, cancelled)
+
+
+class TestReport(unittest.TestCase):
+
+    def test_corrected_durations_0(self):
+        report = Report()
+        report.record("network_create", "simple-stress", 1.0, True, start=0.0)
+        report.record("schedule_lag", "simple-stress-0", 0.0, True, start=1.0)
+        report.record("schedule_lag", "simple-stress-1", 5.0, True, start=1.0)
+        report.record("server_create", "simple-stress-0", 2.0, True, start=1.0)
+        # The volumes are created first, concurrently with the server
+        report.record("volume_create", "simple-stress-1-volume-0", 1.0, True, start=6.0)
+        report.record("volume_create", "simple-stress-1-volume-1", 1.5, True, start=6.0)
+        report.record("server_create", "simple-stress-1", 2.0, True, start=6.1)
+        report.record("server_wait_active", "simple-stress-1", 20.0, True, start=8.1)
+        report.record("volume_attach", "simple-stress-1-volume-0", 0.5, True, start=28.1)
+        # Batch servers are named <lifecycle>-<n>
+        report.record("server_wait_boot", "simple-stress-1-3", 10.0, True, start=8.0)
+        report.record("server_create", "simple-stress-2", 3.0, True, start=9.0)
+
+        corrected = report.corrected_durations()
+
+        self.assertNotIn("schedule_lag", corrected)
+        self.assertEqual(corrected["network_create"], [1.0])
+        # The creates a lifecycle starts when due waited for the slot
+        self.assertEqual(corrected["server_create"], [2.0, 7.0, 3.0])
+        self.assertEqual(corrected["volume_create"], [6.0, 6.5])
+        self.assertEqual(corrected["server_wait_active"], [20.0])
+        self.assertEqual(corrected["volume_attach"], [0.5])
+        self.assertEqual(corrected["server_wait_boot"], [10.0])
+
+    def test_duration_stats_0(self):
+        durations = [0.5, 3.0, 1.0, 2.0, 10.0, 4.0]
+
+        stats = duration_stats(["op"] * 6 + ["single"], durations + [7.0])
+
+        self.assertEqual(stats["op"].count, 6)
+        self.assertEqual((stats["op"].min, stats["op"].max), (0.5, 10.0))
+        self.assertAlmostEqual(stats["op"].mean, statistics.mean(durations))
+        self.assertAlmostEqual(stats["op"].stdev, statistics.stdev(durations))
+        inclusive = statistics.quantiles(durations, n=20, method="inclusive")
+        self.assertAlmostEqual(stats["op"].percentiles[0.5], 2.5)
+        self.assertAlmostEqual(stats["op"].percentiles[0.9], 7.0)
+        self.assertAlmostEqual(stats["op"].percentiles[0.95], inclusive[-1])
+        self.assertEqual(stats["single"].stdev, 0.0)
+        self.assertEqual(set(stats["single"].percentiles.values()), {7.0})
+        self.assertEqual(duration_stats([], []), {})
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "NumPy is not installed")
+    def test_duration_stats_numpy(self):
+        random.seed(3)
+        operations = [random.choice(["a", "b", "c"]) for _ in range(1000)]
+        durations = [random.expovariate(1) for _ in operations]
+
+        stats = duration_stats(operations, durations)
+        with patch.dict("sys.modules", {"numpy": None}):
+            expected = duration_stats(operations, durations)
+
+        for op in expected:
+            self.assertEqual(stats[op].count, expected[op].count)
+            self.assertAlmostEqual(stats[op].mean, expected[op].mean)
+            self.assertAlmostEqual(stats[op].stdev, expected[op].stdev)
+            for q, value in expected[op].percentiles.items():
+                self.assertAlmostEqual(stats[op].percentiles[q], value)
+
+    def test_print_report_large(self):
+        report = Report()
+        operations = ["server_create", "volume_create", "server_delete"]
+        for x in range(1_000_000):
+            report.record(operations[x % 3], f"simple-stress-{x}", x / 1000, True)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            report.print_report()
+
+        self.assertIn("P99.9", output.getvalue())
+
+    def test_trace_0(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "trace.json"
+            report = Report()
+            report.trace = TraceWriter(path, "run-1")
+
+            report.record("server_create", "simple-stress-0", 1.5, True, start=10.0)
+            worker = threading.Thread(
+                target=report.record,
+                args=("server_delete", "simple-stress-0", 0.25, False, "boom", "Timeout"),
+                kwargs={"start": 12.0},
+                name="worker-1",
+            )
+            worker.start()
+            worker.join()
+            report.trace.close()
+            report.record("server_delete", "simple-stress-1", 0.5, True)
+
+            events = json.loads(path.read_text())
+
+        spans = [e for e in events if e["ph"] == "X"]
+        threads = {e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"}
+        self.assertEqual(events[0]["args"]["name"], "openstack-simple-stress run-1")
+        self.assertEqual([e["name"] for e in spans], ["server_create", "server_delete"])
+        self.assertEqual((spans[0]["ts"], spans[0]["dur"]), (10_000_000, 1_500_000))
+        self.assertEqual(spans[1]["args"], {"resource": "simple-stress-0", "success": False, "error_type": "Timeout"})
+        self.assertEqual(threads[spans[1]["tid"]], "worker-1")
+        self.assertNotEqual(spans[0]["tid"], spans[1]["tid"])
+
+    def test_saturation_0(self):
+        report = Report()
+        report.params = {"parallel": 2}
+        # Two of the three queued lifecycles are due (--rate)
+        sampler = SaturationSampler(report, 2, interval=3600, not_due=lambda now: 1)
+
+        report.adjust("workers_busy", 2)
+        report.adjust("lifecycles_queued", 3)
+        with report.track("server_create", "simple-stress-0"):
+            sampler.sample()
+        report.adjust("workers_busy", -2)
+        report.adjust("lifecycles_queued", -3)
+        # Takes the last sample
+        sampler.close()
+
+        stats = report.sample_stats()
+        self.assertEqual(stats["in_flight.server_create"], (0.5, 1))
+        self.assertEqual(stats["workers.busy"], (1.0, 2))
+        self.assertEqual(stats["workers.queued"], (1.0, 2))
+        self.assertEqual(stats["saturated.workers"], (0.5, 1))
+        self.assertGreaterEqual(stats["driver.threads"][1], 1)
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            report.print_report()
+        self.assertIn("Client Saturation", output.getvalue())
+        self.assertIn("limited by --parallel", output.getvalue())
+
+    def test_saturation_1(self):
+        # Closed loop, all lifecycles are queued by design
+        report = Report()
+        sampler = SaturationSampler(report, 2, interval=3600)
+        report.adjust("workers_busy", 2)
+        report.adjust("lifecycles_queued", 3)
+        sampler.sample()
+        sampler.close()
+
+        stats = report.sample_stats()
+        self.assertEqual(stats["workers.queued"], (3.0, 3))
+        self.assertNotIn("saturated.workers", stats)
+
+    def test_stack_sampler_0(self):
+        def busy(stop):
+            while not stop.is_set():
+                sum(range(100))
+
+        stop = threading.Event()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "driver.folded"
+            profiler = StackSampler(path, interval=0.001)
+            threads = [
+                threading.Thread(target=busy, args=(stop,), name=name)
+                for name in ("ThreadPoolExecutor-0_1", "status_poller")
+            ]
+            for thread in threads:
+                thread.start()
+            deadline = time.time() + 5
+            while profiler.samples < 20 and time.time() < deadline:
+                time.sleep(0.01)
+            profiler.close()
+            stop.set()
+            for thread in threads:
+                thread.join()
+            lines = path.read_text().splitlines()
+
+        stacks = dict(line.rsplit(" ", 1) for line in lines)
+        worker_stacks = [stack for stack in stacks if stack.startswith("ThreadPoolExecutor-0;")]
+        self.assertTrue(worker_stacks)
+        # Only pool workers are merged, other names stay as they are
+        self.assertTrue(any(stack.startswith("status_poller;") for stack in stacks))
+        self.assertTrue(any("busy (test.py:" in stack for stack in worker_stacks))
+        self.assertTrue(all(int(count) > 0 for count in stacks.values()))
+
+    def test_evaluate_0(self):
+        report = Report()
+        for x in range(100):
+            report.record("server_create", f"simple-stress-{x}", x / 10, x != 0)
+            # Derived records do not count for the run-wide error rate
+            report.record("server_phase_spawning", f"simple-stress-{x}", 1.0, True)
+
+        results = report.evaluate(
+            parse_slos(["server_create.p50<10", "server_create.max<5", "error_rate<=1%", "volume_create.p95<1"])
+        )
+
+        self.assertEqual([r.passed for r in results], [True, False, True, False])
+        self.assertAlmostEqual(results[0].value, 4.95)
+        self.assertEqual(results[2].value, 0.01)
+        # No records, no value
+        self.assertIsNone(results[3].value)
+        summary = report.slo_summary(results)
+        self.assertFalse(summary["passed"])
+        self.assertEqual(summary["slos"][1]["slo"], "server_create.max < 5")
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            report.print_report(results)
+        self.assertIn("FAILED SLOS", output.getvalue())
+        # The derived records are not part of the total
+        self.assertRegex(output.getvalue(), r"TOTAL\s*│\s*100\s*│\s*1\s*│")
+
+    def test_evaluate_1(self):
+        # Nothing ran, the failed SLOs are still shown
+        report = Report()
+        results = report.evaluate(parse_slos(["server_create.p95<10"]))
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            report.print_report(results)
+
+        self.assertFalse(results[0].passed)
+        self.assertIn("server_create.p95 < 10", output.getvalue())
+        self.assertIn("FAIL", output.getvalue())
+
+    def test_records_0(self):
+        report = Report()
+        report.record("server_create", "simple-stress-0", 1.0, True, start=10.0)
+        report.record("server_create", "simple-stress-1", 2.0, False, "boom", "Timeout", 2)
+        for x in range(2, 10):
+            report.record("server_delete", f"simple-stress-{x}", 0.5, x != 9)
+
+        records = report.records()
+
+        self.assertEqual(len(report.records()), 10)
+        self.assertEqual(
+            records[0],
+            OperationRecord("server_create", "simple-stress-0", 1.0, True, start=10.0),
+        )
+        self.assertEqual(records[1].error, "boom")
+        self.assertEqual(records[1].error_type, "Timeout")
+        self.assertEqual(records[1].retries, 2)
+        self.assertFalse(records[1].success)
+        self.assertEqual([r.success for r in records[2:]], [True] * 7 + [False])
+        self.assertEqual([r.resource_name for r in report.records() if not r.success], ["simple-stress-1", "simple-stress-9"])
+
+    def test_records_memory(self):
+        operations = ["server_create", "volume_create", "server_delete"]
+        count = 10_000
+
+        def measure(fill):
+            tracemalloc.start()
+            try:
+                kept = fill()
+                size = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            del kept
+            return size / count
+
+        def columns():
+            report = Report()
+            for x in range(count):
+                report.record(operations[x % 3], f"simple-stress-{x}", x / 1000, True)
+            return report
+
+        def objects():
+            return [
+                OperationRecord(operations[x % 3], f"simple-stress-{x}", x / 1000, True, start=time.time())
+                for x in range(count)
+            ]
+
+        # Every record has a name of its own. A dataclass instance with its
+        # float boxes and name is about 270 bytes, a column row 26 bytes and
+        # a bit, the name template is shared by all lifecycles
+        self.assertLess(measure(columns) * 8, measure(objects))
+
+    def test_resource_names(self):
+        names = [
+            "simple-stress-17",
+            "simple-stress-17-volume-0",
+            "simple-stress-4-vol-8d3e0a46-1f5b-4c1e-9f0e-2b7c3f1d0e5a",
+            "simple-stress",
+            "stress2-007-3",
+            "simple-stress-12345678901",
+        ]
+        report = Report()
+        for name in names:
+            report.record("server_create", name, 1.0, True)
+
+        self.assertEqual([r.resource_name for r in report.records()], names)
+        # The lifecycles share their template
+        report.record("server_create", "simple-stress-18", 1.0, True)
+        self.assertEqual(len(report._templates), len(names))
+
+
+class TestLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.stderr = io.StringIO()
+        patcher = patch("sys.stderr", self.stderr)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        setup_logging("INFO", "json", "run-1")
+        self.addCleanup(setup_logging, "INFO", "text", "")
+
+    def entries(self):
+        logger.complete()
+        return [json.loads(line) for line in self.stderr.getvalue().splitlines()]
+
+    def test_json_0(self):
+        report = Report()
+        with logger.contextualize(instance="simple-stress-0"):
+            with report.track("server_create", "simple-stress-0"):
+                logger.info("Creating server {name}")
+            logger.debug("Waiting for server")
+
+        entries = self.entries()
+
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["message"], "Creating server {name}")
+        self.assertEqual(entries[0]["level"], "INFO")
+        self.assertEqual(entries[0]["run_id"], "run-1")
+        self.assertEqual(entries[0]["instance"], "simple-stress-0")
+        self.assertEqual(entries[0]["operation"], "server_create")
+
+    def test_json_1(self):
+        with logger.contextualize(instance="simple-stress-0"):
+            pass
+        logger.warning("Outside of an instance")
+
+        entries = self.entries()
+
+        self.assertNotIn("instance", entries[0])
+        self.assertNotIn("operation", entries[0])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -21,6 +21,7 @@ def _make_time_mock(mock_time):
     counter = itertools.count(0, 100000)
     mock_time.time.side_effect = lambda: next(counter)
     mock_time.sleep = MagicMock()
+    mock_time.process_time.return_value = 0.0
 
 
 class TestBurnin(unittest.TestCase):
@@ -34,6 +35,9 @@ class TestBurnin(unittest.TestCase):
         self.mock_os_cloud.compute.get_server_console_output.return_value = (
             "The system is finally up"
         )
+        self.mock_os_cloud.compute.create_server.return_value.status = "BUILD"
+        self.mock_os_cloud.compute.get_server.return_value.status = "ACTIVE"
+        self.mock_os_cloud.block_storage.get_volume.return_value.status = "available"
 
         self.mock_os_cloud.network.find_network.return_value = None
         self.mock_os_cloud.network.find_subnet.return_value = None
@@ -1,3 +1,7 @@
+import json
+from pathlib import Path
+import socket
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 from unittest.mock import ANY
@@ -6,6 +10,7 @@ import typer
 from typer.testing import CliRunner
 
 from openstack_simple_stress.main import (
+    cancel_token,
     run,
 )
 
@@ -24,6 +29,9 @@ class TestCLI(unittest.TestCase):
         self.mock_os_cloud.compute.get_server_console_output.return_value = (
             "The system is finally up"
         )
+        self.mock_os_cloud.compute.create_server.return_value.status = "BUILD"
+        self.mock_os_cloud.compute.get_server.return_value.status = "ACTIVE"
+        self.mock_os_cloud.block_storage.get_volume.return_value.status = "available"
 
         # By default, find_* returns None so resources are created
         self.mock_os_cloud.network.find_network.return_value = None
@@ -46,11 +54,11 @@ class TestCLI(unittest.TestCase):
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
         mock_delete_server.assert_not_called()
 
-    @patch("openstack_simple_stress.main.Instance.add_volume")
-    def test_cli_3(self, mock_add_volume):
+    @patch("openstack_simple_stress.main.create_volume")
+    def test_cli_3(self, mock_create_volume):
         result = self.runner.invoke(app, ["--volume"])
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
-        mock_add_volume.assert_called_once()
+        mock_create_volume.assert_called_once()
 
     def test_cli_4(self):
         result = self.runner.invoke(app, ["--no-wait"])
@@ -58,15 +66,17 @@ class TestCLI(unittest.TestCase):
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
 
     def test_cli_5(self):
-        mock_server = MagicMock()
+        mock_server = MagicMock(status="BUILD")
         self.mock_os_cloud.compute.create_server.return_value = mock_server
-        result = self.runner.invoke(app, ["--interval=200", "--timeout=999"])
+        self.mock_os_cloud.compute.get_server.side_effect = [
+            MagicMock(status="BUILD"),
+            MagicMock(status="ACTIVE"),
+        ]
+        with patch.object(cancel_token, "sleep") as mock_sleep:
+            result = self.runner.invoke(app, ["--interval=200", "--timeout=999", "--no-wait"])
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
-        self.mock_os_cloud.compute.wait_for_server.assert_called_with(
-            mock_server,
-            interval=200,
-            wait=999,
-        )
+        self.mock_os_cloud.compute.get_server.assert_called_with(mock_server.id)
+        mock_sleep.assert_called_once_with(200)
 
     @patch("openstack_simple_stress.main.create")
     def test_cli_6(self, mock_create):
@@ -74,8 +84,8 @@ class TestCLI(unittest.TestCase):
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
         self.assertEqual(mock_create.call_count, 6)
 
-    @patch("openstack_simple_stress.main.Instance.add_volume")
-    def test_cli_7(self, mock_add_volume):
+    @patch("openstack_simple_stress.main.create_volume")
+    def test_cli_7(self, mock_create_volume):
         result = self.runner.invoke(
             app,
             [
@@ -88,8 +98,9 @@ class TestCLI(unittest.TestCase):
             ],
         )
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
-        self.assertEqual(mock_add_volume.call_count, 5)
-        mock_add_volume.assert_called_with(
+        self.assertEqual(mock_create_volume.call_count, 5)
+        mock_create_volume.assert_any_call(
+            ANY,
             "unittest-0-volume-4",
             "StorageZone",
             999,
@@ -122,6 +133,7 @@ class TestCLI(unittest.TestCase):
             networks=ANY,
             user_data=ANY,
             scheduler_hints=ANY,
+            metadata={"simple-stress-run": ANY},
             block_device_mapping=ANY,
         )
 
@@ -214,10 +226,133 @@ class TestCLI(unittest.TestCase):
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
         self.assertEqual(mock_create.call_count, 5)
 
+    @patch("openstack_simple_stress.main.create")
+    @patch("openstack_simple_stress.main.create_batch")
+    def test_batch_create(self, mock_create_batch, mock_create):
+        mock_create_batch.return_value = []
+        result = self.runner.invoke(app, ["--batch-create=3", "--number=7"])
+        self.assertEqual(result.exit_code, 0, (result, result.stdout))
+        self.assertEqual(mock_create_batch.call_count, 2)
+        batches = sorted(
+            (c.args[1], c.args[2]) for c in mock_create_batch.call_args_list
+        )
+        self.assertEqual(batches, [("simple-stress-0", 3), ("simple-stress-1", 3)])
+        # The remaining server is created on its own, without a batch suffix
+        mock_create.assert_called_once()
+        self.assertEqual(mock_create.call_args.args[1], "simple-stress-2")
+
+    @patch("openstack_simple_stress.main.create_batch")
+    def test_batch_create_block(self, mock_create_batch):
+        mock_create_batch.return_value = []
+        result = self.runner.invoke(
+            app, ["--batch-create=2", "--number=8", "--mode=block", "--parallel=3"]
+        )
+        self.assertEqual(result.exit_code, 0, (result, result.stdout))
+        self.assertEqual(mock_create_batch.call_count, 4)
+
     def test_mode_invalid(self):
         result = self.runner.invoke(app, ["--mode=invalid"])
         self.assertNotEqual(result.exit_code, 0)
 
+    def test_rate_limit(self):
+        result = self.runner.invoke(
+            app, ["--rate-limit=compute=5", "--rate-limit=block-storage=2"]
+        )
+        self.assertEqual(result.exit_code, 0, (result, result.stdout))
+
+        result = self.runner.invoke(app, ["--rate-limit=compute"])
+        self.assertEqual(result.exit_code, 1)
+
+    def test_rate(self):
+        result = self.runner.invoke(app, ["--rate=50", "--number=3", "--parallel=2"])
+        self.assertEqual(result.exit_code, 0, (result, result.stdout))
+        self.assertIn("corr.", result.stdout)
+
+        result = self.runner.invoke(app, ["--rate=1", "--mode=block"])
+        self.assertEqual(result.exit_code, 1)
+
+    def test_trace(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "trace.json"
+            result = self.runner.invoke(app, [f"--trace={path}", "--number=2"])
+            self.assertEqual(result.exit_code, 0, (result, result.stdout))
+            events = json.loads(path.read_text())
+
+        operations = {e["name"] for e in events if e["ph"] == "X"}
+        self.assertIn("server_create", operations)
+        self.assertIn("server_delete", operations)
+        counters = {e["name"] for e in events if e["ph"] == "C"}
+        self.assertEqual(counters, {"in_flight", "workers", "driver", "saturated"})
+        self.assertIn("Client Saturation", result.stdout)
+
+        result = self.runner.invoke(app, ["--trace=/nonexistent/trace.json"])
+        self.assertEqual(result.exit_code, 1)
+
+    def test_phone_home_port_in_use(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            sock.listen()
+            port = sock.getsockname()[1]
+            result = self.runner.invoke(
+                app,
+                [
+                    f"--phone-home=127.0.0.1:{port}",
+                    "--phone-home-address=127.0.0.1",
+                ],
+            )
+        self.assertEqual(result.exit_code, 1)
+        self.assertNotIsInstance(result.exception, OSError)
+
+    def test_profile_driver(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "driver.folded"
+            result = self.runner.invoke(app, [f"--profile-driver={path}"])
+            self.assertEqual(result.exit_code, 0, (result, result.stdout))
+            self.assertTrue(path.exists())
+
+        result = self.runner.invoke(app, ["--profile-driver=/nonexistent/driver.folded"])
+        self.assertEqual(result.exit_code, 1)
+
+    def test_slo(self):
+        result = self.runner.invoke(app, ["--slo=error_rate<1%", "--slo=server_create.p95<60"])
+        self.assertEqual(result.exit_code, 0, (result, result.stdout))
+        self.assertIn("PASS", result.stdout)
+        self.assertNotIn('"passed"', result.stdout)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "slo.json"
+            result = self.runner.invoke(app, ["--slo=server_create.count>100", f"--slo-summary={path}"])
+            self.assertEqual(result.exit_code, 3, (result, result.stdout))
+            summary = json.loads(path.read_text())
+        self.assertFalse(summary["passed"])
+        self.assertEqual(summary["slos"][0]["value"], 1)
+
+        result = self.runner.invoke(app, ["--slo=server_create.p42<1"])
+        self.assertEqual(result.exit_code, 1)
+
+    def test_history(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "history.sqlite"
+            for _ in range(2):
+                result = self.runner.invoke(app, ["--save-history", "--save-records", f"--history-db={path}"])
+                self.assertEqual(result.exit_code, 0, (result, result.stdout))
+
+            result = self.runner.invoke(app, ["--history", f"--history-db={path}"])
+            self.assertEqual(result.exit_code, 0, (result, result.stdout))
+            self.assertIn("server_create", result.stdout)
+            self.assertIn("P95 change", result.stdout)
+            self.mock_os_cloud.compute.create_server.assert_called()
+
+        result = self.runner.invoke(app, ["--save-records"])
+        self.assertEqual(result.exit_code, 1)
+
+    def test_log_options(self):
+        result = self.runner.invoke(app, ["--log-format=json", "--log-level=warning"])
+        self.assertEqual(result.exit_code, 0, (result, result.stdout))
+
+        result = self.runner.invoke(app, ["--log-level=chatty"])
+        self.assertEqual(result.exit_code, 1)
+
     def test_clean_no_resources(self):
         self.mock_os_cloud.compute.servers.return_value = []
         self.mock_os_cloud.block_storage.volumes.return_value = []
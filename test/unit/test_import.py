@@ -0,0 +1,53 @@
+import json
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ["openstack", "keystoneauth1", "rich", "yaml", "cryptography"]
+
+IMPORT_CHECK = """
+import json, sys, time
+start = time.perf_counter()
+import openstack_simple_stress.main
+duration = time.perf_counter() - start
+{extra}
+print(json.dumps({{
+    "duration": duration,
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+HELP = """
+import typer
+from typer.testing import CliRunner
+app = typer.Typer()
+app.command()(openstack_simple_stress.main.run)
+assert CliRunner().invoke(app, ["--help"]).exit_code == 0
+"""
+
+
+def run_check(extra=""):
+    # A fresh interpreter, the test process has imported everything already
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_CHECK.format(extra=extra, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestImport(unittest.TestCase):
+
+    def test_import_0(self):
+        result = run_check()
+
+        self.assertEqual(result["loaded"], [])
+        # Generous for slow CI machines, the module check is the strict one
+        self.assertLess(result["duration"], 1.0)
+
+    def test_help_0(self):
+        result = run_check(HELP)
+
+        # typer renders the help with rich
+        self.assertEqual([m for m in result["loaded"] if m != "rich"], [])
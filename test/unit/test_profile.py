@@ -94,6 +94,9 @@ class TestCLIWithProfile(unittest.TestCase):
         self.mock_os_cloud.compute.get_server_console_output.return_value = (
             "The system is finally up"
         )
+        self.mock_os_cloud.compute.create_server.return_value.status = "BUILD"
+        self.mock_os_cloud.compute.get_server.return_value.status = "ACTIVE"
+        self.mock_os_cloud.block_storage.get_volume.return_value.status = "available"
         self.mock_os_cloud.network.find_network.return_value = None
         self.mock_os_cloud.network.find_subnet.return_value = None
         self.mock_os_cloud.compute.find_server_group.return_value = None
@@ -173,13 +176,13 @@ class TestCLIWithProfile(unittest.TestCase):
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
         mock_delete_server.assert_not_called()
 
-    @patch("openstack_simple_stress.main.Instance.add_volume")
-    def test_profile_sets_volume_params(self, mock_add_volume):
+    @patch("openstack_simple_stress.main.create_volume")
+    def test_profile_sets_volume_params(self, mock_create_volume):
         path = self._write_profile("volume: true\nvolume_number: 3\nvolume_size: 50\n")
 
         result = self.runner.invoke(app, [f"--profile={path}"])
         self.assertEqual(result.exit_code, 0, (result, result.stdout))
-        self.assertEqual(mock_add_volume.call_count, 3)
+        self.assertEqual(mock_create_volume.call_count, 3)
 
     def test_profile_builtin_quick(self):
         result = self.runner.invoke(app, ["--profile=quick"])